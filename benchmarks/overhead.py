@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+'''
+Overhead benchmark: calculates indicators on short inputs (100 bars by
+default) where the time of a call is dominated by the overhead of creating the
+indicator rather than by the calculations, like when re-evaluating indicators
+in a live loop over many symbols. "noop" is an indicator which calculates
+nothing and measures only the overhead of the machinery.
+'''
+import argparse
+import os.path
+import sys
+import time
+
+import pandas as pd
+
+# append module root directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import btalib  # noqa: E402
+
+DATA = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', '2006-day-001.txt',
+)
+
+INDICATORS = ['noop', 'sma', 'ema', 'rsi', 'macd', 'stochastic', 'adx',
+              'bbands']
+
+
+class noop(btalib.Indicator):
+    outputs = 'noop'
+
+    def __init__(self):
+        self.o.noop = self.i0
+
+
+def run(pargs=None):
+    args = parse_args(pargs)
+
+    df = pd.read_csv(
+        DATA, parse_dates=True, index_col='date', skiprows=1,
+        names=['date', 'open', 'high', 'low', 'close', 'volume', 'oi'],
+    )
+    df = df.iloc[:args.bars]
+
+    total = 0.0
+    for name in args.indicators:
+        ind = noop if name == 'noop' else getattr(btalib, name)
+        ind(df)  # warm up
+
+        best = float('inf')  # best of several rounds, less noise
+        for r in range(args.rounds):
+            tstart = time.perf_counter()
+            for i in range(args.iterations):
+                ind(df)
+
+            best = min(best, time.perf_counter() - tstart)
+
+        percall = best / args.iterations * 1e6
+        total += percall
+        print('{:12s}: {:10.1f} us/call'.format(name, percall))
+
+    print('{:12s}: {:10.1f} us'.format('total', total))
+
+
+def parse_args(pargs=None):
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description=__doc__,
+    )
+
+    parser.add_argument('--bars', default=100, type=int,
+                        help='Number of bars of the input data')
+
+    parser.add_argument('--iterations', default=200, type=int,
+                        help='Number of calls per indicator and round')
+
+    parser.add_argument('--rounds', default=5, type=int,
+                        help='Rounds of calls, the best one is reported')
+
+    parser.add_argument('--indicators', nargs='+', default=INDICATORS,
+                        help='Indicators to calculate ("noop" included)')
+
+    return parser.parse_args(pargs)
+
+
+if __name__ == '__main__':
+    run()
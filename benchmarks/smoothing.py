@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+'''
+Smoothing benchmark: calculates the constant alpha exponential smoothing
+(y[i] = beta * y[i - 1] + alpha * x[i], as in smacc and the directional
+movement indicators built on it) on random values with the available methods:
+scipy's lfilter, the numpy blocked scan used when scipy is missing and the
+loop of the kernels (compiled with numba if available). The maximum relative
+difference to the 1st method is also reported.
+'''
+import argparse
+import os.path
+import sys
+import time
+
+import numpy as np
+
+# append module root directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from btalib import kernels  # noqa: E402
+
+
+def lfilter(x, alpha, beta):
+    import scipy.signal
+
+    x[0] /= alpha  # same start as the loop and the scan: y[0] = x[0]
+    return scipy.signal.lfilter([alpha], [1.0, -beta], x)
+
+
+def scan(x, alpha, beta):
+    return kernels.exp_smoothing_scan(x, alpha, beta)
+
+
+def loop(x, alpha, beta):
+    return kernels.exp_smoothing(x, alpha, beta)
+
+
+def run(pargs=None):
+    args = parse_args(pargs)
+
+    alpha = args.alpha
+    beta = (args.period - 1) / args.period if alpha == 1.0 else 1.0 - alpha
+    x = np.random.default_rng(args.seed).standard_normal(args.size) + 10.0
+
+    methods = [('scan', scan), ('loop', loop)]
+    try:
+        import scipy.signal  # noqa: F401
+    except ImportError:
+        print('scipy not available, lfilter skipped')
+    else:
+        methods.insert(0, ('lfilter', lfilter))
+
+    if kernels.compiled():
+        loop(x[:2].copy(), alpha, beta)  # warm up: compilation
+        methods[-1] = ('loop (jit)', loop)
+
+    ref = None
+    for name, method in methods:
+        best = float('inf')  # best of several rounds, less noise
+        for r in range(args.rounds):
+            xx = x.copy()  # methods may work in place
+            tstart = time.perf_counter()
+            result = method(xx, alpha, beta)
+            best = min(best, time.perf_counter() - tstart)
+
+        if ref is None:
+            ref = result
+
+        diff = np.max(np.abs(result - ref) / np.maximum(np.abs(ref), 1.0))
+        print('{:12s}: {:10.2f} ms - maxdiff {:.2e}'.format(
+            name, best * 1e3, diff))
+
+
+def parse_args(pargs=None):
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description=__doc__,
+    )
+
+    parser.add_argument('--size', default=1000000, type=int,
+                        help='Number of values to smooth')
+
+    parser.add_argument('--period', default=14, type=int,
+                        help='Period for smacc: alpha=1, beta=(p-1)/p')
+
+    parser.add_argument('--alpha', default=1.0, type=float,
+                        help='Alpha, if not 1.0 then beta=1-alpha')
+
+    parser.add_argument('--rounds', default=5, type=int,
+                        help='Rounds per method, the best one is reported')
+
+    parser.add_argument('--seed', default=0, type=int,
+                        help='Seed for the random values')
+
+    return parser.parse_args(pargs)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+'''
+Soak benchmark: calculates indicators over and over on the same data and
+reports the memory (RSS) of the process at regular intervals, which has to
+remain flat after the first iterations if nothing is leaked.
+'''
+import argparse
+import gc
+import os.path
+import sys
+import time
+
+import pandas as pd
+
+# append module root directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import btalib  # noqa: E402
+
+DATA = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', '2006-day-001.txt',
+)
+
+INDICATORS = ['sma', 'ema', 'rsi', 'macd', 'stochastic', 'adx', 'bbands']
+
+
+def rss():
+    # current resident set size in MB (Linux), else maximum RSS so far
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+def run(pargs=None):
+    args = parse_args(pargs)
+
+    df = pd.read_csv(
+        DATA, parse_dates=True, index_col='date', skiprows=1,
+        names=['date', 'open', 'high', 'low', 'close', 'volume', 'oi'],
+    )
+
+    inds = [getattr(btalib, x) for x in args.indicators]
+    tstart = time.time()
+    for i in range(1, args.iterations + 1):
+        for ind in inds:
+            ind(df)
+
+        if not i % args.report:
+            gc.collect()
+            print('iterations: {:8d} - calls: {:9d} - rss: {:8.2f} MB - '
+                  'elapsed: {:8.2f} s'.format(
+                      i, i * len(inds), rss(), time.time() - tstart))
+
+
+def parse_args(pargs=None):
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description=__doc__,
+    )
+
+    parser.add_argument('--iterations', default=20000, type=int,
+                        help='Number of iterations over the indicators')
+
+    parser.add_argument('--report', default=1000, type=int,
+                        help='Report memory usage every x iterations')
+
+    parser.add_argument('--indicators', nargs='+', default=INDICATORS,
+                        help='Indicators to calculate in each iteration')
+
+    return parser.parse_args(pargs)
+
+
+if __name__ == '__main__':
+    run()
@@ -8,6 +8,10 @@ from .version import *  # noqa: F401 F403
 
 from .utils import *  # noqa: F401 F403
 
+from .state import *  # noqa: F401 F403
+
+from .stream import *  # noqa: F401 F403
+
 from .meta import *  # noqa: F401 F403
 
 from .indicator import *  # noqa: F401 F403
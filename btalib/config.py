@@ -34,7 +34,7 @@ def get_input_indices():
     return OHLC_INDICES.copy()
 
 
-RETVAL = ''  # can be 'dataframe', 'df'
+RETVAL = ''  # can be 'dataframe', 'df', 'trimmed'
 
 
 def set_return(val):
@@ -47,6 +47,11 @@ def set_return_dataframe():
     RETVAL = 'df'
 
 
+def set_return_trimmed():
+    global RETVAL
+    RETVAL = 'trimmed'
+
+
 def get_return():
     return RETVAL
 
@@ -55,6 +60,10 @@ def get_return_dataframe():
     return RETVAL in ['df', 'dataframe']
 
 
+def get_return_trimmed():
+    return RETVAL == 'trimmed'
+
+
 TALIB_COMPAT = False  # global flag for ta-lib compatibility
 
 
@@ -65,3 +74,52 @@ def set_talib_compat(onoff=True):
 
 def get_talib_compat():
     return TALIB_COMPAT
+
+
+DTYPE = None  # floating point dtype for calculations. None: float64
+
+
+def set_dtype(dtype=None):
+    '''
+    Sets the floating point dtype (for example: `float32`) in which inputs,
+    intermediate and final results are kept. Values are still accumulated
+    (rolling sums, exponential smoothing, cumulative sums) in `float64`.
+    Integer inputs given as single arrays/series are not converted.
+
+    With `float32` results deviate from the `float64` results (and from
+    `ta-lib`) with a relative tolerance of `1e-4` (with regards to the
+    magnitude of the values), except for functions which amplify the rounding
+    of the inputs like `tan`.
+
+    It can be set for a single indicator with the `_dtype` keyword argument.
+
+    `None` restores the default behavior (`float64`, inputs untouched).
+    '''
+    global DTYPE
+    DTYPE = dtype
+
+
+def get_dtype():
+    return DTYPE
+
+
+JIT = True  # compile the kernels of recursive definitions with numba
+
+
+def set_jit(onoff=True):
+    '''
+    Enables/disables the compilation with `numba` (if installed) of the
+    kernels which calculate recursive definitions, like the exponential
+    smoothing with a dynamic alpha of `kama` and `mama`. The compiled and
+    the pure Python kernels deliver the same results.
+
+    The chained emas of `dema`, `tema`, `trix` and `t3` are only fused in a
+    single pass (`kernels.ema_cascade`) when compiled. Without `numba` they
+    are calculated stage by stage, each stage in its own array
+    '''
+    global JIT
+    JIT = onoff
+
+
+def get_jit():
+    return JIT
@@ -4,7 +4,9 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-__all__ = ['TaPyError', 'InputsError', ]
+__all__ = [
+    'TaPyError', 'InputsError', 'OutputsError', 'StateError', 'StreamError',
+]
 
 
 class TaPyError(Exception):
@@ -15,6 +17,18 @@ class InputsError(TaPyError):
     pass
 
 
+class OutputsError(TaPyError):
+    pass
+
+
+class StateError(TaPyError):
+    pass
+
+
+class StreamError(TaPyError):
+    pass
+
+
 def OneInputNeededZeroProvided():
     errmsg = 'One (1) input is at least needed and 0 were provided'
     raise InputsError(errmsg)
@@ -28,6 +42,19 @@ def MultiDimSmall():
     raise InputsError(errmsg)
 
 
+def UpdateInputs():
+    errmsg = (
+        'An update takes only the new values of the inputs, for the same '
+        'number of inputs as in the calculation'
+    )
+    raise InputsError(errmsg)
+
+
+def StreamInputs(nvals, ninputs):
+    errmsg = 'A stream takes a value for each of its {} inputs, got {}'
+    raise InputsError(errmsg.format(ninputs, nvals))
+
+
 def MultiDimType():
     errmsg = (
         'Only DataFrames or library/user indicators are accepted as '
@@ -48,3 +75,47 @@ def ColdIndexStrNotFound(name, rename):
         'OHLC Column Name "{}" remapped to "{}", but this cannot be found'
     )
     raise InputsError(errmsg.format(name, rename))
+
+
+def OutBufferNotFound(name):
+    errmsg = 'Output buffer given for "{}", but there is no such output'
+    raise OutputsError(errmsg.format(name))
+
+
+def OutBufferSize(name, shape, size):
+    errmsg = (
+        'Output buffer for "{}" has shape {}, but a 1-dimensional buffer of '
+        'size {} is needed'
+    )
+    raise OutputsError(errmsg.format(name, shape, size))
+
+
+def StateNotSupported(name):
+    errmsg = 'Indicator "{}" does not deliver a state'
+    raise StateError(errmsg.format(name))
+
+
+def StateNotIndicator(name, indname):
+    errmsg = 'The state of indicator "{}" cannot seed indicator "{}"'
+    raise StateError(errmsg.format(name, indname))
+
+
+def StateNotParams(params, indparams):
+    errmsg = 'The state params {} do not match the indicator params {}'
+    raise StateError(errmsg.format(params, indparams))
+
+
+def StateWarmup(name, size, minperiod):
+    errmsg = (
+        'Indicator "{}" has no state before its warm-up is done. It was '
+        'calculated on {} values and needs {}'
+    )
+    raise StateError(errmsg.format(name, size, minperiod))
+
+
+def StreamNotSupported(name):
+    errmsg = (
+        'Operation "{}" cannot be calculated one value at a time in a stream. '
+        'Only operations on a window of values can'
+    )
+    raise StreamError(errmsg.format(name))
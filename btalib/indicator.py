@@ -5,18 +5,30 @@
 # Use of this source code is governed by the MIT License
 ###############################################################################
 import collections
+import contextlib
+import copy
+import operator
+
+import numpy as np
+import pandas as pd
 
 from . import config
+from . import errors
 from . import meta
+from . import stream
 from .meta import metadata
+from .state import State
 
 __all__ = [
     'get_indicators', 'get_ind_names', 'get_ind_by_name',
     'get_ind_by_group', 'get_ind_names_by_group', 'get_groups',
+    'memoize',
 ]
 
 
 metadata.callstack = []  # keep indicators which are currently being executed
+metadata.memo = None  # calculated indicators, to reuse identical ones
+metadata.memoscope = False  # memo kept across top-level calls (see memoize)
 
 
 _NAMES_IND = {}
@@ -48,6 +60,136 @@ def get_groups():
     return list(_GRP_IND)
 
 
+@contextlib.contextmanager
+def memoize():
+    '''
+    Context manager which keeps the results of the indicators (and nested
+    indicators) calculated inside the block, to reuse them if an identical
+    indicator (class, inputs and params) is requested again. For example when
+    calculating a suite of indicators on the same data.
+
+    Outside of the block the results are only kept during the calculation of
+    a top-level indicator.
+
+    The inputs must not be modified inside the block.
+    '''
+    oldmemo, oldscope = metadata.memo, metadata.memoscope
+    metadata.memo, metadata.memoscope = {}, True
+    try:
+        yield
+    finally:
+        metadata.memo, metadata.memoscope = oldmemo, oldscope
+
+
+def _memokey(cls, inputs, params, talibflag):
+    # key to identify an indicator. None if it cannot be identified
+    key = (
+        cls, talibflag,
+        tuple(_in._ident() for _in in inputs), tuple(params._values()),
+    )
+    try:
+        hash(key)
+    except TypeError:  # unhashable params
+        return None
+
+    return key
+
+
+def _grow(bufs, key, vals, new):
+    # Returns the values of vals followed by those of new, in a buffer kept
+    # in bufs under key, which has room to append the next values in place.
+    # Reused if vals are the 1st values of the buffer, else a new one is made
+    n, size = len(vals), len(vals) + len(new)
+    dtype = np.result_type(vals, new)
+    buf = bufs.get(key)
+    reuse = (buf is not None and vals.base is buf and len(buf) >= size and
+             buf.dtype == dtype and vals.ctypes.data == buf.ctypes.data)
+    if not reuse:
+        buf = bufs[key] = np.empty(size + (size >> 1), dtype=dtype)
+        buf[:n] = vals
+
+    buf[n:size] = new
+    return buf[:size]
+
+
+def _grow_index(bufs, old, new):
+    # Returns the index old followed by new. Numeric/datetime values are kept
+    # in a buffer with room to grow (see _grow), which avoids the copies of
+    # appending to the index
+    for dtype in (old.dtype, new.dtype):
+        if not isinstance(dtype, np.dtype) or dtype.kind not in 'iufM':
+            return old.append(new)  # for example timezones or objects
+
+    vals = _grow(bufs, 'index', old.to_numpy(), new.to_numpy())
+    return pd.Index(vals, name=old.name, copy=False)
+
+
+def _memokeep(self):
+    # Freeze the values of inputs/outputs, to have them copied before being
+    # modified in place and return them to keep them alive in the memo
+    keep = []
+    for line in (*self.inputs, *self.outputs):
+        if isinstance(line._data, np.ndarray):
+            line._data.flags.writeable = False
+
+        keep.append((line._data, line._lazy))
+
+    return keep
+
+
+class _Alias:
+    # Descriptor for the aliases of inputs and outputs (i0, input_close, ...)
+    # Operational aliases (d0, data_close, lines, ...) are only available
+    # until the calculation of the indicator is done
+    __slots__ = ('func', 'operational')
+
+    def __init__(self, func, operational=False):
+        self.func = func
+        self.operational = operational
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+
+        if self.operational and obj._calculated_:
+            raise AttributeError('operational alias, calculation is done')
+
+        try:
+            return self.func(obj)
+        except IndexError:  # less inputs than declared (allowinputs)
+            raise AttributeError('input not present')
+
+
+def _install_aliases(cls):
+    # Install the descriptors for the aliases of the inputs in the class
+    for i, name in enumerate(cls.inputs):
+        def byidx(obj, i=i):
+            return obj.inputs[i]
+
+        byname = operator.attrgetter('inputs.' + name)
+
+        for alias in ('i{}', 'input{}', 'd{}', 'data{}'):
+            setattr(cls, alias.format(i), _Alias(byidx, alias[0] == 'd'))
+
+        for alias in ('i_{}', 'input_{}', 'd_{}', 'data_{}'):
+            setattr(cls, alias.format(name), _Alias(byname, alias[0] == 'd'))
+
+
+def _autocalls(cls):
+    # Determine the methods of the base classes to auto-call. Non-overridden
+    # functions are filtered with list(dict.fromkeys), which removes
+    # duplicates and retains order. Returned in calling order (base first)
+    bases, bcls = [], cls
+    while isinstance(bcls, MetaIndicator):  # until Indicator is included
+        bcls = bases.append(bcls) or bcls.__bases__[0]  # append rets None
+
+    def autocall(attr):
+        return tuple(reversed(list(dict.fromkeys(getattr(b, attr)
+                                                 for b in bases))))
+
+    return autocall('__init__'), autocall('_talib'), autocall('_talib_class')
+
+
 class MetaIndicator(meta.linesholder.LinesHolder.__class__):
     # The metaclass takes care of parsing the appropriate defintions during
     # class creation (alias, lines, ...) and properly definiing them if needed
@@ -65,6 +207,10 @@ class MetaIndicator(meta.linesholder.LinesHolder.__class__):
         meta.docs._generate(cls, bases, dct, **kwargs)
         meta.groups._generate(cls, bases, dct, **kwargs)
 
+        # Precalculate what is needed for each instance
+        _install_aliases(cls)
+        cls._inits_, cls._talibs_, cls._talibclasses_ = _autocalls(cls)
+
         modsplit = cls.__module__.split('.')
         to_register = modsplit[0] == __package__ and len(modsplit) > 2
         if to_register and not name.startswith('_'):
@@ -76,6 +222,147 @@ class MetaIndicator(meta.linesholder.LinesHolder.__class__):
 
         return cls  # return newly created and patched class
 
+    def _from_memo(cls, memoized):
+        # Return a copy of a memoized indicator with its own outputs, which
+        # share the values with the memoized ones
+        self = copy.copy(memoized)
+        self._df = self._sf = self._updbufs_ = None
+
+        self.outputs = self.o = meta.outputs._from_class(cls)
+        for name, line in memoized.outputs._items():
+            setattr(self.outputs, name, line)
+
+        self.outputs._update_minperiod()
+        self._minperiods = self.outputs._minperiods
+        self._minperiod = self.outputs._minperiod
+        return self
+
+    def _into(cls, ind, out):
+        # Return a copy of the indicator with its outputs delivering the values
+        # in the arrays of "out"
+        self = copy.copy(ind)
+        self._df = self._sf = self._updbufs_ = None
+        self.outputs = self.o = ind.outputs._into(out)
+        return self
+
+    def _rerun(cls, ind, inputs):
+        # Return a copy of the indicator calculated again (with the same
+        # params and args) on other inputs, as a top-level calculation
+        self = copy.copy(ind)
+        self._df = self._sf = self._updbufs_ = None
+        self._calculated_ = self._unbounded_ = False
+
+        self.outputs = self.o = meta.outputs._from_class(cls)
+        self.inputs = self.i = inputs
+        if self._dtype_ is not None:
+            for _in in self.inputs:
+                _in._astype(self._dtype_)
+
+        self._minperiods = [_in._minperiod for _in in self.inputs]
+        self._minperiod = max(self._minperiods)
+
+        oldmemo = metadata.memo
+        if not metadata.memoscope:
+            metadata.memo = {}
+        try:
+            cls._execute(self, *self._callargs_)
+        finally:
+            metadata.memo = oldmemo
+
+        return self
+
+    def _update(cls, self, args):
+        # Append the new values of the inputs to those of the indicator and
+        # calculate the outputs for them (see Indicator.update)
+        new, args = meta.inputs._from_args(cls, *args)
+        if args or len(new) != len(self.inputs):
+            errors.UpdateInputs()  # raise error
+
+        nnew = new.size
+        if not nnew:
+            return self
+
+        if self._dtype_ is not None:  # inputs have to be converted if needed
+            for _in in new:
+                _in._astype(self._dtype_)
+
+        if self._updbufs_ is None:  # own buffers, to append values in place
+            self._updbufs_ = {}
+
+        bufs, old = self._updbufs_, self.inputs
+        index = None  # default RangeIndex unless an index is given
+        if old[0]._index is not None or new[0]._index is not None:
+            index = _grow_index(bufs, old[0].index, new[0].index)
+
+        lines = []
+        for i, (oldin, newin) in enumerate(zip(old, new)):
+            vals = _grow(bufs, ('i', i), oldin._series, newin._series)
+            line = meta.inputs.Input(vals, oldin._name, index=index)
+            line._minperiod = oldin._minperiod
+            lines.append(line)
+
+        inputs = old.__class__(*lines)
+        size = len(inputs[0])
+
+        # If the values only depend on a window of values (given by the
+        # minperiod), only the new values plus the window are calculated
+        start = size - nnew - (self._minperiod - 1)
+        inperiod = max(_in._minperiod for _in in old)
+        if self._unbounded_ or start < inperiod - 1:
+            # take all the results of the calculation (for example a state),
+            # but keep the buffers
+            self.__dict__.update(cls._rerun(self, inputs).__dict__,
+                                 _updbufs_=bufs)
+        else:
+            # the values are calculated by position, no index needed
+            winputs = [meta.inputs.Input(line._tail(start), line._name)
+                       for line in inputs]
+
+            ind = cls._rerun(self, old.__class__(*winputs))
+
+            outputs = meta.outputs._from_class(cls)
+            for name, line in self.outputs._items():
+                r = ind.outputs._get(name)._tail(size - start - nnew)
+                vals = _grow(bufs, ('o', name), line._series, r)
+                out = meta.outputs.Output(vals, name, index=index)
+                out._minperiod = line._minperiod
+                setattr(outputs, name, out)
+
+            outputs._update_minperiod()
+            self.outputs = self.o = outputs
+
+        self.inputs = self.i = inputs
+        self._df = self._sf = None
+        return self
+
+    def _stream(cls, args, kwargs):
+        # Return the indicator defined on the nodes of a stream, which deliver
+        # the values one at a time (see Stream). No memo or outputs to fill
+        self = cls.__new__(cls)
+
+        kwargs = dict(kwargs)
+        talibflag = kwargs.pop('_talib', False) or config.get_talib_compat()
+        if talibflag:
+            for b_ta in cls._talibclasses_:
+                b_ta(kwargs)
+
+        self.outputs = self.o = stream._Lines(cls.outputs)
+        self.inputs, args = stream._inputs(cls, args)
+        self.i = self.inputs
+
+        if talibflag:
+            for b_ta in cls._talibs_:
+                b_ta(self, kwargs)
+
+        self.params, kwargs = meta.params._from_kwargs(cls, **kwargs)
+        self.p = self.params
+
+        for b_init in cls._inits_:
+            b_init(self, *args, **kwargs)
+
+        self._calculated_ = True
+        return self
+
     def __call__(cls, *args, **kwargs):
         # In charge of object creation and initialization.
         # Parses and assigns declared parameters
@@ -83,50 +370,51 @@ class MetaIndicator(meta.linesholder.LinesHolder.__class__):
         # member attributes before __init__ is given a change to do
         # something. Any subclass with something to do in __init__ will already
         # be able to access the auto-magical attributes
-        self = cls.__new__(cls, *args, *kwargs)  # create instance as usual
-
-        # Determine base classes for auto-calling
-        # Non-overridden functions will be filtered with list(dict.fromkeys),
-        # which removes duplicates and retains order
-        bases, bcls = [], cls
-        while(bcls != Indicator):
-            bcls = bases.append(bcls) or bcls.__bases__[0]  # append rets None
+        if stream._streamed(args):  # called on the values of a stream
+            return cls._stream(args, kwargs)
 
-        bases.append(bcls)  # append Indicator which defines neutral methods
+        self = cls.__new__(cls, *args, *kwargs)  # create instance as usual
 
         # check if ta-lib compatibility is requestd
         talibflag = kwargs.pop('_talib', False) or config.get_talib_compat()
 
+        # dtype for the calculations. Nested indicators use that of the caller
+        dtype = kwargs.pop('_dtype', None)
+        if dtype is None:
+            if metadata.callstack:
+                dtype = metadata.callstack[-1]._dtype_
+            else:
+                dtype = config.get_dtype()
+
+        self._dtype_ = dtype = None if dtype is None else np.dtype(dtype)
+
+        # caller provided arrays to deliver the values of the outputs in. Only
+        # pending lazy operations are evaluated in them, other outputs (from
+        # kernels, rolling, _ewm, ...) are calculated first and then copied
+        out = kwargs.pop('out', None)
+
+        # state of a previous calculation to continue from (see getstate)
+        state = kwargs.pop('state', None)
+
         # Check if ta-lib compatibility is requested. If so and the indicator
         # defines a _talib function, give it the **ACTUAL** kwargs and use the
         # modified version. Don't let a '_talib' parameter make it to the
         # indicator (hence pop)
         if talibflag:
-            talibclass = list(dict.fromkeys(b._talib_class for b in bases))
-            for b_ta in reversed(talibclass):
+            for b_ta in cls._talibclasses_:
                 b_ta(kwargs)
 
-        # Create and install the lines holding instance
+        # Create and install the lines holding instance. The operational
+        # aliases (lines/l) and those of the inputs are class descriptors
         self.outputs = self.o = meta.outputs._from_class(cls)
-        self.lines = self.l = self.outputs  # noqa: E741
 
         # Get inputs and remaining args
         self.inputs, args = meta.inputs._from_args(cls, *args)
         self.i = self.inputs  # shorthand
 
-        # Add array of data feeds ... the s in "datas" to indicate multiple
-        self.datas = self.d = list(self.inputs)
-        self.data = self.datas[0]  # add main alias to 1st data
-
-        # add direct aliases with numeric index
-        for i, _in in enumerate(self.inputs):
-            for inalias in ('i{}', 'input{}', 'd{}', 'data{}'):
-                setattr(self, inalias.format(i), _in)
-
-        # add direct aliases with naming index
-        for i, _in in enumerate(self.inputs.__slots__):
-            for inalias in ('i_{}', 'input_{}', 'd_{}', 'data_{}'):
-                setattr(self, inalias.format(i), _in)
+        if dtype is not None:  # inputs have to be converted if needed
+            for _in in self.inputs:
+                _in._astype(dtype)
 
         # Gather minimum periods and get the dominant mininum period
         self._minperiods = [_in._minperiod for _in in self.inputs]
@@ -137,59 +425,120 @@ class MetaIndicator(meta.linesholder.LinesHolder.__class__):
         # modified version. Don't let a '_talib' parameter make it to the
         # indicator (hence pop)
         if talibflag:
-            for b_ta in reversed(list(dict.fromkeys(b._talib for b in bases))):
+            for b_ta in cls._talibs_:
                 b_ta(self, kwargs)
 
         # Get params instance and remaining kwargs
         self.params, kwargs = meta.params._from_kwargs(cls, **kwargs)
         self.p = self.params  # shorthand
 
-        # All boilerplate is done, to into execution mode
-        metadata.callstack.append(self)  # let ind know hwere in the stack
+        if state is not None:  # only for the same indicator and params
+            state._check(cls.__name__, self.params)
+            self._seedstate_ = state
 
-        # Auto-call base classes
-        for b_init in reversed(list(dict.fromkeys(b.__init__ for b in bases))):
-            b_init(self, *args, **kwargs)
+        # The memo lives during a top-level call, unless a scope is active
+        toplevel = not metadata.callstack
+        if toplevel and not metadata.memoscope:
+            metadata.memo = {}
 
-        # delete old aliases only meant for operational purposes
-        for oalias in ('l', 'lines', 'data', 'd', 'datas'):
-            delattr(self, oalias)
+        try:
+            # Reuse an identical indicator if already calculated. Not with
+            # unknown args or a state to continue from
+            memo, memokey = metadata.memo, None
+            if memo is not None and not args and not kwargs and state is None:
+                memokey = _memokey(cls, self.inputs, self.params, talibflag)
 
-        # remove direct aliases with numeric index
-        for i, _in in enumerate(self.inputs):
-            for inalias in ('d{}', 'data{}'):
-                delattr(self, inalias.format(i))
+            memoized = memo.get(memokey) if memokey is not None else None
+            if memoized is not None:
+                self = cls._from_memo(memoized[0])
+            else:
+                cls._execute(self, args, kwargs)  # calculate
 
-        # remove direct aliases with naming index
-        for i, _in in enumerate(self.inputs.__slots__):
-            for inalias in ('d_{}', 'data_{}'):
-                delattr(self, inalias.format(i))
+                if memokey is not None:
+                    memo[memokey] = (self, _memokeep(self))
 
-        # update min periods of lines after calculations and replicate
-        self.outputs._update_minperiod()
-        self._minperiods = self.outputs._minperiods
-        self._minperiod = self.outputs._minperiod
+            if self._unbounded_ and not toplevel:  # the caller depends on it
+                metadata.callstack[-1]._unbounded_ = True
+
+        finally:  # also if the calculation fails
+            if toplevel and not metadata.memoscope:
+                metadata.memo = None  # top-level call done, release the memo
 
-        metadata.callstack.pop()  # let ind know hwere in the stack
+        if out is not None:  # a copy, the memo may hold the indicator
+            self = cls._into(self, out)
 
         # set def return value, but consider stack depth and user pref
         ret = self
         if not metadata.callstack:  # top-of the stack, ret following prefs
             if config.get_return_dataframe():
                 ret = self.df
+            elif config.get_return_trimmed():
+                ret = self.trimmed  # only valid values, starting at begidx
 
         return ret  # Return itself for now
 
+    def _execute(cls, self, args, kwargs):
+        # All boilerplate is done, to into execution mode
+        self._callargs_ = args, kwargs  # to calculate again (see update)
+        metadata.callstack.append(self)  # let ind know hwere in the stack
+        try:
+            # Auto-call base classes
+            for b_init in cls._inits_:
+                b_init(self, *args, **kwargs)
+
+            # aliases only meant for operational purposes are no longer
+            # available
+            self._calculated_ = True
+
+            if self._dtype_ is not None:  # make sure outputs carry the dtype
+                for output in self.outputs:
+                    output._astype(self._dtype_)
+
+            # update min periods of lines after calculations and replicate
+            self.outputs._update_minperiod()
+            self._minperiods = self.outputs._minperiods
+            self._minperiod = self.outputs._minperiod
+
+        finally:  # also if the calculation fails
+            metadata.callstack.pop()  # let ind know hwere in the stack
+
     def _regenerate_inputs(cls, inputs):
         meta.inputs._generate(cls, cls.__bases__, {'inputs': inputs})
+        _install_aliases(cls)
 
 
 class Indicator(meta.linesholder.LinesHolder, metaclass=MetaIndicator):
-    # Base class for any indicator. The heavy lifting to ensure consistency is
-    # done by the metaclass.
+    '''
+    Base class for any indicator. Besides the inputs and params, the
+    calculation takes:
+
+      - out: arrays (a dict keyed by output name/alias or a sequence in the
+        order of the outputs, None to skip one) holding the values of the
+        outputs. Outputs which end in a pending operation on lines
+        (arithmetic, comparisons, ...) are evaluated directly in the arrays.
+        The values of the others (kernels, rolling windows, `_ewm`, ...) are
+        calculated in their own arrays and then copied once into the given
+        ones
+
+      - state: the state of a previous calculation to continue from (see
+        `getstate`)
+    '''
+    # The heavy lifting to ensure consistency is done by the metaclass.
 
     _minperiod = 1
     _minperiods = [1]
+    _dtype_ = None  # None: float64 calculations without input conversion
+    _calculated_ = False  # operational aliases available until calculated
+    _unbounded_ = False  # values depend on all previous values (see update)
+    _callargs_ = (), {}  # args/kwargs besides inputs/params of the calc
+    _updbufs_ = None  # buffers owned by the indicator to append values
+    _seedstate_ = None  # state to continue from (see getstate)
+    _getstate = None  # method delivering the values of the state
+
+    # operational aliases for the inputs (datas/d, data) and outputs (lines/l)
+    datas = d = _Alias(lambda self: list(self.inputs), True)
+    data = _Alias(lambda self: self.inputs[0], True)
+    lines = l = _Alias(operator.attrgetter('outputs'), True)  # noqa: E741
 
     inputs = ('close',)  # default input to look for
 
@@ -198,6 +547,50 @@ class Indicator(meta.linesholder.LinesHolder, metaclass=MetaIndicator):
         # arg/kwargs to object.__init__ which would generate an error
         pass
 
+    def update(self, *args):
+        '''
+        Appends new values to the inputs, given like the inputs of the
+        indicator (for example the new rows of a DataFrame), and calculates
+        the outputs for them. Returns the indicator.
+
+        If the values only depend on a window of preceding values (`sma`,
+        `stochastic`, ...), only the new values are calculated, with the
+        values of the window. Indicators with recursive definitions or
+        accumulated values (`ema`, `obv`, ...) are calculated again over all
+        values.
+        '''
+        return self.__class__._update(self, args)
+
+    def getstate(self):
+        '''
+        Returns the recurrence state (see `State`) at the end of the
+        calculation, to seed a later calculation of the same indicator (with
+        `state=...`) on the values which follow, without any warm-up.
+
+        Only indicators with a recurrence (`ema`, `obv`, `sar`, ...) deliver
+        it, once the values reach their minimum period (the warm-up)
+        '''
+        if self._getstate is None:
+            errors.StateNotSupported(self.__class__.__name__)  # raise error
+
+        if self.outputs.size < self._minperiod:  # warm-up not done
+            errors.StateWarmup(self.__class__.__name__, self.outputs.size,
+                               self._minperiod)  # raise error
+
+        return State(self.__class__.__name__, self.params, self._getstate())
+
+    @classmethod
+    def stream(cls, **kwargs):
+        '''
+        Returns a `Stream` which calculates the indicator (with the params
+        given as kwargs) one value at a time, pushing the new value of each
+        input with `push`, which returns the new value of the output.
+
+        Only indicators calculated on windows of values (`sma`, `stddev`,
+        `max`, `williamsr`, `mfi`, ...) can be streamed
+        '''
+        return stream.Stream(cls, **kwargs)
+
     _talib_ = False
 
     def _talib(self, kwdict):
@@ -8,6 +8,7 @@ from numpy import nan as NaN  # noqa: F401
 
 # Internal objects to work in INdicator development
 from .. import Indicator  # noqa: F401
+from .. import kernels  # noqa: F401
 from ..utils import *  # noqa: F401 F403
 
 # Price Transform
@@ -39,6 +40,7 @@ from .t3 import *  # noqa: F401 F403
 
 from .mavp import *  # noqa: F401 F403
 
+from .ht import *  # noqa: F401 F403
 from .mama import *  # noqa: F401 F403
 from .ht_trendline import *  # noqa: F401 F403
 
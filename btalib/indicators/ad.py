@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, ema, ewma
+from . import Indicator, ema, ewma, kernels
 
 
 class ad(Indicator):
@@ -34,8 +34,16 @@ class ad(Indicator):
 
         mfm = (2.0 * self.i.close - self.i.high - self.i.low) / hilo
         mfv = mfm * self.i.volume  # money flow volume
+        state = self._seedstate_
+        if state is not None:  # continue the sum
+            self.o.ad = mfv._apply(kernels.nancumsum, state['ad'][0], raw=True)
+            return
+
         self.o.ad = mfv.cumsum()  # ad line
 
+    def _getstate(self):
+        return dict(ad=kernels.last_valid(self.o.ad._tail(), 0.0))
+
 
 class adosc(ad):
     '''
@@ -57,6 +65,8 @@ class adosc(ad):
         ('_ma', ema, 'Moving average to use'),
     )
 
+    _getstate = None  # the state of ad is not that of the oscillator
+
     def __init__(self):
         ma3 = self.p._ma(self.o.ad, period=self.p.pfast)
         ma10 = self.p._ma(self.o.ad, period=self.p.pslow)
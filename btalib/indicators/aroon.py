@@ -4,17 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator
-
-import numpy as np
-
-
-def _first_idx_highest(x):
-    return np.argmax(x[::-1])
-
-
-def _first_idx_lowest(x):
-    return np.argmin(x[::-1])
+from . import Indicator, kernels
 
 
 class _aroon(Indicator):
@@ -32,11 +22,14 @@ class _aroon(Indicator):
     def __init__(self):
         p = self.p.period
 
-        hhidx = self.i.high.rolling(window=p + 1).apply(_first_idx_highest)
-        self._aup = 100.0 - 100.0 * hhidx / p
+        # distance to the newest highest high/lowest low in p + 1 values
+        hhidx = self.i.high._apply(kernels.rolling_argmax, p + 1, newest=True,
+                                   raw=True)
+        self._aup = 100.0 * hhidx._period(p + 1, rolling=True) / p
 
-        llidx = self.i.low.rolling(window=p + 1).apply(_first_idx_lowest)
-        self._adn = 100.0 - 100.0 * llidx / p
+        llidx = self.i.low._apply(kernels.rolling_argmin, p + 1, newest=True,
+                                  raw=True)
+        self._adn = 100.0 * llidx._period(p + 1, rolling=True) / p
 
 
 class aroon(_aroon):
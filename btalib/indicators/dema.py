@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, ema
+from . import Indicator, ema, kernels
 
 
 class dema(Indicator):
@@ -30,6 +30,13 @@ class dema(Indicator):
     )
 
     def __init__(self):
+        if self.p._ma is ema and kernels.compiled():  # all emas in 1 pass
+            terms = [(1, 2.0), (2, -1.0)]
+            dema = self.i0._apply(kernels.ema_cascade, self.p.period, terms,
+                                  raw=True)
+            self.o.dema = dema._period(2 * (self.p.period - 1))
+            return
+
         ema1 = self.p._ma(self.i0, period=self.p.period)
         ema2 = self.p._ma(ema1, period=self.p.period)
         self.o.dema = 2.0 * ema1 - ema2
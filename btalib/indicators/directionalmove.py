@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, smma, truerange, SEED_SUM
+from . import Indicator, kernels, smma, truerange, SEED_SUM
 
 
 class smacc(Indicator):
@@ -48,9 +48,19 @@ class smacc(Indicator):
 
     def __init__(self):
         p = self.p.period
+        state = self._seedstate_
+        if state is not None:  # continue the accumulation, no seed
+            self.o.smacc = self.i0._apply(kernels.smoothing_filter, 1.0,
+                                          (p - 1) / p, state['smacc'][0],
+                                          raw=True)
+            return
+
         _ewm = self.i0._ewm(span=p, _pearly=self.p._pearly, _seed=self.p._seed)
         self.o.smacc = _ewm._lfilter(alpha=1.0, beta=(p - 1) / p)
 
+    def _getstate(self):
+        return dict(smacc=self.o.smacc[-1])
+
     def _talib(self, kwdict):
         '''Seed with 1 value less than the period and accumulate afterwards'''
         kwdict.setdefault('_pearly', True)
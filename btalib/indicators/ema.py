@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, SEED_AVG
+from . import Indicator, kernels, SEED_AVG
 
 # named argument poffset in __init__ below is for compatibility with ta-lib
 # broken MACD. When poffset > period, the delivery of the 1st valid value
@@ -35,5 +35,20 @@ class ema(Indicator):
     )
 
     def __init__(self, poffset=0):  # see above for poffset
+        state = self._seedstate_
+        if state is not None:  # continue the calculation, no seed
+            self.o.ema = self.i0._apply(kernels.ewm_mean, self._alpha(),
+                                        state['ema'][0], state['oldwt'][0],
+                                        raw=True)
+            return
+
         span, seed, poff = self.p.period, self.p._seed, poffset
         self.o.ema = self.i0._ewm(span=span, _seed=seed, _poffset=poff).mean()
+
+    def _alpha(self):
+        return 1.0 / (1.0 + (self.p.period - 1) / 2.0)  # as pandas for span
+
+    def _getstate(self):
+        ema, oldwt = kernels.ewm_state(self.i0._tail(), self.o.ema._tail(),
+                                       self._alpha())
+        return dict(ema=ema, oldwt=oldwt)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+from . import Indicator, kernels
+
+
+class _ht(Indicator):
+    '''
+    Ehlers' Hilbert Transform engine shared by the `ht_xxx` indicators and
+    `mama`. It runs the calculations once and delivers all intermediate
+    results as outputs, to be reused (see `memoize`) when several cycle
+    indicators are requested for the same inputs.
+
+    The outputs deliver no auto period (the values before the start of the
+    transform are 0.0) and are read-only, to be copied by the users before
+    modifying them.
+
+    Formula:
+      - From *"Rocket Science for Traders: Digital Signal Processing Applications"*
+    '''
+    group = 'cycle'
+    inputs = 'high', 'low'
+    allowinputs = 1
+    outputs = kernels.HTOUTPUTS
+    params = (
+        ('skip', 0, 'Values of the smoothed price skipped before the ht'),
+        ('phase', True, 'Calculate the phase, sine, trendline, trendmode'),
+    )
+
+    LOOKBACK_SMOOTH = 4
+    LOOKBACK_HT = 7
+    LOOKBACK_SMOOTH_EXTRA = LOOKBACK_HT - LOOKBACK_SMOOTH
+
+    def __init__(self):
+        # Choose p0, depending on passed number o inputs
+        p0 = (self.i.high + self.i.low) / 2.0 if len(self.i) > 1 else self.i0
+
+        # smooth p0
+        state = self._seedstate_
+        if state is None:
+            p0smooth = p0._fir([1.0, 2.0, 3.0, 4.0]) / 10.0
+            # Add the needed lookback for HT, not yet offered by the smoothing
+            p0smooth._period(self.LOOKBACK_SMOOTH_EXTRA)
+        else:  # continue after the last prices kept in the state
+            p0prev = state['price0'][-(self.LOOKBACK_SMOOTH - 1):]
+            p0smooth = p0._prepend(p0prev)._fir([1.0, 2.0, 3.0, 4.0]) / 10.0
+            p0smooth = p0._clone(p0smooth._tail(len(p0prev)))
+
+        results = p0smooth._applymulti(self._transform, p0, raw=True)
+        for name, result in zip(kernels.HTOUTPUTS, results):
+            setattr(self.o, name, result)
+
+    def _transform(self, price, price0):
+        # keep the end state of the transform (see getstate)
+        ht, self._htstate = kernels.hilbert_transform(
+            price, price0, skip=self.p.skip, phase=self.p.phase,
+            state=self._seedstate_, returnstate=True)
+
+        results = [ht[name] for name in kernels.HTOUTPUTS]
+        for r in results:
+            r.flags.writeable = False  # shared by the users
+
+        return results
+
+    def _getstate(self):
+        state = self._htstate
+        short = self.LOOKBACK_HT - 1 - len(self.i0)  # not seen by the ht
+        if self._seedstate_ is None and short > 0:
+            state = dict(state, pending=state['pending'] + short)
+
+        return state
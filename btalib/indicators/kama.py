@@ -4,9 +4,11 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, SumN
+from . import Indicator, SumN, kernels
 from . import SEED_AVG, SEED_LAST
 
+import numpy as np
+
 
 class kama(Indicator):
     '''
@@ -66,9 +68,13 @@ class kama(Indicator):
     )
 
     def __init__(self):
+        # with a state, the values kept in it precede the input
+        state = self._seedstate_
+        x = self.i0 if state is None else self.i0._prepend(state['history'])
+
         # Calculate components of effratio and the ratio itself
-        direction = self.i0.diff(periods=self.p.period)
-        volseries = self.i0.diff(periods=self.p._pvol)
+        direction = x.diff(periods=self.p.period)
+        volseries = x.diff(periods=self.p._pvol)
         volatility = SumN(volseries.abs(), period=self.p.period)
 
         effratio = (direction / volatility).abs()  # efficiency ratio
@@ -80,10 +86,26 @@ class kama(Indicator):
         # Calculate the "smoothing constant": alpha input for exp smoothing
         sc = (effratio * (scfast - scslow) + scslow).pow(2)
 
+        if state is not None:  # continue the mean with the sc of the input
+            alphas = sc._tail(len(state['history']))
+            self.o.kama = self.i0._apply(kernels.recursive_mean, alphas,
+                                         state['kama'][0], raw=True)
+            return
+
         # Get the _ewm window function and calculate the dynamic mean on it
         self.o.kama = self.i0._ewm(
             span=self.p.period, alpha=sc, _seed=self.p._seed)._mean()
 
+    def _getstate(self):
+        # the last kama and the input values needed for the next sc
+        # (continued from a state, the input follows the kept values)
+        nhist = self.p.period + self.p._pvol
+        history = self.i0._tail()
+        if self._seedstate_ is not None:
+            history = np.concatenate([self._seedstate_['history'], history])
+
+        return dict(kama=self.o.kama[-1], history=history[-nhist:])
+
     def _talib(self, kwdict):
         '''Apply las value as seed, instead of average of period values'''
         kwdict.setdefault('_seed', SEED_LAST)
@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, atan
+from . import Indicator, atan, kernels
 
 import numpy as np
 
@@ -69,8 +69,9 @@ class _linreg_base(Indicator):
         # Triangle formula below, else: s_xx = sum(pow(x, 2) for x in prange)
         s_xx = p1 * (p1 + 1) * (2*p1 + 1) / 6
 
-        pxdot = list(range(p0, p1 + 1))
-        s_xy = self.i0.rolling(window=p).apply(lambda x: x.dot(pxdot))
+        # sum(x * y) with x in [p0, p1]: sliding window sum, O(n)
+        s_xy = self.i0._apply(kernels.linear_window_sum, p, p0, raw=True)
+        s_xy._period(p, rolling=True)
 
         self._m = m = (p * s_xy - s_x * s_y) / (p * s_xx - s_x * s_x)
 
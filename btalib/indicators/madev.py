@@ -4,9 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, sma
-
-import numpy as np
+from . import Indicator, kernels, sma
 
 
 class mad(Indicator):
@@ -24,8 +22,7 @@ class mad(Indicator):
         ('_ma', sma, 'Moving Average to use'),
     )
 
-    _mad = lambda self, x: np.fabs(x - x.mean()).mean()  # noqa: E731
-
     def __init__(self, mean=None):
-        r = self.i0.rolling(window=self.p.period)  # get rolling win of period
-        self.o.meandev = r.apply(self._mad, raw=False)  # apply mean abs dev
+        p = self.p.period  # mean abs dev over strided windows of period
+        madev = self.i0._apply(kernels.rolling_mad, p, raw=True)
+        self.o.meandev = madev._period(p, rolling=True)
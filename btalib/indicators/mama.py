@@ -4,15 +4,12 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, arctan, SEED_ZERO
-
-import collections
-from math import atan
+from . import Indicator, arctan, SEED_ZERO, kernels
+from .ht import _ht
+from ..state import State
 
 import numpy as np
 
-RAD2DEG = 180.0 / (4.0 * atan(1))
-
 
 class mama(Indicator):
     '''
@@ -37,44 +34,55 @@ class mama(Indicator):
     )
 
     LOOKBACK_TOTAL = 33
-    LOOKBACK_SMOOTH = 4
-    LOOKBACK_HT = 7
+    LOOKBACK_HT = _ht.LOOKBACK_HT
     LOOKBACK_HT_SKIP = 0  # skip before applying ht
-    LOOKBACK_SMOOTH_EXTRA = LOOKBACK_HT - LOOKBACK_SMOOTH
     LOOKBACK_REST = LOOKBACK_TOTAL - LOOKBACK_HT
 
     def __init__(self):
         # Choose p0, depending on passed number o inputs
         p0 = (self.i.high + self.i.low) / 2.0 if len(self.i) > 1 else self.i0
 
-        # smooth p0
-        p0smooth = (4.0*p0 + 3.0*p0(-1) + 2.0*p0(-2) + 1.0*p0(-3)) / 10.0
-        # Add the needed lookback for HT, not yet offered by the smoothing
-        p0smooth._period(self.LOOKBACK_SMOOTH_EXTRA)
-
-        # zero-fill to ensure ht lookbacks deliver results (nan would break)
-        i1, q1 = p0smooth(val=0.0), p0smooth(val=0.0)
+        # with a state, the ht continues from the one kept in it
+        state, htstate = self._seedstate_, None
+        htparams = dict(skip=self.LOOKBACK_HT_SKIP, phase=False)
+        if state is not None:
+            htstate = State(_ht.__name__, htparams, {
+                k[3:]: v for k, v in state.values.items() if k[:3] == 'ht_'})
 
-        # use applymulti to get more than one result back
-        i1, q1 = p0smooth._applymulti(self._periodize, i1, q1, raw=True)
+        ht = self._htind = _ht(*self.i, state=htstate, **htparams)
+        i1, q1 = ht.o.inphase, ht.o.quadrature(val=None)  # q1 changes period
 
         # i1 carries a -3 from detrender and q1 a -6 (LOOKBACK_HT - 1). Add the
         # largest dominant to q1, because both work together now
-        q1._period(self.LOOKBACK_HT - 1)
+        if state is None:
+            q1._period(self.LOOKBACK_HT - 1)
 
         # where i1 == 0 fore arctan to return also 0, with Ehlers formula
         atanq1num = q1.mask(i1 == 0.0, 0.0)
-        phase = RAD2DEG * arctan(atanq1num / i1).fillna(0.0)
+        phase = kernels.RAD2DEG * arctan(atanq1num / i1).fillna(0.0)
 
         # ta-lib cals deltaphase starting as soon as phase has 1 value in spite
         # of using phase(-1) which would be void, but it is considered as
         # 0.0. Reduce the phase period by 1 and set the initial value to 0.
         # This behavior matches all other calculations in _speriodize
-        phase._period(-1, val=0.0)  # at minper rel idx 0 => 0.0
+        if state is None:
+            phase._period(-1, val=0.0)  # at minper rel idx 0 => 0.0
+        else:  # the last phase precedes the values
+            phase = phase._prepend(state['phase'])
 
+        self._phase = phase  # kept for the state
         deltaphase = (phase(-1) - phase).clip(lower=1.0)
         alpha = (self.p.fastlimit / deltaphase).clip(lower=self.p.slowlimit)
 
+        if state is not None:  # continue the means, no seed and no period
+            alpha = alpha._tail(1)
+            self.o.mama = mama = p0._apply(
+                kernels.recursive_mean, alpha, state['mama'][0], raw=True)
+            self.o.fama = mama._apply(
+                kernels.recursive_mean, alpha * 0.5, state['fama'][0],
+                raw=True)
+            return
+
         # span set to use p0, but let alpha dominate if period is greater
         _mama = p0._ewm(alpha=alpha, span=1, _seed=SEED_ZERO)._mean()
         # Add no span, to let the fama calculation use the entire _mama range
@@ -88,60 +96,11 @@ class mama(Indicator):
         self.o.mama = _mama
         self.o.fama = _fama
 
-    def _ht(self, x, adjperiod, i):
-        ht0 = 0.0962*x[i] + 0.5769*x[i - 2] - 0.5769*x[i - 4] - 0.0962*x[i - 6]
-        return ht0 * adjperiod
-
-    def _periodize(self, price, i1, q1):
-        # period 7 needed in _periodize for hilbert transform
-        # p0smooth has: 4 and needs additional 3 before applying  _periodize
-        # actual "return" values to be used in __init__ for phase calculations
-        LOOKBACK = self.LOOKBACK_HT
-        LOOKIDX = LOOKBACK - 1
-        LOOKSTART = LOOKIDX + self.LOOKBACK_HT_SKIP
-
-        # circular buffers for ht calcs
-        detrender = collections.deque([0.0] * LOOKBACK, maxlen=LOOKBACK)
-
-        # the first LOOKBACK elements of the input are ignored in the ta-lib
-        # calculations for the detrender. Nullify them.
-        price[0:LOOKSTART] = 0.0
-
-        i2, q2, re, im, period = 0.0, 0.0, 0.0, 0.0, 0.0
-
-        for i in range(LOOKSTART, len(price)):
-            adjperiod = 0.075*period + 0.54  # adj period_1 for ht transformx
-
-            detrender.append(self._ht(price, adjperiod, i))
-
-            # New detrender val pushed, append to the right -1 is actual value
-            i1[i] = i10 = detrender[-4]  # 3 periods ago: -2, -3, -4
-            q1[i] = q10 = self._ht(detrender, adjperiod, LOOKIDX)
-
-            ji = self._ht(i1, adjperiod, i)
-            jq = self._ht(q1, adjperiod, i)
-
-            i21, q21 = i2, q2  # keep for next round
-
-            i2 = i10 - jq
-            q2 = q10 + ji
-
-            i2 = 0.2*i2 + 0.8*i21  # smooth
-            q2 = 0.2*q2 + 0.8*q21  # smooth
-
-            re0 = i2*i21 + q2*q21
-            im0 = i2*q21 - q2*i21
-
-            re = 0.2*re0 + 0.8*re  # smooth
-            im = 0.2*im0 + 0.8*im  # smooth
-
-            period1 = period
-            period = 360 / (RAD2DEG*atan(im / re)) if re and im else period1
-            period = min(period, period1 * 1.5)
-            period = max(period, period1 * 0.67)
-            period = max(period, 6)
-            period = min(period, 50)
-            period = 0.2*period + 0.8*period1  # smooth
-
-        # return the results
-        return i1, q1
+    def _getstate(self):
+        # the state of the ht (prefixed) and the last values of the phase and
+        # of the means
+        htstate = self._htind.getstate()
+        state = {'ht_' + k: v for k, v in htstate.values.items()}
+        state.update(mama=self.o.mama[-1], fama=self.o.fama[-1],
+                     phase=self._phase[-1])
+        return state
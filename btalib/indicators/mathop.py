@@ -4,11 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator
-
-import itertools
-
-import numpy as np
+from . import Indicator, kernels
 
 
 # ## over the entire series
@@ -94,7 +90,9 @@ class max(Indicator):
     )
 
     def __init__(self):
-        self.o.max = self.i0.rolling(window=self.p.period).max()
+        p = self.p.period
+        hh = self.i0._apply(kernels.rolling_max, p, raw=True)
+        self.o.max = hh._period(p, rolling=True)
 
 
 class min(Indicator):
@@ -112,7 +110,9 @@ class min(Indicator):
     )
 
     def __init__(self):
-        self.o.min = self.i0.rolling(window=self.p.period).min()
+        p = self.p.period
+        ll = self.i0._apply(kernels.rolling_min, p, raw=True)
+        self.o.min = ll._period(p, rolling=True)
 
 
 class minmax(Indicator):
@@ -131,8 +131,10 @@ class minmax(Indicator):
     )
 
     def __init__(self):
-        self.o.min = min(self.i0, period=self.p.period)
-        self.o.max = max(self.i0, period=self.p.period)
+        p = self.p.period  # both extremes in a single pass
+        ll, hh = self.i0._applymulti(kernels.rolling_minmax, p, raw=True)
+        self.o.min = ll._period(p, rolling=True)
+        self.o.max = hh._period(p, rolling=True)
 
 
 class maxindex(Indicator):
@@ -150,18 +152,17 @@ class maxindex(Indicator):
         ('_absidx', False, 'Return maxindex over the entire period'),
     )
 
-    def _argmax(self, x):
-        return np.argmax(x) + (next(self._count) * self.p._absidx)
-
     def __init__(self):
-        i0rolling = self.i0.rolling(window=self.p.period)  # prep rolling win
+        p, absidx = self.p.period, self.p._absidx
+        idx = self.i0._apply(kernels.rolling_argmax, p, absolute=absidx,
+                             raw=True)
+        idx._period(p, rolling=True)
 
-        if not self.p._absidx:  # maxindex relative to window period
-            self.o.maxindex = i0rolling.apply(np.argmax)
+        if not absidx:  # maxindex relative to window period
+            self.o.maxindex = idx
         else:
             # maxindex is absolute with respect to all previous vals in array
-            self._count = itertools.count()  # help win rel-index => absolute
-            self.o.maxindex = i0rolling.apply(self._argmax)._series.fillna(0)
+            self.o.maxindex = idx.series.fillna(0)
             # using the raw _series resets period to 1, fillna fills as ta-lib
 
     def _talib(self, kwdict):
@@ -186,18 +187,17 @@ class minindex(Indicator):
         ('_absidx', False, 'Return maxindex over the entire period'),
     )
 
-    def _argmin(self, x):
-        return np.argmin(x) + (next(self._count) * self.p._absidx)
-
     def __init__(self):
-        i0rolling = self.i0.rolling(window=self.p.period)  # prep rolling win
+        p, absidx = self.p.period, self.p._absidx
+        idx = self.i0._apply(kernels.rolling_argmin, p, absolute=absidx,
+                             raw=True)
+        idx._period(p, rolling=True)
 
-        if not self.p._absidx:  # maxindex relative to window period
-            self.o.minindex = i0rolling.apply(np.argmin)
+        if not absidx:  # minindex relative to window period
+            self.o.minindex = idx
         else:
-            # maxindex is absolute with respect to all previous vals in array
-            self._count = itertools.count()  # help win rel-index => absolute
-            self.o.minindex = i0rolling.apply(self._argmin)._series.fillna(0)
+            # minindex is absolute with respect to all previous vals in array
+            self.o.minindex = idx.series.fillna(0)
             # using the raw _series resets period to 1, fillna fills as ta-lib
 
     def _talib(self, kwdict):
@@ -4,16 +4,18 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, sma
+from . import Indicator, sma, kernels
+
+import numpy as np
 
 
 def _mavp(closes, periods, **ma):
     # kwargs cannot have ints as keys, re-convert them
-    ma = {int(k): v for k, v in ma.items()}
-    for i, c in enumerate(closes):
-        closes[i] = ma[periods[i]][i]
-
-    return closes
+    uperiods = sorted(int(k) for k in ma)
+    mas = np.stack([ma[str(p)] for p in uperiods])  # row per period
+    # gather for each value the row of its period
+    rows = np.searchsorted(uperiods, periods)
+    return np.take_along_axis(mas, rows[np.newaxis], axis=0)[0]
 
 
 class mavp(Indicator):
@@ -28,6 +30,14 @@ class mavp(Indicator):
     It delivers for each timepoint "i", the value of the moving average
     dictated by period[i], at point it (movingaverage[i])
 
+    With the default `sma` all the windows are calculated together in a
+    single pass (see `kernels.variable_window_mean`). Any other moving average
+    is calculated in full once for each distinct period and the value for each
+    point is taken from the one with its period. The cost then grows with the
+    number of distinct periods. This is deliberate: recursive averages such as
+    `ema` depend on all previous values smoothed with their own period, and
+    cannot share a single pass
+
     Formula:
       - mavp[i] = MovingAverage(data, period[i])[i]
 
@@ -45,17 +55,24 @@ class mavp(Indicator):
     )
 
     def __init__(self):
-        periods = self.i.periods
+        periods = self.i.periods.astype(int)  # truncated like ta-lib does
         # restrict to min/max period
         periods = periods.clip(lower=self.p.minperiod, upper=self.p.maxperiod)
 
         # Calculate only the needed mas by getting the unique periods
         uperiods = periods.unique()  # capped and unique now
-        # use str(p) to be able to pass it as kwargs in _apply
-        ma = {str(p): self.p._ma(self.i.close, period=p) for p in uperiods}
 
         # ta-lib delivers at param "maxperiod" and not where already possible
         maxp = max(uperiods) if not self._talib_ else self.p.maxperiod
 
+        if self.p._ma is sma:  # all windows from a single pass of sums
+            mavp = self.i.close._apply(
+                kernels.variable_window_mean, periods, raw=True)
+            self.o.mavp = mavp._period(maxp, rolling=True, val=np.nan)
+            return
+
+        # use str(p) to be able to pass it as kwargs in _apply
+        ma = {str(p): self.p._ma(self.i.close, period=p) for p in uperiods}
+
         pclose = self.i.close._period(maxp, rolling=True)
         self.o.mavp = pclose._apply(_mavp, periods, raw=True, **ma)
@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, highest, lowest
+from . import Indicator, kernels
 
 
 class midprice(Indicator, inputs_override=True):
@@ -26,8 +26,10 @@ class midprice(Indicator, inputs_override=True):
     )
 
     def __init__(self):
-        hh = highest(self.i.high, period=self.p.period)
-        ll = lowest(self.i.low, period=self.p.period)
+        p = self.p.period  # lowest low and highest high in a single pass
+        ll, hh = self.i.low._applymulti(kernels.rolling_minmax, p, self.i.high,
+                                        raw=True)
+        ll, hh = ll._period(p, rolling=True), hh._period(p, rolling=True)
         self.o.midprice = (hh + ll) / 2.0
 
 
@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator
+from . import Indicator, kernels
 
 import numpy as np
 
@@ -40,6 +40,15 @@ class obv(Indicator):
     )
 
     def __init__(self):
+        state = self._seedstate_
+        if state is not None:  # continue the sum, after the kept closes
+            close = self.i.close._prepend(state['close'])
+            close1 = close.diff(periods=self.p._period).apply(np.sign)
+            vp = self.i.volume * close1._tail(len(state['close']))
+            self.o.obv = vp._apply(kernels.nancumsum, state['obv'][0],
+                                   raw=True)
+            return
+
         close1 = self.i.close.diff(periods=self.p._period)
 
         if self._talib_:  # ## black voodoo to overcome ta-lib errors
@@ -51,5 +60,15 @@ class obv(Indicator):
         # non-numpy alternative also one-line vectorized formulation
         # self.o.obv = (self.i.volume * (close1 / close1.abs())).cumsum()
 
+    def _getstate(self):
+        # the sum and the closes needed for the next comparisons
+        # (continued from a state, the input follows the kept closes)
+        obv = kernels.last_valid(self.o.obv._tail(), 0.0)
+        close = self.i.close._tail()
+        if self._seedstate_ is not None:
+            close = np.concatenate([self._seedstate_['close'], close])
+
+        return dict(obv=obv, close=close[-self.p._period:])
+
     def _talib(self, kwdict):
         '''Use first day volume as *positive* seed value'''
@@ -40,8 +40,9 @@ class rsi(Indicator):
     )
 
     def __init__(self):
-        upday = self.i0.diff(periods=self.p.lookback).clip(lower=0.0)
-        downday = self.i0.diff(periods=self.p.lookback).clip(upper=0.0).abs()
+        updown = self.i0.diff(periods=self.p.lookback)
+        upday = updown.clip(lower=0.0)
+        downday = updown.clip(upper=0.0).abs()
         maup = self.p._ma(upday, period=self.p.period)
         madown = self.p._ma(downday, period=self.p.period)
         rs = maup / madown
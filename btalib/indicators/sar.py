@@ -4,9 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator
-
-import numpy as np
+from . import Indicator, kernels
 
 
 class sar(Indicator):
@@ -35,50 +33,18 @@ class sar(Indicator):
     )
 
     def __init__(self):
-        sarbuf = self.i.high(val=np.nan)  # result buffer
-        sar = self.i.high._apply(self._sarize, self.i.low, sarbuf, raw=True)
-        self.o.sar = sar._period(1)  # the 1st bar is ignored in _sarize
-
-    def _sarize(self, high, low, sarbuf):
-        # kick start values
-        hi1, lo1 = high[0], low[0]
-        hi, lo = high[1], low[1]
-
-        # Calculate a minusdm of the 1st two values to set the trend
-        upmove, downmove = hi - hi1, lo1 - lo
-        minusdm = max(downmove, 0.0) * (downmove > upmove)
-        trend = not (minusdm > 0)  # initial trend, long if not downmove
-
-        # use the trend to set the first ep, sar values
-        ep, sar = (hi, lo1) if trend else (lo, hi1)
-
-        af, AF, AFMAX = self.p.af, self.p.af, self.p.afmax  # acceleration
+        sar = self.i.high._apply(self._sar, self.i.low, raw=True)
+        if self._seedstate_ is None:
+            sar = sar._period(1)  # the 1st bar is only a kick start
 
-        for i in range(1, len(high)):  # loop over
-            hi1, lo1 = hi, lo
-            hi, lo = high[i], low[i]
+        self.o.sar = sar
 
-            if trend:
-                if lo <= sar:  # trend reversal
-                    trend = 0
-                    sarbuf[i] = sar = ep  # update sar and annotate
-                    ep, af = lo, AF  # kickstart ep and af
-                    sar = max(sar + af * (ep - sar), hi, hi1)  # new sar
-                else:
-                    sarbuf[i] = sar  # no change, annotate current sar
-                    if hi > ep:  # if extreme breached
-                        ep, af = hi, min(af + AF, AFMAX)  # annotate, update af
-                    sar = min(sar + af * (ep - sar), lo, lo1)  # recalc sar
-            else:  # trend is 0
-                if hi >= sar:  # trend reversal
-                    trend = 1
-                    sarbuf[i] = sar = ep  # update sar and annotate
-                    ep, af = hi, AF  # kickstart ep and af
-                    sar = min(sar + af * (ep - sar), lo, lo1)
-                else:
-                    sarbuf[i] = sar
-                    if lo < ep:  # if extreme breached
-                        ep, af = lo, min(af + AF, AFMAX)  # annotate, update af
-                    sar = max(sar + af * (ep - sar), hi, hi1)
+    def _sar(self, high, low):
+        # keep the end state of the calculation (see getstate)
+        sar, self._sarstate = kernels.parabolic_sar(
+            high, low, self.p.af, self.p.afmax, state=self._seedstate_,
+            returnstate=True)
+        return sar
 
-        return sarbuf
+    def _getstate(self):
+        return self._sarstate
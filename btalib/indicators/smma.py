@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, SEED_AVG
+from . import Indicator, kernels, SEED_AVG
 
 
 class smma(Indicator):
@@ -37,5 +37,20 @@ class smma(Indicator):
     )
 
     def __init__(self):  # use data prepared by base class
+        state = self._seedstate_
+        if state is not None:  # continue the calculation, no seed
+            self.o.smma = self.i0._apply(kernels.ewm_mean, self._alpha(),
+                                         state['smma'][0], state['oldwt'][0],
+                                         raw=True)
+            return
+
         period, seed = self.p.period, self.p._seed
         self.o.smma = self.i0._ewm(com=period - 1, _seed=seed).mean()
+
+    def _alpha(self):
+        return 1.0 / (1.0 + (self.p.period - 1))  # as pandas for com
+
+    def _getstate(self):
+        smma, oldwt = kernels.ewm_state(self.i0._tail(), self.o.smma._tail(),
+                                        self._alpha())
+        return dict(smma=smma, oldwt=oldwt)
@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, sma, highest, lowest
+from . import Indicator, kernels, sma
 
 
 class stochf(Indicator):
@@ -39,8 +39,10 @@ class stochf(Indicator):
     )
 
     def __init__(self):
-        hh = highest(self.i.high, period=self.p.period)
-        ll = lowest(self.i.low, period=self.p.period)
+        p = self.p.period  # lowest low and highest high in a single pass
+        ll, hh = self.i.low._applymulti(kernels.rolling_minmax, p, self.i.high,
+                                        raw=True)
+        ll, hh = ll._period(p, rolling=True), hh._period(p, rolling=True)
         self.o.k = 100.0 * (self.i.close - ll) / (hh - ll)
         self.o.d = self.p._ma(self.o.k, period=self.p.pfast)
 
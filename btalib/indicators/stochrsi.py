@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, rsi, sma, highest, lowest
+from . import Indicator, kernels, rsi, sma
 
 
 class stochrsi(Indicator):
@@ -43,8 +43,11 @@ class stochrsi(Indicator):
         philo = self.p._philo or self.p.period  # set highest/lowest period
 
         r = rsi(self.i0, period=self.p.period)  # rsi
-        maxrsi = highest(r, period=philo)  # max in period
-        minrsi = lowest(r, period=philo)  # min in period
+        # min and max in period
+        minrsi, maxrsi = r.outputs.rsi._applymulti(kernels.rolling_minmax,
+                                                   philo, raw=True)
+        minrsi._period(philo, rolling=True)
+        maxrsi._period(philo, rolling=True)
         self.o.stochrsi = (r - minrsi) / (maxrsi - minrsi) * self.p._scale
 
         if _pfast:  # set by _talib. A 2nd output d will have been defined
@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, ema
+from . import Indicator, ema, kernels
 
 
 class gdema(Indicator):
@@ -28,6 +28,13 @@ class gdema(Indicator):
     )
 
     def __init__(self, _gd=False):  # _gd may be set by t3. Ingore it.
+        if self.p._ma is ema and kernels.compiled():  # all emas in 1 pass
+            terms = [(1, 1.0 + self.p.vfactor), (2, -self.p.vfactor)]
+            gd = self.i0._apply(kernels.ema_cascade, self.p.period, terms,
+                                raw=True)
+            self.o.gd = gd._period(2 * (self.p.period - 1))
+            return
+
         ema1 = self.p._ma(self.i0, period=self.p.period)
         ema2 = self.p._ma(ema1, period=self.p.period)
 
@@ -80,6 +87,13 @@ class t3(Indicator):
         c1 = -a3
         c2, c3, c4 = (3*a2 + 3*a3), (-6*a2 - 3*a - 3*a3), (1 + 3*a + a3 + 3*a2)
 
+        if kernels.compiled():  # all emas in 1 pass
+            terms = [(6, c1), (5, c2), (4, c3), (3, c4)]
+            t3 = self.i0._apply(kernels.ema_cascade, self.p.period, terms,
+                                raw=True)
+            self.o.t3 = t3._period(6 * (self.p.period - 1))
+            return
+
         ema1 = ema(self.i0, period=self.p.period)
         ema2 = ema(ema1, period=self.p.period)
         ema3 = ema(ema2, period=self.p.period)
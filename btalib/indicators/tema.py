@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, ema
+from . import Indicator, ema, kernels
 
 
 class tema(Indicator):
@@ -33,6 +33,13 @@ class tema(Indicator):
     )
 
     def __init__(self):
+        if self.p._ma is ema and kernels.compiled():  # all emas in 1 pass
+            terms = [(1, 3.0), (2, -3.0), (3, 1.0)]
+            tema = self.i0._apply(kernels.ema_cascade, self.p.period, terms,
+                                  raw=True)
+            self.o.tema = tema._period(3 * (self.p.period - 1))
+            return
+
         ema1 = self.p._ma(self.i0, period=self.p.period)
         ema2 = self.p._ma(ema1, period=self.p.period)
         ema3 = self.p._ma(ema2, period=self.p.period)
@@ -6,6 +6,8 @@
 ###############################################################################
 from . import Indicator, sma
 
+import numpy as np
+
 
 class trima(Indicator):
     '''
@@ -18,6 +20,8 @@ class trima(Indicator):
       - if period is even: p1, p2 = (p // 2) + 1, p //2
       - trima = sma(sma(data, p2), p1)
 
+    The double sma is calculated as a single weighted sum (triangular weights)
+
     See also:
       - https://www.tradingtechnologies.com/xtrader-help/x-study/technical-indicator-definitions/triangular-moving-average-trima/
     '''
@@ -36,4 +40,10 @@ class trima(Indicator):
         else:
             p1, p2 = (p // 2) + 1, p // 2
 
-        self.o.trima = sma(sma(self.i0, period=p2), period=p1)
+        if self.p._ma is not sma:
+            self.o.trima = self.p._ma(self.p._ma(self.i0, period=p2), period=p1)
+            return
+
+        # sma of sma in one pass: weights 1, 2, .. p2 (plateau) .. 2, 1
+        weights = np.convolve(np.ones(p2), np.ones(p1)) / (p1 * p2)
+        self.o.trima = self.i0._fir(weights)
@@ -4,7 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
-from . import Indicator, ema
+from . import Indicator, ema, kernels
 
 
 class trix(Indicator):
@@ -37,7 +37,13 @@ class trix(Indicator):
     )
 
     def __init__(self):
-        ema1 = self.p._ma(self.i0, period=self.p.period)
-        ema2 = self.p._ma(ema1, period=self.p.period)
-        ema3 = self.p._ma(ema2, period=self.p.period)
+        if self.p._ma is ema and kernels.compiled():  # all emas in 1 pass
+            ema3 = self.i0._apply(kernels.ema_cascade, self.p.period,
+                                  [(3, 1.0)], raw=True)
+            ema3._period(3 * (self.p.period - 1))
+        else:
+            ema1 = self.p._ma(self.i0, period=self.p.period)
+            ema2 = self.p._ma(ema1, period=self.p.period)
+            ema3 = self.p._ma(ema2, period=self.p.period)
+
         self.o.trix = 100.0 * (ema3 / ema3(-1) - 1.0)
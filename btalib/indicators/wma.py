@@ -6,8 +6,6 @@
 ###############################################################################
 from . import Indicator
 
-import numpy as np
-
 
 class wma(Indicator):
     '''
@@ -31,10 +29,6 @@ class wma(Indicator):
     )
 
     def __init__(self):
-        # pre-calculate coe
-        # weights = np.array([x for x in range(1, self.p.period + 1)])  # weights
-        weights = np.array(list(range(1, self.p.period + 1)))  # weights
-        _wma = lambda x: np.dot(x, weights)  # closure  # noqa: E731
-
+        weights = range(1, self.p.period + 1)  # oldest to newest value
         coef = 2.0 / (self.p.period * (self.p.period + 1))  # calc coef &
-        self.o.wma = coef * self.i0.rolling(window=self.p.period).apply(_wma)
+        self.o.wma = coef * self.i0._fir(weights)
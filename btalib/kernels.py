@@ -0,0 +1,1161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+from . import config
+
+import math
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+__all__ = []
+
+# Numeric kernels working on raw numpy arrays, to be used by indicators with
+# _apply(..., raw=True) or by the operations of lines. They deliver an array
+# of the same length as the input, with nan where no value can be calculated
+
+
+def _blocks(a, period, size):
+    # Returns a 2-d view of "a" (padded with 0s) with a row for each block of
+    # "size" consecutive windows of "period". A row holds the "period - 1"
+    # values before the block and the "size" values of the block
+    nwin = len(a) - period + 1
+    nblocks = -(-nwin // size)  # ceil
+    padded = np.zeros(nblocks * size + period - 1)
+    padded[:len(a)] = a
+    st = padded.strides[0]
+    return np.lib.stride_tricks.as_strided(
+        padded, shape=(nblocks, size + period - 1), strides=(size * st, st),
+        writeable=False,
+    )
+
+
+def _prefix(rows):
+    # prefix sums along the rows, with a leading 0 column
+    r = np.zeros((rows.shape[0], rows.shape[1] + 1))
+    np.cumsum(rows, axis=1, out=r[:, 1:])
+    return r
+
+
+def _badwindows(out, bad, period):
+    # windows of "period" values holding a bad value cannot be calculated
+    if bad.any():
+        nbad = np.cumsum(bad)
+        nbad[period:] -= nbad[:-period].copy()
+        out[nbad > 0] = np.nan
+
+
+def linear_window_sum(a, period, w0=1.0, dw=1.0):
+    '''
+    Rolling sum over "period" values weighted linearly along the window:
+
+      - sum(a[i - period + 1 + k] * (w0 + k * dw) for k in range(period))
+
+    It is calculated in O(n) from prefix sums of the values and of the values
+    weighted by their position. The prefix sums are restarted for blocks of
+    windows and the values of a block are centered on their mean, to keep the
+    magnitudes (and the rounding errors) of the sums in the order of those of
+    the windows.
+
+    The first "period - 1" values and windows with non-finite values are nan
+    '''
+    a = np.asarray(a, dtype=np.float64)
+    n = len(a)
+    out = np.full(n, np.nan)
+    if n < period or period < 1:
+        return out
+
+    bad = ~np.isfinite(a)
+    if bad.any():
+        a = np.where(bad, 0.0, a)
+
+    size = 4 * period  # windows per block
+    rows = _blocks(a, period, size)
+
+    # center the rows on their mean, added back at the end as mean * sum(w)
+    mean = rows.mean(axis=1, keepdims=True)
+    rows = rows - mean
+
+    # windows of a row: [start, start + period) for start in [0, size)
+    s = _prefix(rows)
+    sy = s[:, period:] - s[:, :size]  # sum of the values of each window
+
+    # sum(j * y_j) with j the position in the row
+    s = _prefix(rows * np.arange(rows.shape[1]))
+    r = s[:, period:] - s[:, :size]
+
+    # with k = j - start: sum((w0 + k * dw) * y) = dw * sum(j * y_j) +
+    # (w0 - start * dw) * sum(y)
+    if dw != 1.0:
+        r *= dw
+
+    sy *= w0 - dw * np.arange(size)
+    r += sy
+    r += mean * (period * w0 + dw * period * (period - 1) / 2.0)
+    out[period - 1:] = r.ravel()[:n - period + 1]
+
+    _badwindows(out, bad, period)
+
+    return out
+
+
+FIR_DIRECT = 8  # up to this number of weights: sum of shifted views
+FIR_FFT = 256  # from this number of weights on: fft convolution
+
+
+def fir(a, weights):
+    '''
+    Finite impulse response filter: rolling weighted sum over the last
+    len(weights) values, with the weights ordered from the oldest to the
+    newest value of the window
+
+      - sum(a[i - p + 1 + k] * weights[k] for k in range(p))
+
+    The algorithm depends on the weights:
+
+      - Few weights: the sum of the weighted shifted values, added from the
+        newest to the oldest (as a hand-written expression would do)
+      - Linear weights (constant difference): `linear_window_sum` in O(n)
+      - Else: direct convolution or fft convolution for long windows
+
+    The first "p - 1" values and the windows with nan values are nan
+    '''
+    a = np.asarray(a, dtype=np.float64)
+    w = np.asarray(weights, dtype=np.float64)
+    n, p = len(a), len(w)
+    out = np.full(n, np.nan)
+    if n < p or not p:
+        return out
+
+    if p <= FIR_DIRECT:
+        r = out[p - 1:]
+        np.multiply(a[p - 1:], w[-1], out=r)
+        for k in range(p - 2, -1, -1):
+            r += w[k] * a[k:n - p + 1 + k]
+
+        return out
+
+    dw = w[1] - w[0]
+    if np.all(np.diff(w) == dw):
+        return linear_window_sum(a, p, w[0], dw)
+
+    if p < FIR_FFT:  # nan only propagates to the windows which hold it
+        out[p - 1:] = np.convolve(a, w[::-1], mode='valid')
+        return out
+
+    bad = ~np.isfinite(a)
+    if bad.any():
+        a = np.where(bad, 0.0, a)
+
+    nfft = 1 << (n + p - 2).bit_length()  # power of 2 >= n + p - 1
+    r = np.fft.irfft(np.fft.rfft(a, nfft) * np.fft.rfft(w[::-1], nfft), nfft)
+    out[p - 1:] = r[p - 1:n]
+
+    _badwindows(out, bad, p)
+
+    return out
+
+
+def _block_argmax(b, newest):
+    # running argmax (position in the row) along the rows of b. Ties go to
+    # the newest (rightmost) position if newest is True, else to the oldest
+    runmax = np.maximum.accumulate(b, axis=1)
+    isnew = np.ones(b.shape, dtype=bool)
+    if newest:
+        np.greater_equal(b[:, 1:], runmax[:, :-1], out=isnew[:, 1:])
+    else:
+        np.greater(b[:, 1:], runmax[:, :-1], out=isnew[:, 1:])
+
+    idx = np.where(isnew, np.arange(b.shape[1]), 0)
+    return runmax, np.maximum.accumulate(idx, axis=1)  # forward fill
+
+
+def rolling_argmax(a, period, newest=False, absolute=False):
+    '''
+    Rolling position of the maximum over "period" values, relative to the
+    start of the window (0 is the oldest value) or the absolute position in
+    the array if absolute is True. Ties go to the oldest position (as
+    np.argmax does) unless newest is True
+
+    It is calculated in O(n) with the van Herk/Gil-Werman decomposition: the
+    array is split in blocks of "period" values and each window is made up
+    of the tail of a block (running maximum from the right) and the head of
+    the next block (running maximum from the left)
+
+    The first "period - 1" values and windows with non-finite values are nan
+    '''
+    a = np.asarray(a, dtype=np.float64)
+    n = len(a)
+    out = np.full(n, np.nan)
+    if n < period or period < 1:
+        return out
+
+    bad = ~np.isfinite(a)
+    nblocks = -(-n // period)
+    b = np.full(nblocks * period, -np.inf)
+    b[:n] = a
+    b[:n][bad] = -np.inf
+    b = b.reshape(nblocks, period)
+
+    # head: running max from the left, position in the block
+    hmax, hidx = _block_argmax(b, newest)
+    hidx += np.arange(0, nblocks * period, period)[:, None]  # to absolute
+
+    # tail: running max from the right. Reversed, the oldest is the newest
+    tmax, tidx = _block_argmax(b[:, ::-1], not newest)
+    tmax, tidx = tmax[:, ::-1], (period - 1) - tidx[:, ::-1]
+    tidx += np.arange(0, nblocks * period, period)[:, None]
+
+    # window [i - period + 1, i]: tail at the start, head at the end
+    hmax, hidx = hmax.ravel()[period - 1:n], hidx.ravel()[period - 1:n]
+    tmax, tidx = tmax.ravel()[:n - period + 1], tidx.ravel()[:n - period + 1]
+    usehead = (hmax >= tmax) if newest else (hmax > tmax)
+    r = np.where(usehead, hidx, tidx)
+    if not absolute:
+        r -= np.arange(n - period + 1)
+
+    out[period - 1:] = r
+
+    _badwindows(out, bad, period)
+
+    return out
+
+
+def rolling_argmin(a, period, newest=False, absolute=False):
+    '''
+    Rolling position of the minimum over "period" values. See rolling_argmax
+    '''
+    return rolling_argmax(np.negative(a, dtype=np.float64), period,
+                          newest=newest, absolute=absolute)
+
+
+def _window_max(rows, period):
+    # maximum of each window of "period" values along the rows (2-d, without
+    # nan) with the van Herk/Gil-Werman decomposition. O(1) per value
+    k, n = rows.shape
+    nblocks = -(-n // period)
+    b = np.full((k, nblocks * period), -np.inf)
+    b[:, :n] = rows
+    b = b.reshape(k, nblocks, period)
+
+    head = np.maximum.accumulate(b, axis=2).reshape(k, -1)
+    tail = np.maximum.accumulate(b[:, :, ::-1], axis=2)[:, :, ::-1]
+    tail = tail.reshape(k, -1)
+    return np.maximum(tail[:, :n - period + 1], head[:, period - 1:n])
+
+
+def _rolling_max(arrays, period):
+    # rolling max of each array in a single traversal. nan for the warm-up
+    # and for the windows holding a non-finite value
+    rows = np.array(arrays, dtype=np.float64, ndmin=2)
+    k, n = rows.shape
+    out = np.full((k, n), np.nan)
+    if n < period or period < 1:
+        return out
+
+    bad = ~np.isfinite(rows)
+    rows[bad] = -np.inf
+    out[:, period - 1:] = _window_max(rows, period)
+    for o, b in zip(out, bad):
+        _badwindows(o, b, period)
+
+    return out
+
+
+def rolling_max(a, period):
+    '''
+    Rolling maximum over "period" values. See rolling_minmax
+    '''
+    return _rolling_max([a], period)[0]
+
+
+def rolling_min(a, period):
+    '''
+    Rolling minimum over "period" values. See rolling_minmax
+    '''
+    return -_rolling_max([np.negative(a, dtype=np.float64)], period)[0]
+
+
+def rolling_minmax(a, period, b=None):
+    '''
+    Rolling minimum of "a" and rolling maximum of "b" (or "a" if None) over
+    "period" values, calculated together in a single traversal with the van
+    Herk/Gil-Werman decomposition: the values are split in blocks of
+    "period" and the extreme of a window is that of the running extremes
+    from the right of a block and from the left of the next block.
+
+    Returns a tuple (min, max). The first "period - 1" values and windows
+    with non-finite values are nan
+    '''
+    b = a if b is None else b
+    lo, hi = _rolling_max([np.negative(a, dtype=np.float64), b], period)
+    return -lo, hi
+
+
+CHUNKSIZE = 1 << 16  # elements of 2-d window views calculated at once
+
+
+def rolling_mad(a, period):
+    '''
+    Rolling mean absolute deviation over "period" values
+
+      - mean(abs(window - mean(window)))
+
+    The windows are strided views of the values, calculated in chunks of
+    windows to keep the temporary arrays small
+
+    The first "period - 1" values and windows with non-finite values are nan
+    '''
+    a = np.array(a, dtype=np.float64)  # contiguous copy, modified below
+    n = len(a)
+    out = np.full(n, np.nan)
+    if n < period or period < 1:
+        return out
+
+    bad = ~np.isfinite(a)
+    a[bad] = 0.0
+
+    nwin = n - period + 1
+    step = -(-CHUNKSIZE // period)  # windows per chunk
+    st = a.strides[0]
+    for i0 in range(0, nwin, step):
+        i1 = min(i0 + step, nwin)
+        w = np.lib.stride_tricks.as_strided(
+            a[i0:], shape=(i1 - i0, period), strides=(st, st),
+            writeable=False,
+        )
+        dev = w - w.mean(axis=1, keepdims=True)
+        np.fabs(dev, out=dev)
+        dev.mean(axis=1, out=out[period - 1 + i0:period - 1 + i1])
+
+    _badwindows(out, bad, period)
+    return out
+
+
+def variable_window_mean(a, periods):
+    '''
+    Mean of the last "periods[i]" values for each value "i", where "periods"
+    has the same length as "a" (a moving average with a period per value)
+
+    A single pass of prefix sums delivers the sums of all windows, which are
+    gathered with the period of each value. As in `linear_window_sum`, the
+    prefix sums are restarted for blocks of windows and the values of a block
+    are centered on their mean, to keep the rounding errors small
+
+    Values with less than "periods[i]" values (or a period less than 1) and
+    windows with non-finite values are nan
+    '''
+    a = np.asarray(a, dtype=np.float64)
+    periods = np.asarray(periods, dtype=np.intp)
+    n = len(a)
+    out = np.full(n, np.nan)
+    if not n:
+        return out
+
+    idx = np.arange(n)
+    ok = (periods >= 1) & (periods <= idx + 1)
+    if not ok.any():
+        return out
+
+    p = np.where(ok, periods, 1)  # safe values for the gathering below
+    maxp = int(p.max())
+
+    bad = ~np.isfinite(a)
+    if bad.any():
+        a = np.where(bad, 0.0, a)
+
+    # leading 0s, to have all windows ending in a value in the same block
+    size = 4 * maxp  # windows per block
+    rows = _blocks(np.concatenate([np.zeros(maxp - 1), a]), maxp, size)
+    mean = rows.mean(axis=1)
+    s = _prefix(rows - mean[:, np.newaxis]).ravel()
+
+    # window ending at value i: block i // size, ending in the row at i % size
+    # + maxp - 1, i.e. ending before the position i % size + maxp of s
+    blk, k = np.divmod(idx, size)
+    end = blk * (size + maxp) + k + maxp
+    r = (s[end] - s[end - p]) / p + mean[blk]
+    out[ok] = r[ok]
+
+    if bad.any():
+        nbad = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(bad, out=nbad[1:])
+        out[nbad[idx + 1] > nbad[idx + 1 - p]] = np.nan
+
+    return out
+
+
+def nancumsum(a, start=0.0):
+    '''
+    Cumulative sum of "a" (starting with "start") which skips the nan values,
+    delivered as nan
+    '''
+    a = np.asarray(a, dtype=np.float64)
+    out = np.nancumsum(np.concatenate([[start], a]))[1:]
+    out[np.isnan(a)] = np.nan
+    return out
+
+
+def last_valid(a, default=np.nan):
+    '''
+    Returns the last value of "a" which is not nan ("default" if none)
+    '''
+    valid = np.flatnonzero(~np.isnan(a))
+    return a[valid[-1]] if len(valid) else default
+
+
+# kernels delivering values which depend only on a window of values ending at
+# each position, and not on the start of the array. An indicator calculated
+# only with them can be updated by calculating only the new values (with the
+# preceding window of values). See Indicator.update
+WINDOWED = {
+    fir, linear_window_sum, rolling_argmax, rolling_argmin, rolling_max,
+    rolling_min, rolling_minmax, rolling_mad, variable_window_mean,
+}
+
+
+# Recursive definitions cannot be vectorized without altering the rounding of
+# the results. The loops below are the reference implementation on numpy
+# arrays, which is compiled with numba if available (and enabled in config).
+# Else the same loop runs on lists of floats, which python iterates faster
+# than numpy arrays, with the same results. The loops take first the arrays
+# they fill in place
+
+def _recursive_mean(x, alpha):
+    prev = x[0]
+    for i in range(1, len(x)):
+        x[i] = prev = prev + alpha[i - 1] * (x[i] - prev)
+
+
+def _exp_smoothing(x, alpha, beta):
+    prev = x[0]
+    for i in range(1, len(x)):
+        x[i] = prev = beta * prev + alpha * x[i]
+
+
+_JITTED = {}
+
+
+def compiled():
+    '''
+    Returns True if the loops are compiled (numba is available and enabled)
+    '''
+    return numba is not None and config.get_jit()
+
+
+def _recurse(loop, outs, *args):
+    # runs loop filling the float64 arrays in outs, taking also args
+    if compiled():
+        try:
+            jitted = _JITTED[loop]
+        except KeyError:
+            jitted = _JITTED[loop] = numba.njit(nogil=True)(loop)
+
+        jitted(*outs, *args)
+        return
+
+    louts = [out.tolist() for out in outs]
+    args = [a.tolist() if isinstance(a, np.ndarray) else a for a in args]
+    loop(*louts, *args)
+    for out, lout in zip(outs, louts):
+        out[:] = lout
+
+
+def recursive_mean(x, alpha, start=None):
+    '''
+    Mean with a smoothing factor which changes with each value (as in kama)
+
+      - y[0] = x[0]
+      - y[i] = y[i - 1] + alpha[i - 1] * (x[i] - y[i - 1])
+
+    "alpha" holds the factors for x[1:] (values without factor are left
+    untouched). Returns the result in "x" if it is a float64 array, which is
+    modified in place
+
+    If "start" is given, it is the previous result (y[-1]) of a calculation
+    which is continued and "alpha" holds the factors for all values of x.
+    Returns then a new array
+    '''
+    if start is not None:
+        x = np.concatenate([[start], x])
+        return recursive_mean(x, alpha)[1:]
+
+    x = np.asarray(x, dtype=np.float64)
+    alpha = np.asarray(alpha, dtype=np.float64)
+    n = min(len(x), len(alpha) + 1)  # values with a factor
+    if n:
+        _recurse(_recursive_mean, [x[:n]], alpha[:n - 1])
+
+    return x
+
+
+def exp_smoothing(x, alpha, beta=None):
+    '''
+    Exponential smoothing with constant factors (beta is 1 - alpha if None)
+
+      - y[0] = x[0]
+      - y[i] = beta * y[i - 1] + alpha * x[i]
+
+    Returns the result in "x" if it is a float64 array, which is modified in
+    place
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    if not beta:
+        beta = 1.0 - alpha
+
+    if len(x):
+        _recurse(_exp_smoothing, [x], float(alpha), float(beta))
+
+    return x
+
+
+SCANBLOCK = 64  # values per block in exp_smoothing_scan
+
+
+def _scan(v, beta):
+    # y[i] = beta * y[i - 1] + v[i] (y[-1] = 0) for finite values. Inside the
+    # blocks, a product with the matrix of the powers of beta. The values
+    # carried from block to block are a smoothing of the block ends with
+    # factor beta**SCANBLOCK: the same problem, with less values
+    n, size = len(v), SCANBLOCK
+    nblocks = -(-n // size)  # ceil
+    rows = np.zeros((nblocks, size))
+    rows.ravel()[:n] = v
+
+    k = np.arange(size)
+    expo = k[:, np.newaxis] - k  # j - k for y[j] <= v[k]
+    powers = np.where(expo >= 0, beta ** np.maximum(expo, 0), 0.0)
+    y = rows @ powers.T
+
+    if nblocks > 1:
+        carry = _scan(y[:, -1], beta ** size)
+        y[1:] += carry[:-1, np.newaxis] * beta ** (k + 1)
+
+    return y.ravel()[:n]
+
+
+def exp_smoothing_scan(x, alpha, beta=None):
+    '''
+    Same as `exp_smoothing`, calculated with numpy operations on blocks of
+    values instead of a loop, for when neither scipy (lfilter) nor numba are
+    available. The results differ from those of the loop only in rounding.
+
+    Returns a new array
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    if not beta:
+        beta = 1.0 - alpha
+
+    out = x * alpha
+    if not len(x):
+        return out
+
+    out[0] = x[0]  # y[0] = x[0]
+
+    # from the 1st non-finite value on: all nan, else (inf) run the loop
+    bad = ~np.isfinite(out)
+    f = np.argmax(bad) if bad.any() else len(x)
+    out[:f] = _scan(out[:f], beta) if f else out[:f]
+    if f < len(x):
+        if np.isnan(out[f]):
+            out[f:] = np.nan
+        else:
+            tail = x[f - 1:].copy()
+            tail[0] = out[f - 1]  # last finite result
+            exp_smoothing(tail, alpha, beta)
+            out[f:] = tail[1:]
+
+    return out
+
+
+def smoothing_filter(x, alpha, beta=None, start=None):
+    '''
+    Same as `exp_smoothing`, with scipy's lfilter if available, else with the
+    loop if compiled or with `exp_smoothing_scan`
+
+    If "start" is given, it is the previous result (y[-1]) of a calculation
+    which is continued: y[0] = beta * start + alpha * x[0]
+
+    "x" may be modified in place
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    if not beta:
+        beta = 1.0 - alpha
+
+    try:
+        import scipy.signal
+    except ImportError:  # if not available use tight loop or scan
+        if start is not None:
+            x = np.concatenate([[start], x])
+
+        if compiled():
+            y = exp_smoothing(x, alpha, beta)
+        else:
+            y = exp_smoothing_scan(x, alpha, beta)
+
+        return y if start is None else y[1:]
+
+    if start is not None:  # the state of the filter is beta * y[-1]
+        y, _ = scipy.signal.lfilter([alpha], [1.0, -beta], x,
+                                    zi=[beta * start])
+        return y
+
+    # Initial conditions "ic" can be used for the calculation, the next two
+    # lines detail that. A simple scaling of x[0] achieves the same in the
+    # 1-d case
+    # zi = lfiltic([alpha], [1.0, -beta], y=[x[0]])
+    # x[1:], _ = lfilter([alpha], [1.0, -beta], x[1:], zi=zi)
+    x[0] /= alpha  # scale start val, descaled in 1st op by alpha
+    return scipy.signal.lfilter([alpha], [1.0, -beta], x)
+
+
+def _ema_cascade(out, weighted, oldwt, x, alpha, order, coefs):
+    # Chain of ewm stages (with the semantics of pandas ewm(adjust=False) for
+    # nan values) fed with x. weighted/oldwt: state of each stage, updated.
+    # out: combination of the stage outputs, in the order given by "order"
+    factor = 1.0 - alpha
+    nstages = len(weighted)
+    for i in range(len(x)):
+        cur = x[i]
+        for k in range(nstages):
+            w = weighted[k]
+            if w == w:
+                old = oldwt[k] * factor
+                if cur == cur:
+                    if w != cur:
+                        w = (old * w + alpha * cur) / (old + alpha)
+                    old = 1.0
+
+                oldwt[k] = old
+            elif cur == cur:
+                w = cur
+
+            weighted[k] = cur = w  # output of stage k, input of k + 1
+
+        r = coefs[0] * weighted[order[0]]
+        for j in range(1, len(order)):
+            r = r + coefs[j] * weighted[order[j]]
+
+        out[i] = r
+
+
+def ema_cascade(x, period, terms):
+    '''
+    Combination of chained exponential moving averages of x in a single pass,
+    as used by dema, tema, trix, t3, ...
+
+      - ema1 = ema(x, period), ema2 = ema(ema1, period), ...
+      - result = sum(coef * ema_stage for stage, coef in terms)
+
+    "terms" is a sequence of (stage, coef) pairs (stage 1 is ema1), added in
+    the given order. Each stage is seeded with the mean of the first "period"
+    values of its input (as ta-lib does) and the values are bit for bit those
+    of the chained emas. Only the combination is kept in memory.
+
+    The first "maxstage * (period - 1)" values are nan
+
+    The loop only pays off compiled with numba: the indicators use it only
+    then (see `config.set_jit`) and chain the emas otherwise
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    out = np.full(n, np.nan)
+
+    stages, coefs = zip(*terms)
+    nstages = max(stages)
+    order = np.array(stages, dtype=np.intp) - 1
+    coefs = np.array(coefs, dtype=np.float64)
+
+    sidx = nstages * (period - 1)  # index of the seed of the last stage
+    if n <= sidx:
+        return out
+
+    # alpha as calculated by pandas for a span
+    alpha = 1.0 / (1.0 + (period - 1) / 2.0)
+
+    weighted, oldwt = np.empty(nstages), np.ones(nstages)
+    one, ident = np.ones(1), np.zeros(1, dtype=np.intp)  # a stage as is
+
+    # warm-up: stage by stage up to the seed of the last stage. The stage
+    # outputs replace the values of the input in u
+    u = x[:sidx + 1].copy()
+    with np.errstate(all='ignore'):
+        for k in range(nstages):
+            s0, s1 = k * (period - 1), (k + 1) * (period - 1)  # input, seed
+            seg = u[s0:s0 + period]
+            count = np.count_nonzero(~np.isnan(seg))
+            seed = np.nansum(seg) / count if count else np.nan
+
+            w, ow = np.array([seed]), np.ones(1)
+            u[s1] = seed
+            _recurse(_ema_cascade, [u[s1 + 1:], w, ow], u[s1 + 1:], alpha,
+                     ident, one)
+            weighted[k], oldwt[k] = w[0], ow[0]
+
+        r = coefs[0] * weighted[order[0]]
+        for j in range(1, len(order)):
+            r = r + coefs[j] * weighted[order[j]]
+
+        out[sidx] = r
+
+        _recurse(_ema_cascade, [out[sidx + 1:], weighted, oldwt],
+                 x[sidx + 1:], alpha, order, coefs)
+
+    return out
+
+
+def ewm_mean(x, alpha, weighted=np.nan, oldwt=1.0):
+    '''
+    Exponential moving average of x with the semantics of pandas
+    ewm(alpha=alpha, adjust=False).mean() for nan values, continuing from the
+    state (see `ewm_state`) of a previous calculation: "weighted", the last
+    average and "oldwt", the weight of that average.
+
+    The defaults start a new calculation
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    out = np.empty(len(x))
+    if len(x):
+        state = [np.array([weighted], dtype=np.float64),
+                 np.array([oldwt], dtype=np.float64)]
+        one, ident = np.ones(1), np.zeros(1, dtype=np.intp)  # a stage as is
+        with np.errstate(all='ignore'):
+            _recurse(_ema_cascade, [out, *state], x, float(alpha), ident, one)
+
+    return out
+
+
+def ewm_state(x, mean, alpha):
+    '''
+    Returns the state (weighted, oldwt) at the end of the exponential moving
+    average "mean" of "x" (see `ewm_mean`), to continue the calculation
+    '''
+    weighted = mean[-1] if len(mean) else np.nan
+    oldwt = 1.0
+    if weighted == weighted:  # the weight decays with the trailing nans
+        for i in range(len(x) - 1, -1, -1):
+            if x[i] == x[i]:
+                break
+
+            oldwt *= 1.0 - alpha
+
+    return weighted, oldwt
+
+
+RAD2DEG = 180.0 / (4.0 * math.atan(1))
+DEG2RAD = 1.0 / RAD2DEG
+DEG2RADBY360 = 360.0 / RAD2DEG
+
+HTMAXPERIOD = 50  # the dominant cycle period is capped to this value
+HTSUMBLOCK = 4 * HTMAXPERIOD  # values per block of the trendline sums
+
+# sin/cos of the dft of the dominant cycle phase for each integer period: row
+# "p" holds the values for the "p" terms of period "p" (calculated with math
+# to deliver the same values as calling sin/cos in the loop)
+_HTSIN = np.zeros((HTMAXPERIOD + 1, HTMAXPERIOD))
+_HTCOS = np.zeros((HTMAXPERIOD + 1, HTMAXPERIOD))
+for _p in range(1, HTMAXPERIOD + 1):
+    for _dci in range(_p):
+        _HTSIN[_p, _dci] = math.sin(_dci * DEG2RADBY360 / _p)
+        _HTCOS[_p, _dci] = math.cos(_dci * DEG2RADBY360 / _p)
+
+_HTSIN.flags.writeable = _HTCOS.flags.writeable = False
+
+
+def _hilbert(detrender, i1, q1, smoothp, dcphase, sine, leadsine, trendline,
+             trendmode, scalars, price, price0sum, blocksum, sintab, costab,
+             start, phase):
+    # Ehlers' Hilbert Transform, as in ta-lib. The values before start are 0.
+    # price0sum: prefix sums of the unsmoothed price restarted for each block
+    # of HTSUMBLOCK values, blocksum: the sum of each block and sintab,
+    # costab: the dft coefficients for each integer period. scalars: the
+    # running values at the start, updated with those at the end
+    i2, q2, re, im = scalars[0], scalars[1], scalars[2], scalars[3]
+    period, smoothperiod = scalars[4], scalars[5]
+    it1, it2, it3 = scalars[6], scalars[7], scalars[8]  # trendline
+    daysintrend, dcph = int(scalars[9]), scalars[10]
+    sn, lsn = scalars[11], scalars[12]
+
+    n = len(price)
+    for i in range(start, n):
+        adjperiod = 0.075*period + 0.54  # adj period_1 for ht transform
+
+        x = 0.0962*price[i] + 0.5769*price[i - 2]
+        x = x - 0.5769*price[i - 4] - 0.0962*price[i - 6]
+        detrender[i] = x * adjperiod
+
+        i1[i] = i10 = detrender[i - 3]  # 3 periods ago
+        x = 0.0962*detrender[i] + 0.5769*detrender[i - 2]
+        x = x - 0.5769*detrender[i - 4] - 0.0962*detrender[i - 6]
+        q1[i] = q10 = x * adjperiod
+
+        x = 0.0962*i1[i] + 0.5769*i1[i - 2]
+        ji = (x - 0.5769*i1[i - 4] - 0.0962*i1[i - 6]) * adjperiod
+        x = 0.0962*q1[i] + 0.5769*q1[i - 2]
+        jq = (x - 0.5769*q1[i - 4] - 0.0962*q1[i - 6]) * adjperiod
+
+        i21, q21 = i2, q2  # need them for re/im before recalc
+
+        i2 = i10 - jq
+        q2 = q10 + ji
+
+        i2 = 0.2*i2 + 0.8*i21  # smooth
+        q2 = 0.2*q2 + 0.8*q21  # smooth
+
+        re0 = i2*i21 + q2*q21
+        im0 = i2*q21 - q2*i21
+
+        re = 0.2*re0 + 0.8*re  # smooth
+        im = 0.2*im0 + 0.8*im  # smooth
+
+        # min/max spelled out to keep the semantics of python's with nan
+        period1 = period
+        if re != 0.0 and im != 0.0:
+            period = 360.0 / (RAD2DEG*math.atan(im / re))
+
+        if period1*1.5 < period:
+            period = period1*1.5
+        if period1*0.67 > period:
+            period = period1*0.67
+        if 6.0 > period:
+            period = 6.0
+        if 50.0 < period:
+            period = 50.0
+
+        period = 0.2*period + 0.8*period1  # smooth
+
+        smoothperiod = 0.33*period + 0.67*smoothperiod
+        smoothp[i] = smoothperiod
+        if not phase:
+            continue
+
+        # if nan: no terms, instead of indexing out of the tables below
+        sp5 = smoothperiod + 0.5
+        dcperiod = int(sp5) if sp5 < HTMAXPERIOD + 1 else 0
+
+        # dominant cycle phase
+        dcphase1 = dcph  # save prev value
+
+        realpart, imagpart = 0.0, 0.0
+        sins, coss = sintab[dcperiod], costab[dcperiod]
+        for dci in range(dcperiod):
+            y = price[i - dci]  # backwards from last
+            realpart += sins[dci] * y
+            imagpart += coss[dci] * y
+
+        abs_imagpart = abs(imagpart)
+        if abs_imagpart > 0.0:
+            dcph = math.atan(realpart/imagpart) * RAD2DEG
+        elif abs_imagpart <= 0.01:
+            if realpart < 0.0:
+                dcph -= 90.0
+            elif realpart > 0.0:
+                dcph += 90.0
+
+        dcph += 90.0
+        dcph += 360.0 / smoothperiod
+
+        if imagpart < 0.0:
+            dcph += 180.0
+
+        if dcph > 315.0:
+            dcph -= 360.0
+
+        dcphase[i] = dcph
+
+        # sine/leadsine
+        sine1, leadsine1 = sn, lsn
+        sine[i] = sn = math.sin(dcph * DEG2RAD)
+        leadsine[i] = lsn = math.sin((dcph + 45.0) * DEG2RAD)
+
+        # trendline: average of the unsmoothed price over dcperiod (from the
+        # prefix sums, with the semantics of a python slice) smoothed with
+        # weights 4, 3, 2, 1
+        j0 = i - (dcperiod - 1)
+        if j0 < 0:
+            j0 = max(j0 + n, 0)
+
+        it0 = 0.0
+        if j0 <= i:  # a window spans at most 2 blocks
+            it0 = price0sum[i + 1] - price0sum[j0]
+            if j0 // HTSUMBLOCK != (i + 1) // HTSUMBLOCK:
+                it0 += blocksum[j0 // HTSUMBLOCK]
+
+        if dcperiod > 0:
+            it0 /= dcperiod
+
+        trendline[i] = tl = (4.0*it0 + 3.0*it1 + 2.0*it2 + it3) / 10.0
+
+        it1, it2, it3 = it0, it1, it2  # update values
+
+        # trendmode
+        trend = 1
+
+        if ((sn > lsn and sine1 <= leadsine1) or
+                (sn < lsn and sine1 >= leadsine1)):
+            daysintrend = trend = 0
+
+        daysintrend += 1
+
+        if daysintrend < 0.5*smoothperiod:
+            trend = 0
+
+        if smoothperiod != 0.0:
+            phdiff = dcph - dcphase1
+            sm360 = 360.0 / smoothperiod
+            if 0.67*sm360 < phdiff < 1.5*sm360:
+                trend = 0
+
+        if tl != 0.0:
+            if abs(price[i]/tl - 1.0) >= 0.015:
+                trend = 1
+
+        trendmode[i] = trend
+
+    scalars[0], scalars[1], scalars[2], scalars[3] = i2, q2, re, im
+    scalars[4], scalars[5] = period, smoothperiod
+    scalars[6], scalars[7], scalars[8] = it1, it2, it3
+    scalars[9], scalars[10] = daysintrend, dcph
+    scalars[11], scalars[12] = sn, lsn
+
+
+HTSCALARS = 13  # running values of _hilbert kept in a state
+
+HTOUTPUTS = ('inphase', 'quadrature', 'dcperiod', 'dcphase', 'sine',
+             'leadsine', 'trendline', 'trendmode')
+
+
+def hilbert_transform(price, price0=None, skip=0, phase=True, state=None,
+                      returnstate=False):
+    '''
+    Ehlers' Hilbert Transform engine (as in ta-lib) on the smoothed price,
+    delivering in a single pass the values of the cycle indicators as a dict
+    with the keys in HTOUTPUTS:
+
+      - inphase, quadrature: components of the phasor
+      - dcperiod: dominant cycle period
+
+    and if phase is True (which needs "price0", the unsmoothed price):
+
+      - dcphase: dominant cycle phase
+      - sine, leadsine: sine of the phase and sine of the phase + 45 degrees
+      - trendline: instantaneous trendline
+      - trendmode: 1 if in trend, 0 if in cycle mode
+
+    The calculations start after "6 + skip" values of price. The values
+    before are 0 (nan for the phase related ones if phase is False)
+
+    "state" (a mapping as the one returned with "returnstate=True", with the
+    last values of the prices and of the transform) is the end state of a
+    previous calculation, which is continued. The values of the trendline
+    match those of a single calculation but for rounding
+    '''
+    price = np.array(price, dtype=np.float64)  # the start is zeroed
+    price0 = (np.full(len(price), np.nan) if price0 is None else
+              np.asarray(price0, dtype=np.float64))
+
+    if state is None:
+        nhist, pending = 0, 6 + skip
+        scalars = np.zeros(HTSCALARS)
+    else:  # the values of the state precede the given ones
+        nhist, pending = len(state['price']), int(state['pending'][0])
+        scalars = np.array(state['scalars'], dtype=np.float64)
+        price = np.concatenate([state['price'], price])
+        price0 = np.concatenate([state['price0'], price0])
+
+    n = len(price)
+    start = nhist + pending
+    price[nhist:start] = 0.0  # ignored by ta-lib for the detrender
+
+    outs = [np.zeros(n) for _ in range(len(HTOUTPUTS) + 1)]  # + detrender
+    if state is not None:
+        for out, name in zip(outs, ('detrender', 'inphase', 'quadrature')):
+            out[:nhist] = state[name]
+
+    # prefix sums for the trendline averages, restarted for each block to
+    # keep the magnitudes (and the rounding errors) of a few windows. The
+    # last block holds the end (n), also if it starts a block
+    nblocks = n // HTSUMBLOCK + 1
+    rows = np.zeros((nblocks, HTSUMBLOCK))
+    if phase:
+        rows.ravel()[:n] = price0
+    else:
+        for out in outs[4:]:
+            out[:] = np.nan
+
+    sums = _prefix(rows)
+    price0sum = sums[:, :-1].ravel()[:n + 1]
+    blocksum = sums[:, -1]
+
+    with np.errstate(all='ignore'):
+        _recurse(_hilbert, outs + [scalars], price, price0sum, blocksum,
+                 _HTSIN, _HTCOS, start, phase)
+
+    ht = {name: out[nhist:] for name, out in zip(HTOUTPUTS, outs[1:])}
+    if not returnstate:
+        return ht
+
+    keep = max(n - HTMAXPERIOD, 0)  # values reached by the dft/trendline
+    htstate = dict(
+        price=price[keep:], price0=price0[keep:], detrender=outs[0][keep:],
+        inphase=outs[1][keep:], quadrature=outs[2][keep:], scalars=scalars,
+        pending=max(start - n, 0),
+    )
+    return ht, htstate
+
+
+def _sar(out, trend, ep, sar, af, hiprev, loprev, high, low, aflong,
+         afmaxlong, afshort, afmaxshort, offset, first, signed):
+    # Parabolic SAR state machine. out, high and low hold a row per asset and
+    # trend, ep, sar, af, hiprev, loprev the start state of each asset, which
+    # is updated with the end state. The calculation starts at index first.
+    # The parameters have also a value per asset. min/max are spelled out to
+    # keep the semantics of python's with nan
+    for j in range(len(out)):
+        o, h, lw = out[j], high[j], low[j]
+        AFLONG, AFMAXLONG = aflong[j], afmaxlong[j]
+        AFSHORT, AFMAXSHORT = afshort[j], afmaxshort[j]
+        OFFSET = offset[j]
+
+        tr, e, s, a = trend[j], ep[j], sar[j], af[j]
+        hi, lo = hiprev[j], loprev[j]
+        for i in range(first, len(h)):
+            hi1, lo1 = hi, lo
+            hi, lo = h[i], lw[i]
+
+            if tr:
+                if lo <= s:  # trend reversal
+                    tr = 0.0
+                    s = e + s * OFFSET
+                    o[i] = -s if signed else s
+                    e, a = lo, AFSHORT  # kickstart ep and af
+                    s = s + a * (e - s)  # new sar
+                    if hi > s:
+                        s = hi
+                    if hi1 > s:
+                        s = hi1
+                else:
+                    o[i] = s  # no change, annotate current sar
+                    if hi > e:  # if extreme breached, update af
+                        e, a = hi, a + AFLONG
+                        if AFMAXLONG < a:
+                            a = AFMAXLONG
+
+                    s = s + a * (e - s)  # recalc sar
+                    if lo < s:
+                        s = lo
+                    if lo1 < s:
+                        s = lo1
+            else:
+                if hi >= s:  # trend reversal
+                    tr = 1.0
+                    o[i] = s = e - s * OFFSET
+                    e, a = hi, AFLONG  # kickstart ep and af
+                    s = s + a * (e - s)  # new sar
+                    if lo < s:
+                        s = lo
+                    if lo1 < s:
+                        s = lo1
+                else:
+                    o[i] = -s if signed else s
+                    if lo < e:  # if extreme breached, update af
+                        e, a = lo, a + AFSHORT
+                        if AFMAXSHORT < a:
+                            a = AFMAXSHORT
+
+                    s = s + a * (e - s)  # recalc sar
+                    if hi > s:
+                        s = hi
+                    if hi1 > s:
+                        s = hi1
+
+        trend[j], ep[j], sar[j], af[j] = tr, e, s, a
+        hiprev[j], loprev[j] = hi, lo
+
+
+SARSTATE = ('trend', 'ep', 'sar', 'af', 'high', 'low')
+
+
+def parabolic_sar(high, low, aflong=0.02, afmaxlong=0.20, afshort=None,
+                  afmaxshort=None, offsetonreverse=0.0, startval=0.0,
+                  signed=False, state=None, returnstate=False):
+    '''
+    Wilder's Parabolic SAR (as in ta-lib) of high/low, which can be 1-d arrays
+    or 2-d arrays with a column per asset, calculated in a single call for all
+    assets. The parameters can be scalars or have a value per asset:
+
+      - aflong, afmaxlong: acceleration factor and its maximum (long)
+      - afshort, afmaxshort: same for short (default: the long values)
+      - offsetonreverse: applied to the sar when the trend is reversed
+      - startval: 0 to take the trend from the 1st 2 bars (minusdm), else the
+        start sar (long if positive, short if negative)
+
+    If signed is True the sar is negative when short. The 1st value is nan
+
+    "state" (a mapping with the keys in SARSTATE and a value per asset) is
+    the end state of a previous calculation, which is continued: there is no
+    kick start and the 1st value is not nan. If "returnstate" is True, the
+    end state is also returned, as a dict
+    '''
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+
+    # a row per asset, to have the values of each asset contiguous
+    h = np.ascontiguousarray(high.reshape(len(high), -1).T)
+    lw = np.ascontiguousarray(low.reshape(len(low), -1).T)
+    out = np.full(h.shape, np.nan)
+    nassets, n = h.shape
+
+    if afshort is None:
+        afshort = aflong
+    if afmaxshort is None:
+        afmaxshort = afmaxlong
+
+    params = [aflong, afmaxlong, afshort, afmaxshort, offsetonreverse,
+              startval]
+    params = [np.array(np.broadcast_to(p, nassets), dtype=np.float64)
+              for p in params]
+    startval = params.pop()
+
+    if state is not None:
+        first = 0
+        outs = [out] + [np.array(np.broadcast_to(state[k], nassets),
+                                 dtype=np.float64) for k in SARSTATE]
+    elif n > 1:
+        first = 1  # the 1st bar is only a kick start
+
+        # Calculate a minusdm of the 1st two values to set the trend
+        hi1, lo1, hi, lo = h[:, 0], lw[:, 0], h[:, 1], lw[:, 1]
+        upmove, downmove = hi - hi1, lo1 - lo
+        minusdm = np.maximum(downmove, 0.0) * (downmove > upmove)
+        trend = ~(minusdm > 0)  # initial trend, long if not downmove
+        trend[startval > 0], trend[startval < 0] = True, False
+
+        # use the trend to set the first ep, sar values
+        ep = np.where(trend, hi, lo)
+        sar = np.where(startval != 0, np.abs(startval),
+                       np.where(trend, lo1, hi1))
+        af = np.where(trend, params[0], params[2])
+
+        # as ta-lib, the 1st "previous" bar is itself
+        outs = [out, trend.astype(np.float64), ep, sar, af, hi.copy(),
+                lo.copy()]
+    else:
+        first = n  # no calculation, no state
+        outs = [out] + [np.full(nassets, np.nan) for _ in SARSTATE]
+
+    if n > first:
+        _recurse(_sar, outs, h, lw, *params, first, bool(signed))
+
+    out = out[0] if high.ndim == 1 else out.T
+    if returnstate:
+        return out, dict(zip(SARSTATE, outs[1:]))
+
+    return out
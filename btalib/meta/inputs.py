@@ -4,6 +4,8 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
+import functools
+
 import pandas as pd
 
 from . import config
@@ -18,6 +20,7 @@ __all__ = ['Inputs', 'Input']
 
 _CLSINPUTS = {}  # holds auto-generated inputs clases
 _CLSINAME = {}  # holds naming used for the class
+_CLSINPUTSCAP = {}  # holds inputs classes capped to less inputs (allowinputs)
 
 
 class Input(lines.Line):
@@ -56,8 +59,8 @@ def _from_args(cls, *args):
         # less arguments, the 1st argument must then be multidimensional
         arginput, args = args[0], args[1:]  # take only 1-elem, rest is args
 
-        if isinstance(arginput, pd.DataFrame):  # check input validity
-            inputargs = _from_arg_dataframe(arginput, clsinputs)
+        if lines._is_columns(arginput):  # check input validity
+            inputargs = _from_arg_columns(arginput, clsinputs)
         elif isinstance(arginput, linesholder.LinesHolder):
             inputargs = _from_arg_linesholder(arginput, clsinputs)
         else:
@@ -76,23 +79,61 @@ def _from_args(cls, *args):
             inputargs = {clsinput: Input(arginput, clsinput)
                          for arginput, clsinput in zip(argsinputs, clsinputs)}
 
-    # Create instance of inputs and adjust if needed
-    inpret = _CLSINPUTS[cls](**inputargs)  # return instance / rem. args
+    # Create instance of inputs, capping the length if needed
+    inputscls = _CLSINPUTS[cls]
     if allowinputs:
-        inpret.__slots__[:] = inpret.__slots__[:linputs]  # cap the inputs length
+        inputscls = _capped(inputscls, linputs)
 
+    inpret = inputscls(**inputargs)  # return instance / rem. args
     return inpret, args  # return the instance and remaining args
 
 
-def _from_arg_dataframe(arginput, clsinputs):
-    if metadata.callstack:  # top-of the stack, pandas cannot be used
-        errors.PandasNotTopStack()
+def _capped(inputscls, linputs):
+    # subclass with only the 1st linputs slots. The slots of the class cannot
+    # be capped in place, because the class is shared by all instances
+    key = (inputscls, linputs)
+    try:
+        return _CLSINPUTSCAP[key]
+    except KeyError:
+        pass
+
+    clsdct = dict(__module__=inputscls.__module__,
+                  __slots__=inputscls.__slots__[:linputs])
+    capped = type(inputscls.__name__, (inputscls,), clsdct)
+    _CLSINPUTSCAP[key] = capped
+    return capped
 
-    cols = [x.lower() for x in arginput.columns]
 
-    if len(cols) < len(clsinputs):  # check input validity
+def _from_arg_columns(arginput, clsinputs):
+    # multi-column input: DataFrame, dict of arrays or structured array
+    if metadata.callstack and isinstance(arginput, pd.DataFrame):
+        errors.PandasNotTopStack()  # top-of the stack, pandas cannot be used
+
+    colnames = lines._colnames(arginput)
+    if len(colnames) < len(clsinputs):  # check input validity
         errors.MultiDimSmall()  # raise error
 
+    # resolve the columns once for each layout and configuration
+    colindices = _colindices_cached(colnames, clsinputs, config.OHLC_FIRST,
+                                    tuple(config.OHLC_INDICES.items()))
+
+    inputargs = {}
+    for clsinput, inputidx in zip(clsinputs, colindices):
+        vals, index = lines._colvalues(arginput, colnames, inputidx)
+        inputargs[clsinput] = Input(vals, clsinput, index=index)  # store
+
+    return inputargs
+
+
+@functools.lru_cache(maxsize=lines.COLCACHE)
+def _colindices_cached(colnames, clsinputs, ohlcfirst, ohlcindices):
+    # the configuration is part of the key: resolved again if it changes
+    return _colindices(colnames, clsinputs)
+
+
+def _colindices(colnames, clsinputs):
+    cols = [str(x).lower() for x in colnames]
+
     # create colindices reversed to have 0 atthe end (use list.pop def -1)
     colindices = list(range(len(cols) - 1, -1, -1))
 
@@ -101,7 +142,7 @@ def _from_arg_dataframe(arginput, clsinputs):
     # 1. By columnn name (case insensitive) (if OHLC_index and not helpful)
     # 2. By using the col index from the configuration settings
     # 3. Else, get the next free column
-    inputargs = {}
+    inputindices = []
     for i, clsinput in enumerate(clsinputs):
         inputidx = -1
         if config.OHLC_FIRST:
@@ -135,9 +176,9 @@ def _from_arg_dataframe(arginput, clsinputs):
         except ValueError:
             inputidx = colindices.pop()  # wasn't there, get next free
 
-        inputargs[clsinput] = arginput.iloc[:, inputidx]  # store input
+        inputindices.append(inputidx)  # store input
 
-    return inputargs
+    return tuple(inputindices)
 
 
 def _from_arg_linesholder(arginput, clsinputs):
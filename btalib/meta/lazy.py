@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import numpy as np
+
+from . import linesops
+
+__all__ = ['Source', 'LazyOp']
+
+
+# Binary operations on lines are not executed immediately. They build a graph
+# of LazyOp nodes which is only evaluated when the values are needed (rolling,
+# ewm, output access ...). Chained arithmetic like
+#
+#   (4*p0 + 3*p0(-1) + 2*p0(-2) + p0(-3)) / 10
+#
+# is then evaluated in a single pass, either with numexpr (if available) or
+# with numpy in chunks, to keep the intermediate results small and in cache
+# instead of allocating a full length temporary array for each operation.
+
+# All positions are absolute positions in the line (which share length and
+# index) to be able to mix operands which have different minimum periods.
+
+CHUNKSIZE = 1 << 14  # elements per chunk in the numpy fused evaluation
+MAXOPS = 32  # max operations in a graph, operands are evaluated if exceeded
+
+# operations which numexpr delivers with the same results as numpy (and when
+# the leaves are float64)
+_NEOPS = {
+    'add': '({} + {})', 'sub': '({} - {})', 'subtract': '({} - {})',
+    'mul': '({} * {})', 'multiply': '({} * {})',
+    'truediv': '({} / {})', 'div': '({} / {})', 'divide': '({} / {})',
+    'eq': '({} == {})', 'ne': '({} != {})',
+    'lt': '({} < {})', 'le': '({} <= {})',
+    'gt': '({} > {})', 'ge': '({} >= {})',
+}
+
+_NECMPOPS = {'eq', 'ne', 'lt', 'le', 'gt', 'ge'}
+_NELOGICOPS = {'and': '({} & {})', 'or': '({} | {})'}
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+else:
+    if numexpr.detect_number_of_cores() < 2:  # single thread: numpy faster
+        numexpr = None
+
+NEMINSIZE = CHUNKSIZE  # only use numexpr beyond this size
+
+
+class Source:
+    # Leaf of the graph: array holding the values starting at "offset"
+    __slots__ = ('array', 'offset')
+
+    nops = 0
+
+    def __init__(self, array, offset=0):
+        # read-only: the holding line will copy it before modifying it
+        array.flags.writeable = False
+        self.array = array
+        self.offset = offset
+
+    def chunk(self, i0, i1):
+        return self.array[i0 - self.offset:i1 - self.offset]
+
+
+def _source(x):
+    # evaluated version of x if it is a LazyOp
+    if isinstance(x, LazyOp):
+        return Source(x.evaluate(), x.offset)
+
+    return x
+
+
+class LazyOp:
+    # Node of the graph: binary operation between a and b (Source, LazyOp or
+    # scalar) delivering "size" values starting at "offset"
+    __slots__ = ('name', 'func', 'a', 'b', 'offset', 'size', 'nops', '_result')
+
+    def __init__(self, name, a, b, offset, size):
+        self.name = name
+        self.func = linesops._BINFUNCS[name]
+        self.nops = 1 + getattr(a, 'nops', 0) + getattr(b, 'nops', 0)
+        if self.nops > MAXOPS:  # evaluate operands and start a new graph
+            a, b = _source(a), _source(b)
+            self.nops = 1
+
+        self.a = a
+        self.b = b
+        self.offset = offset
+        self.size = size
+        self._result = None
+
+    def chunk(self, i0, i1):
+        if self._result is not None:  # already evaluated (shared node)
+            return self._result[i0 - self.offset:i1 - self.offset]
+
+        a, b = self.a, self.b
+        if isinstance(a, (Source, LazyOp)):
+            a = a.chunk(i0, i1)
+        if isinstance(b, (Source, LazyOp)):
+            b = b.chunk(i0, i1)
+
+        return self.func(a, b)
+
+    def evaluate(self, out=None):
+        # out: array to deliver the values in. The result is then not kept, the
+        # caller owns the array
+        if out is not None:
+            if self._result is not None:
+                out[:] = self._result
+            else:
+                with np.errstate(all='ignore'):
+                    self._evaluate(out)
+
+            return out
+
+        if self._result is None:
+            with np.errstate(all='ignore'):  # as pandas does, no warnings
+                self._result = self._evaluate()
+
+            # the result may be shared by several lines, which will copy it
+            # before modifying it
+            self._result.flags.writeable = False
+
+            self.a = self.b = None  # release the operands
+
+        return self._result
+
+    def _evaluate(self, out=None):
+        i0, size = self.offset, self.size
+        if self.nops == 1 or size <= CHUNKSIZE:  # no gain in fusing
+            r = self.chunk(i0, i0 + size)
+            if out is not None:
+                out[:] = r
+                r = out
+
+            return r
+
+        if numexpr is not None and size >= NEMINSIZE:
+            r = self._numexpr(out)
+            if r is not None:
+                return r
+
+        # fused numpy evaluation in chunks. The 1st chunk defines the dtype
+        i1 = i0 + size
+        r0 = self.chunk(i0, i0 + CHUNKSIZE)
+        result = np.empty(size, dtype=r0.dtype) if out is None else out
+        result[:CHUNKSIZE] = r0
+        for c0 in range(i0 + CHUNKSIZE, i1, CHUNKSIZE):
+            c1 = min(c0 + CHUNKSIZE, i1)
+            result[c0 - i0:c1 - i0] = self.chunk(c0, c1)
+
+        return result
+
+    def _numexpr(self, out=None):
+        # returns None if numexpr cannot deliver the same result as numpy
+        if out is not None and out.dtype != np.float64:  # no casting
+            return None
+
+        i0, i1 = self.offset, self.offset + self.size
+        local_dict = {}
+
+        def nexpr(x):
+            # returns expression and if it is boolean, or None if not possible
+            if isinstance(x, LazyOp) and x._result is not None:
+                x = Source(x._result, x.offset)  # already evaluated
+
+            if isinstance(x, Source):
+                if x.array.dtype != np.float64:
+                    return None
+
+                varname = 'v{}'.format(len(local_dict))
+                local_dict[varname] = x.chunk(i0, i1)
+                return varname, False
+
+            if isinstance(x, LazyOp):
+                name = x.name.strip('_')  # __radd__ => radd
+                a, b = x.a, x.b
+                if name not in _NEOPS and name not in _NELOGICOPS:
+                    if name[1:] not in _NEOPS:  # reversed op: radd => add
+                        return None
+
+                    name, a, b = name[1:], b, a  # swap operands
+
+                a, b = nexpr(a), nexpr(b)
+                if a is None or b is None:
+                    return None
+
+                (a, abool), (b, bbool) = a, b
+                if name in _NELOGICOPS:  # only on comparison results
+                    if not abool or not bbool:
+                        return None
+
+                    return _NELOGICOPS[name].format(a, b), True
+
+                if abool or bbool:  # arithmetic/comparison on booleans
+                    return None
+
+                return _NEOPS[name].format(a, b), name in _NECMPOPS
+
+            # scalar operand. Only those which do not alter the result dtype
+            if isinstance(x, bool) or not isinstance(x, (int, float)):
+                return None
+
+            varname = 'v{}'.format(len(local_dict))
+            local_dict[varname] = float(x)
+            return varname, False
+
+        ex = nexpr(self)
+        if ex is None or (ex[1] and out is not None):  # bool into float
+            return None
+
+        return numexpr.evaluate(ex[0], local_dict=local_dict, out=out)
@@ -4,10 +4,14 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
+import functools
+
 from . import config
-from .metadata import metadata
+from . import lazy
 from . import linesholder
 from . import linesops
+from .metadata import metadata
+from .. import kernels
 from .. import SEED_AVG, SEED_LAST, SEED_SUM, SEED_NONE, SEED_ZERO, SEED_ZFILL
 
 import numpy as np
@@ -105,7 +109,131 @@ def _generate(cls, bases, dct, name='', klass=None, **kwargs):
     return type(clsname, (klass,), clsdct)  # subclass and return
 
 
+def _tailarray(r, size):
+    # Returns r as an array of "size" elements, the valid values of a line
+    r = np.asarray(r)
+    if r.ndim == 0:  # operation delivered a single value, broadcast it
+        r = np.full(size, r)
+
+    return r
+
+
+def _fdtype(dtype):
+    # floating point dtype to deliver results for values of the given dtype
+    return dtype if dtype.kind == 'f' else np.dtype(np.float64)
+
+
+def _accdtype(dtype):
+    # dtype to accumulate values of the given dtype, at least float64
+    return np.promote_types(dtype, np.float64)
+
+
+def _nanmean(a):
+    # mean of the non-nan values, nan if there are none (as pandas does)
+    count = np.count_nonzero(~np.isnan(a))
+    return np.nansum(a) / count if count else np.nan
+
+
+def _prefill(r, minidx):
+    # Returns an array with the values of "r" placed at [minidx:] and NaN in
+    # the warm-up period [:minidx]. The dtype of r is kept (booleans see NaN as
+    # True like pandas does), except for integers which cannot hold NaN and are
+    # promoted to float.
+    dtype = r.dtype
+    if dtype.kind in 'iu':
+        dtype = np.float64
+
+    result = np.empty(minidx + len(r), dtype=dtype)
+    result[:minidx] = np.nan
+    result[minidx:] = r
+    return result
+
+
+def _is_columns(val):
+    # multi-column data: DataFrame, dict of arrays or structured array
+    if isinstance(val, (pd.DataFrame, dict)):
+        return True
+
+    return isinstance(val, np.ndarray) and val.dtype.names is not None
+
+
+def _colnames(data):
+    # original names of the columns of multi-column data
+    if isinstance(data, pd.DataFrame):
+        return tuple(data.columns)
+
+    if isinstance(data, dict):
+        return tuple(data)
+
+    return data.dtype.names
+
+
+def _colvalues(data, colnames, idx):
+    # Returns the values (no copy if possible) of column idx of multi-column
+    # data and the index if any. Integers are converted to float, once
+    colname = colnames[idx]
+    if isinstance(data, pd.DataFrame):
+        if data.columns.is_unique:
+            col = data[colname]  # cached by pandas, unlike iloc
+        else:
+            col = data.iloc[:, idx]
+    else:
+        col = data[colname]
+
+    index = None
+    if isinstance(col, pd.Series):
+        col, index = col.to_numpy(), col.index
+    else:
+        col = np.asarray(col)
+
+    if col.dtype.kind in 'iu':  # once here instead of in each operation
+        return col.astype(np.float64), index
+
+    return col.view(), index  # see Line: the view may be made read-only
+
+
+COLCACHE = 256  # column layouts kept resolved (least recently used)
+
+
+def _colidx(colnames, colname):
+    # index of colname in colnames: by name (case insensitive) or else by the
+    # configured index (0 if not possible). Resolved once for each layout
+    return _colidx_resolve(colnames, colname,
+                           config.OHLC_INDICES.get(colname, 0))
+
+
+@functools.lru_cache(maxsize=COLCACHE)
+def _colidx_resolve(colnames, colname, idxdef):
+    cols = [str(x).lower() for x in colnames]
+    try:
+        idx = cols.index(colname)  # try first by name
+    except ValueError:  # else pre-def index ... or default to 0
+        idx = idxdef
+
+    # TBD: In this situation the user could be made aware of the invalid
+    # inputindex (warning and reset to 0 or exception)
+    if isinstance(idx, str) or idx >= len(cols):  # sanity check, not beyond
+        idx = 0  # default mapping if sanity check fails
+
+    return idx
+
+
+def _unbounded():
+    # the operation delivers values which depend on all previous values and not
+    # only on a window: the indicator being calculated (and those using it) can
+    # only be updated by calculating it again over all values (see update)
+    if metadata.callstack:
+        metadata.callstack[-1]._unbounded_ = True
+
+
+def _windowed(func, kwargs):
+    # True if func delivers values which depend only on a window of values.
+    # Absolute indices depend on the start of the array
+    return func in kernels.WINDOWED and not kwargs.get('absolute')
+
+
 def binary_op(name):
+
     def real_binary_op(self, other, *args, **kwargs):
         # Executes a binary operation where self is guaranteed to have a
         # _series attribute but other isn't. Example > or +
@@ -117,43 +245,268 @@ def binary_op(name):
         minperiod = max(self._minperiod, getattr(other, '_minperiod', 1))
         minidx = minperiod - 1  # minperiod is 1-based, easier for location
 
-        # Prepare a result filled with 'Nan'
-        result = pd.Series(np.nan, index=self._series.index)
+        if isinstance(other, linesholder.LinesHolder):
+            other = other.outputs[0]
+
+        if args or kwargs:  # pandas specific arguments, let pandas do it
+            if isinstance(other, Line):
+                other = other._tail(minidx)  # get real other operand
+            elif isinstance(other, pd.Series):
+                other = other.to_numpy()[minidx:]
+            elif isinstance(other, np.ndarray) and other.ndim:
+                other = other[minidx:]
+
+            binop = getattr(self._to_series(minidx), name)
+            r = binop(other, *args, **kwargs)  # exec
+            r = _tailarray(r, len(self) - minidx)  # only valid values kept
+            return self._clone(r, period=minperiod, offset=minidx)
 
-        # Get and prepare the other operand
-        other = getattr(other, '_series', other)  # get real other operand
-        other = other[minidx:] if isinstance(other, pd.Series) else other
+        # Defer the operation (see lazy), get and prepare the other operand
+        if isinstance(other, Line):
+            other = other._source(minidx)
+        elif isinstance(other, pd.Series):
+            other = lazy.Source(other.to_numpy(copy=True))  # not ours, copy
+        elif np.ndim(other):
+            other = lazy.Source(np.array(other))  # not ours, copy
 
-        # Get the operation, exec and store
-        binop = getattr(self._series[minidx:], name)  # get op from series
-        result[minidx:] = r = binop(other, *args, **kwargs)  # exec / store
-        result = result.astype(r.dtype, copy=False)
+        op = lazy.LazyOp(name, self._source(minidx), other,
+                         offset=minidx, size=len(self) - minidx)
 
-        return self._clone(result, period=minperiod)  # ret new obj w minperiod
+        return self._clone(op, period=minperiod, offset=minidx)
 
     linesops.install_cls(name=name, attr=real_binary_op)
 
 
-def standard_op(name, parg=None, sargs=False, skwargs=False):
+# Array versions of standard operations. They take the same arguments as the
+# pandas counterparts and return None if the arguments/dtypes are not
+# supported, in which case the pandas operation is used.
+_NUMKINDS = 'iuf'  # integer, unsigned integer and float
+
+
+def _std_diff(a, periods=1, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS or not isinstance(periods, int):
+        return None
+
+    r = np.full(len(a), np.nan, dtype=_fdtype(a.dtype))
+    p = periods
+    if abs(p) < len(a):
+        if p >= 0:
+            r[p:] = a[p:] - a[:len(a) - p]
+        else:
+            r[:p] = a[:p] - a[-p:]
+
+    return r
+
+
+def _std_shift(a, periods=1, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS or not isinstance(periods, int):
+        return None
+
+    r = np.full(len(a), np.nan, dtype=_fdtype(a.dtype))
+    p = periods
+    if abs(p) < len(a):
+        if p >= 0:
+            r[p:] = a[:len(a) - p]
+        else:
+            r[:p] = a[-p:]
+
+    return r
+
+
+def _view_shift(a, periods=1, **kwargs):
+    # Shift to the future by keeping the values and offsetting the start,
+    # which avoids a copy. Only for floats, which is what the result of a
+    # regular shift is.
+    if kwargs or a.dtype.kind != 'f' or not isinstance(periods, int):
+        return None
+
+    if periods < 0:
+        return None
+
+    periods = min(periods, len(a))
+    return a[:len(a) - periods], periods
+
+
+def _std_abs(a, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS:
+        return None
+
+    return np.abs(a)
+
+
+def _std_clip(a, lower=None, upper=None, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS:
+        return None
+
+    if np.ndim(lower) == 0 and np.ndim(upper) == 0:
+        if lower is not None and upper is not None:  # as pandas, swap them
+            lower, upper = np.nanmin([lower, upper]), np.nanmax([lower, upper])
+
+    # Comparisons against NaN are False, which leaves the value untouched.
+    # Hence NaN values stay NaN and NaN thresholds are ignored (like pandas)
+    r = a
+    if lower is not None:
+        r = np.where(r < lower, lower, r)
+    if upper is not None:
+        r = np.where(r > upper, upper, r)
+
+    return r if r is not a else a.copy()
+
+
+def _std_cumsum(a, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS:
+        return None
+
+    if a.dtype.kind != 'f':
+        return np.cumsum(a)
+
+    nans = np.isnan(a)  # skip NaN for the sum, but keep them in the result
+    r = np.nancumsum(a, dtype=_accdtype(a.dtype)).astype(a.dtype, copy=False)
+    r[nans] = np.nan
+    return r
+
+
+def _std_fillna(a, value=None, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS or np.ndim(value) != 0:
+        return None
+
+    if value is None:
+        return None
+
+    if a.dtype.kind != 'f':
+        return a.copy()
+
+    return np.where(np.isnan(a), value, a)
+
+
+def _std_apply(a, func, *args, **kwargs):
+    if args or kwargs or not isinstance(func, np.ufunc):
+        return None
+
+    return func(a)
+
+
+def _std_where(a, cond, other=np.nan, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS:
+        return None
+
+    if not isinstance(cond, np.ndarray) or cond.dtype.kind != 'b':
+        return None
+
+    return np.where(cond, a, other)
+
+
+def _std_mask(a, cond, other=np.nan, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS:
+        return None
+
+    if not isinstance(cond, np.ndarray) or cond.dtype.kind != 'b':
+        return None
+
+    return np.where(cond, other, a)
+
+
+def _std_isna(a, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS:
+        return None
+
+    return np.isnan(a) if a.dtype.kind == 'f' else np.zeros(len(a), bool)
+
+
+def _std_notna(a, **kwargs):
+    r = _std_isna(a, **kwargs)
+    return r if r is None else ~r
+
+
+def _std_copy(a, **kwargs):
+    return None if kwargs else a.copy()
+
+
+def _std_astype(a, dtype, **kwargs):
+    return None if kwargs else a.astype(dtype)
+
+
+def _std_round(a, decimals=0, **kwargs):
+    if kwargs or a.dtype.kind not in _NUMKINDS:
+        return None
+
+    return np.round(a, decimals)
+
+
+_STDFUNCS = {
+    'diff': _std_diff,
+    'shift': _std_shift,
+    'abs': _std_abs, '__abs__': _std_abs,
+    'clip': _std_clip,
+    'cumsum': _std_cumsum,
+    'fillna': _std_fillna,
+    'apply': _std_apply,
+    'where': _std_where,
+    'mask': _std_mask,
+    'isna': _std_isna, 'isnull': _std_isna,
+    'notna': _std_notna, 'notnull': _std_notna,
+    'copy': _std_copy,
+    'astype': _std_astype,
+    'round': _std_round,
+}
+
+
+_STDVIEWS = {
+    # standard operations which can deliver a view and an offset
+    'shift': _view_shift,
+}
+
+
+def standard_op(name, parg=None, sargs=False, skwargs=False,
+                unbounded=False):
+    stdfunc = _STDFUNCS.get(name)
+    stdview = _STDVIEWS.get(name)
+
     def real_standard_op(self, *args, **kwargs):
-        # Prepare a result filled with 'Nan'
-        result = pd.Series(np.nan, index=self._series.index)
+        if unbounded is True or unbounded in kwargs:
+            _unbounded()
 
-        # get the series capped to actual period to consider
         a = args if sargs else tuple()
         kw = kwargs if skwargs else {}
-        minperiod, minidx, a, kw = self._minperiodize(*a, **kw)
-        if sargs:
-            args = a
-        if skwargs:
-            kwargs = kw
 
-        # get the operation from a view capped to the max minperiod
-        stdop = getattr(self._series[minidx:], name)
-        result[minidx:] = r = stdop(*args, **kwargs)  # execute and assign
-        result = result.astype(r.dtype, copy=False)  # keep dtype intact
-
-        line = self._clone(result, period=minperiod)  # create resulting line
+        if stdview is not None:  # try to deliver a view
+            minperiod, minidx, ra, rkw = self._minperiodize(*a, raw=True, **kw)
+            r = stdview(self._tail(minidx), *(ra if sargs else args),
+                        **(rkw if skwargs else kwargs))
+            if r is not None:
+                self._vals.flags.writeable = False  # copy before modifying
+                r, roffset = r
+                offset = minidx + roffset
+                line = self._clone(r, period=minperiod, offset=offset)
+                if parg:  # consider if the operation increases the minperiod
+                    line._minperiod += kwargs.get(parg)
+
+                return line
+
+        r = None
+        if stdfunc is not None:  # try first the array based operation
+            minperiod, minidx, ra, rkw = self._minperiodize(*a, raw=True, **kw)
+            with np.errstate(all='ignore'):  # as pandas does, no warnings
+                r = stdfunc(
+                    self._tail(minidx),
+                    *(ra if sargs else args),
+                    **(rkw if skwargs else kwargs),
+                )
+
+        if r is None:  # no array based operation possible, go to pandas
+            # get the series capped to actual period to consider
+            minperiod, minidx, a, kw = self._minperiodize(*a, **kw)
+            if sargs:
+                args = a
+            if skwargs:
+                kwargs = kw
+
+            # get the operation from a view capped to the max minperiod
+            stdop = getattr(self._to_series(minidx), name)
+            r = stdop(*args, **kwargs)  # execute
+
+        r = _tailarray(r, len(self) - minidx)  # only valid values are kept
+        line = self._clone(r, period=minperiod, offset=minidx)  # result line
         if parg:  # consider if the operation increases the minperiod
             line._minperiod += kwargs.get(parg)
 
@@ -164,12 +517,13 @@ def standard_op(name, parg=None, sargs=False, skwargs=False):
 
 def reduction_op(name, sargs=False, *args, **kwargs):
     def real_reduction_op(self, *args, **kwargs):
+        _unbounded()  # a single value out of all values
         if sargs:
             _, minidx, args, _ = self._minperiodize(*args)
         else:
             minidx = self._minperiod - 1
 
-        red_op = getattr(self._series[minidx:], name)
+        red_op = getattr(self._to_series(minidx), name)
         return red_op(*args, **kwargs)
 
     linesops.install_cls(name=name, attr=real_reduction_op)
@@ -204,14 +558,13 @@ def reduction_op(name, sargs=False, *args, **kwargs):
 #   - p1 = p2 - period  # beginning of seed calculation
 
 
-def multifunc_op(name, parg=None, propertize=False):
+def multifunc_op(name, parg=None, propertize=False, unbounded=False):
 
     class _MultiFunc_Op:
         def __init__(self, line, *args, **kwargs):
             # plethora of vals needed later in __getattr__/__getitem__
             self._is_seeded = False
             self._line = line
-            self._series = series = line._series
             self._minperiod = line._minperiod
 
             # if the end user passes alpha=None, it means that the alpha
@@ -283,107 +636,125 @@ def multifunc_op(name, parg=None, propertize=False):
                 # exponential smoothing calculation
                 self._minidx = pidx = p2 - 1  # beginning of result calculation
 
-                trailprefix = pd.Series(np.nan, index=series.index[pidx:p2])
+                # The seeded trailer is built in a single buffer (with the
+                # accumulation dtype) which the smoothers consume directly:
+                # prefix (nan with the seed at the end) + values to calculate
+                accdtype = _accdtype(line._vals.dtype)
+                self._buffer = buf = np.empty(len(line) - pidx, dtype=accdtype)
+                npre = p2 - pidx  # prefix length
+                buf[:npre] = np.nan
+                buf[npre:] = line._tail(p2)
+
                 # Determine the actul seed value to use
                 if _seed == SEED_AVG:
-                    trailprefix[-1] = series[p1:p2].mean()
+                    buf[npre - 1] = _nanmean(line._slice(p1, p2, accdtype))
                 elif _seed == SEED_LAST:
-                    trailprefix[-1] = series[pidx]
+                    buf[npre - 1] = line._tail(pidx)[0]
                 elif _seed == SEED_SUM:
-                    trailprefix[-1] = series[p1:p2].sum()
+                    buf[npre - 1] = np.nansum(line._slice(p1, p2, accdtype))
                 elif _seed == SEED_NONE:
                     pass  # no seed wished ... do nothing
                 elif _seed == SEED_ZERO:
-                    trailprefix[-1] = 0.0
+                    buf[npre - 1] = 0.0
                 elif _seed == SEED_ZFILL:
-                    trailprefix[:] = 0.0
+                    buf[:npre] = 0.0
 
-                # complete trailer: prefix (seed at end) + series vals to calc
-                trailer = trailprefix.append(series[p2:])
+                # pandas view for the operations which are not smoothers. The
+                # index plays no role in an ewm
+                trailer = pd.Series(buf, copy=False)
             else:
                 self._pearly = 0  # it will be checked in getattr
                 self._minidx = self._minperiod - 1
-                trailer = series[self._minidx:]
+                self._buffer = None  # pandas delivers the values
+                trailer = line._to_series(self._minidx, writeable=True)
+                if trailer.dtype.kind == 'f':  # accumulate in float64 or more
+                    trailer = trailer.astype(_accdtype(trailer.dtype),
+                                             copy=False)
 
-            self._multifunc = getattr(trailer, lsname)(*args, **kwargs)
+            self._trailer = trailer
+            self._args, self._kwargs = args, kwargs  # to create the multifunc
 
-        def _mean_exp(self, alpha, beta=None):  # recurisive definition
-            # alpha => new data, beta => old data (similar to 1-alpha)
-            if not beta:
-                beta = 1.0 - alpha
+        @property
+        def _multifunc(self):
+            # the pandas window object is only created if needed
+            mfunc = getattr(self._trailer, name.lstrip('_'))
+            return mfunc(*self._args, **self._kwargs)
 
-            def _sm_acc(x):
-                prev = x[0]
-                for i in range(1, len(x)):
-                    x[i] = prev = beta * prev + alpha * x[i]
+        def _update_period(self):
+            if self._pval is not None and not self._is_seeded:
+                # window operation overlap with the 1st calc point ... -1
+                self._minperiod += self._pval - self._pearly - 1
 
-                return x
+                # for a dynamic alpha, the period of the alpha can exceed minp
+                self._minperiod = max(self._minperiod, self._alpha_p)
 
-            return self._apply(_sm_acc)  # trigger __getattr__ for _apply
+        def _result(self, r):
+            # returns the line with the result r of the operation
+            r = np.asarray(r)
+            dtype = self._line._vals.dtype
+            if dtype.kind == 'f' and r.dtype.kind == 'f':
+                r = r.astype(dtype, copy=False)  # deliver as calc'ed
 
-        def _lfilter(self, alpha, beta=None):  # recurisive definition
-            try:
-                import scipy.signal
-            except ImportError:  # if not available use tight loop
-                return self._mean_exp(alpha, beta)
+            r = _tailarray(r, len(self._line) - self._minidx)
+            return self._line._clone(r, period=self._minperiod,
+                                     offset=self._minidx)
 
+        def _smooth(self, func):
+            # run the recursive smoothing func directly on the values of the
+            # trailer, which it may modify in place
+            self._update_period()
+            x = self._buffer
+            if x is None:  # the trailer may share the values, copy them
+                x = np.array(self._trailer, dtype=np.float64)
+
+            with np.errstate(all='ignore'):  # as pandas does, no warnings
+                return self._result(func(x))
+
+        def _mean_exp(self, alpha, beta=None):  # recurisive definition
             # alpha => new data, beta => old data (similar to 1-alpha)
-            if not beta:
-                beta = 1.0 - alpha
+            def _sm_acc(x):
+                return kernels.exp_smoothing(x, alpha, beta)
+
+            return self._smooth(_sm_acc)
 
-            def _sp_lfilter(x):
-                # Initial conditions "ic" can be used for the calculation, the
-                # next two lines detail that. A simple scaling of x[0] achieves
-                # the same in the 1-d case
-                # zi = lfiltic([alpha], [1.0, -beta], y=[x[0]])
-                # x[1:], _ = lfilter([alpha], [1.0, -beta], x[1:], zi=zi)
-                x[0] /= alpha  # scale start val, descaled in 1st op by alpha
-                return scipy.signal.lfilter([alpha], [1.0, -beta], x)
+        def _lfilter(self, alpha, beta=None):  # recurisive definition
+            # alpha => new data, beta => old data (similar to 1-alpha)
+            def _sm_filter(x):
+                return kernels.smoothing_filter(x, alpha, beta)
 
-            return self._apply(_sp_lfilter)  # trigger __getattr__ for _apply
+            return self._smooth(_sm_filter)
 
         def _mean(self):  # meant for ewm with dynamic alpha
             def _dynalpha(vals):
                 # reuse vals: not the original series, it's the trailer abvoe
-                alphas = self._alpha_[self._alpha_p - 1:]  # -1: get array idx
+                alphas = self._alpha_._tail(self._alpha_p - 1)  # -1: arr idx
 
-                prev = vals[0]  # seed value, which isn't part of the result
+                # vals[0] is the seed, which isn't part of the result
+                kernels.recursive_mean(vals, alphas)  # in place
                 vals[0] = np.nan  # made 1 tick longer to carry seed, nan it
-                for i, alphai in enumerate(alphas, 1):  # tight-loop-calc
-                    vals[i] = prev = prev + alphai * (vals[i] - prev)
-
-                return vals  # can return vals, made Series via __getattr__
+                return vals  # can return vals, made a line by _smooth
 
-            return self._apply(_dynalpha)  # triggers __getattr__ for _apply
+            return self._smooth(_dynalpha)
 
         def __getattr__(self, attr):
-            if self._pval is not None and not self._is_seeded:
-                # window operation overlap with the 1st calc point ... -1
-                self._minperiod += self._pval - self._pearly - 1
-
-                # for a dynamic alpha, the period of the alpha can exceed minp
-                self._minperiod = max(self._minperiod, self._alpha_p)
-
+            self._update_period()
             op = getattr(self._multifunc, attr)  # get real op/let exp propag
 
             def call_op(*args, **kwargs):  # actual op executor
-                result = pd.Series(np.nan, index=self._series.index)  # prep
-
                 sargs = []  # cov takes an "other" parameter for example
                 for arg in args:
-                    if isinstance(arg, Line):
-                        arg = arg._series[self._minidx:]
+                    if isinstance(arg, Line):  # aligned with the trailer
+                        arg = pd.Series(arg._tail(self._minidx),
+                                        index=self._trailer.index, copy=False)
 
                     sargs.append(arg)
 
-                result[self._minidx:] = r = op(*sargs, **kwargs)  # run/store
-                result = result.astype(r.dtype, copy=False)
-                return self._line._clone(result, period=self._minperiod)
+                return self._result(op(*sargs, **kwargs))  # run
 
             return call_op
 
         def __getitem__(self, item):
-            return self._line._clone(self._series.iloc[item])
+            return self._line._clone(self._line.series.iloc[item])
 
         @property
         def _seeded(self):
@@ -391,6 +762,9 @@ def multifunc_op(name, parg=None, propertize=False):
             return self
 
     def real_multifunc_op(self, *args, **kwargs):
+        if unbounded:
+            _unbounded()
+
         return _MultiFunc_Op(self, *args, **kwargs)
 
     linesops.install_cls(name=name, attr=real_multifunc_op,
@@ -399,22 +773,14 @@ def multifunc_op(name, parg=None, propertize=False):
 
 class MetaLine(type):
 
-    def _line_from_dataframe(cls, self, df, colname):
-        # it must be dataframe(-like) with dimensions
-        colnames = [x.lower() for x in df.columns]
-        try:
-            idx = colnames.index(colname)  # try first by name
-        except ValueError:  # else pre-def index ... or default to 0
-            idx = config.OHLC_INDICES.get(colname, 0)
-
-        # TBD: In this situation the user could be made aware of the invalid
-        # inputindex (warning and reset to 0 or exception)
-        if idx >= len(colnames):  # sanity check, not beyond possible
-            idx = 0  # default mapping if sanity check fails
+    def _line_from_columns(cls, self, data, colname):
+        # multi-column data (DataFrame, dict, structured array)
+        colnames = _colnames(data)
+        idx = _colidx(colnames, colname)
 
         # Finally, assign values
         self._minperiod = 1
-        self._series = df.iloc[:, idx]
+        self._series, self._index = _colvalues(data, colnames, idx)
 
     def __call__(cls, val=None, name='', index=None, *args, **kwargs):
         self = cls.__new__(cls, *args, **kwargs)  # create instance
@@ -423,29 +789,40 @@ class MetaLine(type):
         if isinstance(val, linesholder.LinesHolder):
             val = val.outputs[0]  # get 1st line and process
             self._minperiod = val._minperiod
-            self._series = val._series
+            self._data, self._lazy = val._data, val._lazy
+            self._offset = val._offset
+            self._index = val._index
         elif isinstance(val, Lines):
             val = val[0]  # get 1st line and process
             self._minperiod = val._minperiod
-            self._series = val._series
-        elif isinstance(val, Line):
-            self._minperiod = val._minperiod
-            self._series = val._series
+            self._data, self._lazy = val._data, val._lazy
+            self._offset = val._offset
+            self._index = val._index
         elif isinstance(val, Line):
             self._minperiod = val._minperiod
-            self._series = val._series
+            self._data, self._lazy = val._data, val._lazy
+            self._offset = val._offset
+            self._index = val._index
         elif isinstance(val, pd.Series):
             self._minperiod = 1
-            self._series = val
-        elif isinstance(val, pd.DataFrame):
-            cls._line_from_dataframe(self, val, name)
+            self._series = val.to_numpy().view()  # see below
+            self._index = val.index
+        elif _is_columns(val):
+            cls._line_from_columns(self, val, name)
+        elif isinstance(val, lazy.LazyOp):
+            self._minperiod = 1
+            self._lazy = val  # values will be evaluated on demand
+            self._index = index
         else:
-            # Don't know how to convert, store and pray
+            # Don't know how to convert, make it an array and pray
             self._minperiod = 1
-            if index is None:
-                self._series = val  # 1st column
-            else:
-                self._series = pd.Series(val, index=index)
+            if index is not None and np.ndim(val) == 0:
+                val = np.full(len(index), val)  # broadcast scalar to index
+
+            # a view, because the values may be made read-only (to copy them
+            # before modifying them), without affecting the array of the caller
+            self._series = val if val is None else np.asarray(val).view()
+            self._index = index
 
         self._name = name  # fix the name of the data series
 
@@ -454,10 +831,103 @@ class MetaLine(type):
 
 
 class Line(metaclass=MetaLine):
+    # The values are kept in _vals starting at _offset. Values before _offset
+    # (the warm-up period) are not stored and are only generated (NaN) when
+    # the entire array (_series) is requested. The values may also be pending
+    # the evaluation of a lazy operation
     _minperiod = 1
-    _series = None
+    _data = None  # numpy array holding the values from _offset
+    _lazy = None  # lazy operation delivering the values from _offset
+    _offset = 0
+    _index = None  # shared index, None means a default RangeIndex
     _name = None
 
+    @property
+    def _vals(self):
+        if self._lazy is not None:  # evaluate now
+            self._data, self._lazy = self._lazy.evaluate(), None
+
+        return self._data
+
+    @_vals.setter
+    def _vals(self, val):
+        self._data, self._lazy = val, None
+
+    @property
+    def _wseries(self):
+        # full length array, which can be modified in place
+        series = self._series
+        if not series.flags.writeable:  # shared, copy it before modifying
+            self._series = series = series.copy()
+
+        return series
+
+    def _source(self, minidx=0):
+        # operand for a lazy operation, delivering values from minidx
+        if minidx >= self._offset:
+            if self._lazy is not None:
+                return self._lazy
+
+            return lazy.Source(self._vals, self._offset)
+
+        return lazy.Source(self._series)
+
+    @property
+    def _series(self):
+        # full length array. It replaces the sparse storage for later updates
+        if self._offset:
+            self._vals = _prefill(self._vals, self._offset)
+            self._offset = 0
+
+        return self._vals
+
+    @_series.setter
+    def _series(self, val):
+        self._vals = val
+        self._offset = 0
+
+    def _ident(self):
+        # identifies the values of the line without evaluating them, to be
+        # used as (part of) a key. The keeper must keep _data/_lazy alive
+        if self._lazy is not None:
+            vals = self._lazy
+        elif isinstance(self._data, np.ndarray):
+            d = self._data
+            vals = (d.__array_interface__['data'][0], d.shape, d.strides,
+                    d.dtype.str)
+        else:
+            vals = id(self._data)
+
+        return vals, self._offset, self._minperiod
+
+    def _astype(self, dtype):
+        # convert floating point values (if any) to the given dtype
+        vals = self._vals
+        if vals.dtype != dtype and vals.dtype.kind == 'f':
+            self._vals = vals.astype(dtype)
+
+        return self
+
+    def _into(self, out):
+        # line holding the full length values in the array "out" (warm-up
+        # period as NaN). A pending lazy operation is evaluated directly in
+        # it. Calculated values (kernels, rolling, ...) are copied into it
+        offset = self._offset
+        out[:offset] = np.nan
+        if self._lazy is not None:
+            self._lazy.evaluate(out=out[offset:])
+        else:
+            out[offset:] = self._data
+
+        return self._clone(out)
+
+    def _tail(self, minidx=0):
+        # array of values starting at minidx (no copy if possible)
+        if minidx >= self._offset:
+            return self._vals[minidx - self._offset:]
+
+        return self._series[minidx:]
+
     def __hash__(self):
         return super().__hash__()
 
@@ -483,37 +953,86 @@ class Line(metaclass=MetaLine):
 
         if val is None:
             val = self._series.copy()
+        elif np.ndim(val) == 0:
+            val = np.full(len(self), val)
 
-        return self._clone(val, index=self._series.index)
+        return self._clone(val)
 
     def __iter__(self):
         return iter(self._series)
 
     def __len__(self):
-        return len(self._series)
+        if self._lazy is not None:
+            return self._offset + self._lazy.size
+
+        return self._offset + len(self._data)
 
     def __getitem__(self, item):
-        return self._clone(self._series.iloc[item])
+        if isinstance(item, slice):
+            return self._clone(self._series[item], index=self.index[item])
+
+        return self._series[item]
 
     def __setitem__(self, item, value):
-        self._series[item] = value
+        self._wseries[item] = value
+
+    def _clone(self, series, period=None, index=None, offset=0):
+        # if offset is given, series only holds the values from offset onwards
+        if index is None and isinstance(series, (np.ndarray, lazy.LazyOp)):
+            index = self._index  # same length, share the index
 
-    def _clone(self, series, period=None, index=None):
         line = self.__class__(series, index=index)
+        line._offset = offset
         line._minperiod = period or self._minperiod
         return line
 
+    def _prepend(self, vals):
+        # line with vals (values preceding those of self, for example kept in
+        # a state) followed by the values of self, with a default index
+        return self.__class__(np.concatenate([vals, self._tail()]))
+
+    def _slice(self, i0, i1, dtype=None):
+        # array of the values in the [i0:i1] range (python semantics),
+        # converted to dtype if needed (only floats, ints are not converted)
+        r = range(len(self))[i0:i1]
+        a = self._tail(r.start)[:len(r)]
+        if dtype is not None and a.dtype.kind == 'f':
+            a = a.astype(dtype, copy=False)
+
+        return a
+
+    def _to_series(self, minidx=0, writeable=False):
+        # pandas view of the values starting at minidx (no copy), unless a
+        # writeable one is needed and the values are read-only (shared)
+        vals = self._tail(minidx)
+        if writeable and not vals.flags.writeable:
+            vals = vals.copy()
+
+        return pd.Series(vals, index=self.index[minidx:], copy=False)
+
+    @property
+    def begidx(self):
+        # index of the 1st valid value, akin to "outBegIdx" in ta-lib
+        return self._minperiod - 1
+
     @property
     def mpseries(self):
-        return self._series[self._minperiod - 1:]
+        # only the valid values, the warm-up period is not generated
+        s = self._to_series(self.begidx)
+        s.name = self._name
+        return s
 
     @property
     def series(self):
-        return self._series.rename(self._name, inplace=True)
+        return pd.Series(self._series, index=self.index, name=self._name,
+                         copy=False)
 
     @property
     def index(self):
-        return self._series.index
+        if self._index is None:
+            self._index = pd.RangeIndex(len(self))
+
+        return self._index
 
     def _period(self, period, rolling=False, val=None):
         # return the line with the period increased by period
@@ -526,7 +1045,7 @@ class Line(metaclass=MetaLine):
             idx1 = idx0 + (inc or 1)  # maybe no period inc only setval
             if idx1 < idx0:  # inc is negative ...
                 idx0, idx1 = idx1, idx0
-            self._series[idx0:idx1] = val
+            self._wseries[idx0:idx1] = val
 
         self._minperiod += inc
         return self
@@ -534,12 +1053,13 @@ class Line(metaclass=MetaLine):
     def _setval(self, i0=0, i1=0, val=np.nan):
         # set a value relative to minperiod as start.
         if not i0 and not i1:
-            self._series[self._minperiod - 1:i1] = val
+            self._wseries[self._minperiod - 1:i1] = val
         else:
             i0 = self._minperiod - 1 + i0
             if i1 >= 0:
-                i1 = i0 + (i1 or 1)  # i1 rel to i0 or extend i0 by 1 for singl value
-            self._series[i0:i1] = val
+                # i1 rel to i0 or extend i0 by 1 for single value
+                i1 = i0 + (i1 or 1)
+            self._wseries[i0:i1] = val
 
         return self
 
@@ -552,83 +1072,94 @@ class Line(metaclass=MetaLine):
         minperiod = max(minpers)  # max of any series involved in op
         minidx = minperiod - 1  # minperiod is 1-based, easier for location
 
-        nargs = []
-        for x in args:
-            x = getattr(x, '_series', x)
-            if isinstance(x, pd.Series):
-                x = x[minidx:]
-                if raw:
-                    x = x.to_numpy()
+        def minperiodize(x):
+            if isinstance(x, linesholder.LinesHolder):
+                x = x.outputs[0]
 
-            nargs.append(x)
+            if isinstance(x, Line):  # array for raw, else a pandas view
+                return x._tail(minidx) if raw else x._to_series(minidx)
 
-        nkwargs = {}
-        for k, x in kwargs.items():
-            x = getattr(x, '_series', x)
             if isinstance(x, pd.Series):
                 x = x[minidx:]
                 if raw:
                     x = x.to_numpy()
 
-            nkwargs[k] = x
+            return x
+
+        nargs = [minperiodize(x) for x in args]
+        nkwargs = {k: minperiodize(x) for k, x in kwargs.items()}
 
         return minperiod, minidx, nargs, nkwargs
 
-    def _apply(self, func, *args, raw=False, **kwargs):
-        minperiod, minidx, a, kw = self._minperiodize(*args, raw=raw, **kwargs)
+    def _sarray(self, minidx, raw):
+        if raw:  # let caller modify the buffer
+            return self._tail(minidx).copy()
 
-        sarray = self._series[minidx:]
-        if raw:
-            sarray = sarray.to_numpy(copy=True)  # let caller modify the buffer
+        return self._to_series(minidx, writeable=True)
 
-        result = pd.Series(np.nan, index=self._series.index)
-        result[minidx:] = func(sarray, *a, **kw)
+    def _applied(self, r, minidx, minperiod):
+        # results are always float and must not share the buffer with self
+        dtype = _fdtype(self._vals.dtype)
+        r = _tailarray(np.asarray(r, dtype=dtype), len(self) - minidx)
+        if np.may_share_memory(r, self._vals):
+            r = r.copy()
 
-        return self._clone(result, period=minperiod)  # create resulting line
+        return self._clone(r, period=minperiod, offset=minidx)
+
+    def _apply(self, func, *args, raw=False, **kwargs):
+        if not _windowed(func, kwargs):
+            _unbounded()
 
-    def _applymulti(self, func, *args, raw=False, **kwargs):
         minperiod, minidx, a, kw = self._minperiodize(*args, raw=raw, **kwargs)
 
-        sarray = self._series[minidx:]
-        if raw:
-            sarray = sarray.to_numpy(copy=True)  # let caller modify the buffer
+        r = func(self._sarray(minidx, raw), *a, **kw)
+        return self._applied(r, minidx, minperiod)  # create resulting line
+
+    def _applymulti(self, func, *args, raw=False, **kwargs):
+        if not _windowed(func, kwargs):
+            _unbounded()
+
+        minperiod, minidx, a, kw = self._minperiodize(*args, raw=raw, **kwargs)
 
-        results = func(sarray, *a, **kw)
-        lines = []
-        for r in results:
-            result = pd.Series(np.nan, index=self._series.index)
-            result[minidx:] = r
-            lines.append(self._clone(result, period=minperiod))  # result/store
+        results = func(self._sarray(minidx, raw), *a, **kw)
+        return [self._applied(r, minidx, minperiod) for r in results]
 
-        return lines
+    def _fir(self, weights):
+        # weighted sum over the last len(weights) values, with the weights
+        # ordered from the oldest to the newest value (see kernels.fir)
+        minidx = self._minperiod - 1
+        r = kernels.fir(self._tail(minidx), weights)
+        line = self._applied(r, minidx, self._minperiod)
+        return line._period(len(weights), rolling=True)
 
 
-# These hold the values for the attributes _minperiods/_minperiod for the
-# instances, to avoid having them declared as attributes. Or else __setattr__
-# would set them as Line objects (or logic would be needed in __setattr__ to
-# avoid assigning an object not the real value
-metadata.minperiods = {}
-metadata.minperiod = {}
+class _LinesBase:
+    # Hidden slots holding the values for the attributes _minperiods/_minperiod
+    # of the instances. They are not part of the __slots__ of the subclasses,
+    # which are the names of the lines, and are set bypassing __setattr__, or
+    # else they would be set as Line objects
+    __slots__ = ['_minperiods_', '_minperiod_']
 
 
-class Lines:
+class Lines(_LinesBase):
     __slots__ = []
 
     @property
     def _minperiods(self):
-        return metadata.minperiods[self]
+        return self._minperiods_
 
     @property
     def _minperiod(self):
-        return metadata.minperiod[self]
+        return self._minperiod_
 
     def _update_minperiod(self):
-        metadata.minperiods[self] = minperiods = [x._minperiod for x in self]
-        metadata.minperiod[self] = max(minperiods)
+        minperiods = [x._minperiod for x in self]
+        object.__setattr__(self, '_minperiods_', minperiods)
+        object.__setattr__(self, '_minperiod_', max(minperiods))
 
     def __init__(self, *args, **kwargs):
-        metadata.minperiods[self] = [1] * len(self)
-        metadata.minperiod[self] = 1
+        object.__setattr__(self, '_minperiods_', [1] * len(self))
+        object.__setattr__(self, '_minperiod_', 1)
 
         for name, value in zip(self.__slots__, args):
             setattr(self, name, value)  # match slots to args
@@ -94,6 +94,20 @@ class LinesHolder:
 
         return self._df
 
+    @property
+    def begidx(self):
+        # index of the 1st value valid for all outputs, like ta-lib outBegIdx
+        return self._minperiod - 1
+
+    @property
+    def trimmed(self):
+        # DataFrame with only the valid values, starting at begidx
+        begidx = self.begidx
+        return pd.DataFrame(
+            {name: line._tail(begidx) for name, line in self.outputs._items()},
+            index=self.outputs[0].index[begidx:],
+        )
+
     @property
     def series(self):
         if self._sf is None:
@@ -4,6 +4,7 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
+import operator
 import sys
 
 
@@ -55,12 +56,48 @@ _BINOPS = (
     '__and__', '__or__', '__xor__',
 )
 
+
+def _reversed_op(op):
+    def reversed_op(a, b):
+        return op(b, a)
+
+    return reversed_op
+
+
+_BINFUNCS_BASE = {
+    # Element-wise operation behind each of the _BINOPS. Used to operate
+    # directly on the underlying arrays, skipping index alignment
+    'eq': operator.eq, 'le': operator.le, 'lt': operator.lt,
+    'ge': operator.ge, 'gt': operator.gt, 'ne': operator.ne,
+
+    'add': operator.add,
+    'div': operator.truediv, 'divide': operator.truediv,
+    'floordiv': operator.floordiv,
+    'mod': operator.mod,
+    'mul': operator.mul, 'multiply': operator.mul,
+    'pow': operator.pow,
+    'sub': operator.sub, 'subtract': operator.sub,
+    'truediv': operator.truediv,
+
+    'and': operator.and_, 'or': operator.or_, 'xor': operator.xor,
+}
+
+_BINFUNCS = {}
+for _name in _BINOPS:
+    _bname = _name.strip('_')  # __radd__ => radd
+    if _bname in _BINFUNCS_BASE:
+        _BINFUNCS[_name] = _BINFUNCS_BASE[_bname]
+    else:  # reversed operation: radd => add with swapped operands
+        _BINFUNCS[_name] = _reversed_op(_BINFUNCS_BASE[_bname[1:]])
+
 _STDOPS = {
     # STandarD OPerationS: do something with the series
     # the period may be changed and a copy may or ma not be returned
 
     # sargs: True => *args may contain other series (Line => Series)
     # skwargs: True => **kwargs may contain other series (Line => Series)
+    # unbounded: True => the values depend on all previous values (and not
+    # only on a window), str => the same if the named kwarg is given
 
     # change period
     'diff': dict(parg='periods'),
@@ -73,40 +110,40 @@ _STDOPS = {
     'apply': {'skwargs': True},
     'astype': {},
     'between': {'sargs': True},
-    'bfill': {},
+    'bfill': {'unbounded': True},
     'clip': {'skwargs': True},
     'combine': {'sargs': True},  # other => potential binop
     'combine_first': {'sargs': True},  # other => potential binop
     'concat': {'sargs': True},
     'copy': {},
-    'cummax': {},
-    'cummin': {},
-    'cumprod': {},
-    'cumsum': {},
-    'drop': {},
-    'drop_duplicates': {},
-    'dropna': {},
-    'duplicated': {},
-    'ffill': {},
-    'fillna': {},
-    'filter': {},
-    'first': {},
-    'head': {},
-    'last': {},
-    'interpolate': {},
+    'cummax': {'unbounded': True},
+    'cummin': {'unbounded': True},
+    'cumprod': {'unbounded': True},
+    'cumsum': {'unbounded': True},
+    'drop': {'unbounded': True},
+    'drop_duplicates': {'unbounded': True},
+    'dropna': {'unbounded': True},
+    'duplicated': {'unbounded': True},
+    'ffill': {'unbounded': True},
+    'fillna': {'unbounded': 'method'},
+    'filter': {'unbounded': True},
+    'first': {'unbounded': True},
+    'head': {'unbounded': True},
+    'last': {'unbounded': True},
+    'interpolate': {'unbounded': True},
     'isin': {'sargs': True},
     'isna': {},
     'isnull': {},
-    'nlargest': {},
+    'nlargest': {'unbounded': True},
     'mask': {'sargs': True, 'skwargs': True},
     'notna': {},
     'notnull': {},
-    'nsmallest': {},
-    'replace': {},
-    'rank': {},
+    'nsmallest': {'unbounded': True},
+    'replace': {'unbounded': 'method'},
+    'rank': {'unbounded': True},
     'round': {},
     # 'update': {'sargs': True},
-    'tail': {},
+    'tail': {'unbounded': True},
     'where': {'sargs': True, 'skwargs': True},
 }
 
@@ -156,12 +193,12 @@ _MULTIFUNCOPS = dict(
     # in a series: rolling(window=10).mean()
 
     # provide a set of oprations
-    expanding=dict(parg='min_periods'),
-    ewm=dict(),
-    _ewm=dict(),
+    expanding=dict(parg='min_periods', unbounded=True),
+    ewm=dict(unbounded=True),
+    _ewm=dict(unbounded=True),
     rolling=dict(parg='window'),
 
     # accessors
-    iloc=dict(propertize=True),
-    loc=dict(propertize=True),
+    iloc=dict(propertize=True, unbounded=True),
+    loc=dict(propertize=True, unbounded=True),
 )
@@ -4,6 +4,9 @@
 # Copyright (C) 2020 Daniel Rodriguez
 # Use of this source code is governed by the MIT License
 ###############################################################################
+import numpy as np
+
+from . import errors
 from . import lines
 
 __all__ = ['Output', 'Outputs']
@@ -17,7 +20,31 @@ class Output(lines.Line):
 
 
 class Outputs(lines.Lines):
-    pass
+    def _into(self, out):
+        # Return a copy of the outputs with the values delivered in the arrays
+        # of "out": a dict (output name/alias: array) or a sequence of arrays
+        # in the order of the outputs (None to skip one). Lazy outputs are
+        # evaluated in the arrays, the values of the others are copied
+        if not isinstance(out, dict):
+            out = dict(zip(self.__slots__, out))
+
+        outputs = self.__class__(*self)  # copies share values with self
+        for name, buf in out.items():
+            if buf is None:
+                continue
+
+            line = outputs._get(name)
+            if line is None:
+                errors.OutBufferNotFound(name)  # raise error
+
+            size = len(line)
+            if np.ndim(buf) != 1 or len(buf) != size:
+                errors.OutBufferSize(name, np.shape(buf), size)  # raise error
+
+            setattr(outputs, name, line._into(buf))
+
+        outputs._update_minperiod()
+        return outputs
 
 
 def _generate(cls, bases, dct, name='outputs', klass=Outputs, **kwargs):
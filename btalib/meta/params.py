@@ -126,7 +126,6 @@ def _from_kwargs(cls, **kwargs):
     # separate instance params from other kwargs
     params = {k: kwargs.pop(k) for k in list(kwargs) if k in cls.params}
 
-    # Params
-    self = _CLSPARAMS[cls](**cls.params)  # defvals params in dict format
-    self._update(**params)  # update with instance params
+    # Params: defvals params in dict format updated with instance params
+    self = _CLSPARAMS[cls](**dict(cls.params, **params))
     return self, kwargs   # rest of kwargs and params
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import io
+import json
+
+import numpy as np
+
+from . import errors
+
+__all__ = ['State']
+
+
+def _pvalue(val):
+    # param value as stored in a state: numbers/strings as is, else the name
+    # (for example the class of a moving average)
+    if val is None or isinstance(val, (bool, int, float, str)):
+        return val
+
+    return getattr(val, '__name__', str(val))
+
+
+class State:
+    '''
+    Recurrence state of an indicator at the end of a calculation (the last
+    smoothed value, accumulated sums, trend, ...), delivered by `getstate`.
+
+    It seeds a later calculation of the same indicator (with the same
+    params) on the values which follow, with `state=...`, which then starts
+    delivering values with the 1st one, without any warm-up period.
+
+    `tobytes` and `frombytes` convert it to and from a binary format (a numpy
+    `npz` archive, which holds no pickled objects)
+
+    Attributes:
+      - name: name of the indicator
+      - params: dict with the params of the indicator
+      - values: dict with the values of the state (1-d float64 arrays)
+    '''
+    def __init__(self, name, params, values):
+        self.name = name
+        self.params = {k: _pvalue(v) for k, v in dict(params).items()}
+        self.values = {k: np.array(v, dtype=np.float64, ndmin=1)
+                       for k, v in values.items()}
+
+    def __getitem__(self, item):
+        return self.values[item]
+
+    def __repr__(self):
+        return '{}(name={!r}, params={!r}, values={!r})'.format(
+            self.__class__.__name__, self.name, self.params, self.values)
+
+    def _check(self, name, params):
+        # raise an error if the state is not the one of the given indicator
+        if name != self.name:
+            errors.StateNotIndicator(self.name, name)  # raise error
+
+        params = {k: _pvalue(v) for k, v in dict(params).items()}
+        if params != self.params:
+            errors.StateNotParams(self.params, params)  # raise error
+
+    def tobytes(self):
+        meta = json.dumps(dict(name=self.name, params=self.params))
+        buf = io.BytesIO()
+        np.savez(buf, __meta__=np.array(meta), **self.values)
+        return buf.getvalue()
+
+    @classmethod
+    def frombytes(cls, data):
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            meta = json.loads(str(npz['__meta__']))
+            values = {k: npz[k] for k in npz.files if k != '__meta__'}
+
+        return cls(meta['name'], meta['params'], values)
@@ -0,0 +1,657 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright (C) 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import collections
+import math
+import operator
+
+import numpy as np
+
+from . import errors
+from . import kernels
+from .meta import linesholder, linesops
+
+__all__ = ['Stream']
+
+
+class Stream:
+    '''
+    Calculates an indicator one value at a time, for example with the ticks of
+    live data. Each `push` takes the new value of each input and returns the
+    new value of the output (a tuple with a value per output if the indicator
+    has several) in O(1) amortized time.
+
+    The indicator (a class) is defined as usual, with its params (given as
+    keyword args) and outputs. Its definition is run once on the nodes of a
+    stream, which implement the operations of lines for single values. The
+    operations on windows of values (rolling sum, mean, std, var, corr, the
+    rolling max/min kernels and the linearly weighted window sum) keep a
+    circular buffer with the values of the window and running sums (or
+    monotonic deques for max/min). The running sums are calculated again from
+    the buffer once per period, to keep the rounding errors of a single
+    window. The values match those of the calculation on all values, but for
+    rounding in the sums.
+
+    Indicators whose values depend on all previous values (`ema`, `obv`, ...)
+    cannot be streamed: `errors.StreamError` is raised when creating the
+    stream. See `getstate` to continue their calculation
+
+    Attributes:
+      - outputs: names of the outputs
+      - params: params of the indicator
+    '''
+    def __init__(self, ind, **kwargs):
+        self._inputs = [_Input() for _ in ind.inputs]
+        self._ind = ind._stream(self._inputs, kwargs)
+
+        self.outputs = tuple(self._ind.outputs.keys())
+        self.params = self._ind.params
+        self._outputs = list(self._ind.outputs)
+        self._nodes = _graph(self._outputs)
+        self._count = 0  # values pushed
+
+    def push(self, *values):
+        if len(values) != len(self._inputs):
+            errors.StreamInputs(len(values), len(self._inputs))  # raise error
+
+        for node, value in zip(self._inputs, values):
+            node._input = float(value)
+
+        t, self._count = self._count, self._count + 1
+        for node in self._nodes:
+            node._push(t)
+
+        if len(self._outputs) == 1:
+            return self._outputs[0].value
+
+        return tuple(node.value for node in self._outputs)
+
+
+def _graph(outputs):
+    # nodes needed to calculate the outputs, each one after its parents
+    nodes, seen = [], set()
+    for output in outputs:
+        stack = [(output, False)]
+        while stack:
+            node, done = stack.pop()
+            if done:
+                nodes.append(node)
+            elif id(node) not in seen:
+                seen.add(id(node))
+                stack.append((node, True))
+                stack.extend((p, False) for p in reversed(node._parents))
+
+    return nodes
+
+
+def _streamed(args):
+    # True if an indicator is called on the nodes of a stream
+    return any(isinstance(_tonode(arg, None), _Node) for arg in args)
+
+
+def _isline(val):
+    # True for a node or an indicator built on nodes
+    return isinstance(val, (_Node, linesholder.LinesHolder))
+
+
+def _tonode(val, default=0):
+    # node from a node or an indicator built on nodes (its 1st output) or a
+    # constant node from a number. default: return it for other values
+    if isinstance(val, linesholder.LinesHolder):
+        val = val.outputs[0]
+
+    if isinstance(val, _Node):
+        return val
+
+    if isinstance(val, (int, float, bool, np.number, np.bool_)):
+        return _Const(val)
+
+    if default is not None:
+        errors.StreamNotSupported(type(val).__name__)  # raise error
+
+    return default
+
+
+class _Lines:
+    # Lines of an indicator built on a stream: a node per name, with the
+    # access by name and index of regular lines
+    def __init__(self, names, nodes=()):
+        object.__setattr__(self, '_names', tuple(names))
+        for name, node in zip(self._names, nodes):
+            setattr(self, name, node)
+
+    def __setattr__(self, name, val):
+        super().__setattr__(name, _tonode(val))
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        yield from (getattr(self, x) for x in self._names)
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            item = self._names.index(item)
+
+        return getattr(self, self._names[item])
+
+    def __setitem__(self, item, val):
+        setattr(self, self._names[item], val)
+
+    def keys(self):
+        yield from self._names
+
+
+def _inputs(cls, args):
+    # lines with the nodes given as inputs (as many as declared, fewer if the
+    # indicator allows it) and the remaining args
+    nodes = []
+    for arg in args[:len(cls.inputs)]:
+        node = _tonode(arg, None)
+        if node is None:
+            break
+
+        nodes.append(node)
+
+    if len(nodes) < len(cls.inputs) and not getattr(cls, 'allowinputs', 0):
+        errors.MultiDimSmall()  # raise error
+
+    return _Lines(cls.inputs[:len(nodes)], nodes), args[len(nodes):]
+
+
+# Element-wise operations on python floats with the results of numpy for
+# float64 (no exceptions for divisions by zero, overflows, ...)
+def _npfunc(func, npfunc):
+    def npop(*args):
+        try:
+            r = func(*args)
+        except ArithmeticError:
+            r = None
+
+        if r is None or isinstance(r, complex):
+            with np.errstate(all='ignore'):
+                r = float(npfunc(*map(np.float64, args)))
+
+        return r
+
+    return npop
+
+
+def _pow(a, b):
+    return a * a if b == 2 else _npow(a, b)  # numpy squares arrays
+
+
+_npow = _npfunc(operator.pow, np.power)
+
+_BINFUNCS_BASE = dict(
+    linesops._BINFUNCS_BASE,
+    div=_npfunc(operator.truediv, np.true_divide),
+    divide=_npfunc(operator.truediv, np.true_divide),
+    truediv=_npfunc(operator.truediv, np.true_divide),
+    floordiv=_npfunc(operator.floordiv, np.floor_divide),
+    mod=_npfunc(operator.mod, np.mod),
+    pow=_pow,
+)
+
+
+def _binfunc(name):
+    bname = name.strip('_')  # __radd__ => radd
+    if bname in _BINFUNCS_BASE:
+        return _BINFUNCS_BASE[bname]
+
+    func = _BINFUNCS_BASE[bname[1:]]  # reversed operation, swap operands
+
+    def rfunc(a, b):
+        return func(b, a)
+
+    return rfunc
+
+
+def _binary_op(name):
+    func = _binfunc(name)
+
+    def binary_op(self, other):
+        return _Op(func, self, _tonode(other))
+
+    return binary_op
+
+
+def _clip(v, lower, upper):
+    # as the array version: nan values and thresholds leave the value as is
+    if lower is not None and v < lower:
+        v = lower
+    if upper is not None and v > upper:
+        v = upper
+
+    return v
+
+
+_NAN = float('nan')
+
+
+class _Node:
+    # A value of the stream, calculated with each push from the values of its
+    # parents. As in Line, the value is nan before the minimum period, which
+    # the operations propagate
+    _minperiod = 1
+    value = _NAN
+
+    def __init__(self, *parents):
+        self._parents = parents
+        self._minperiod = max([p._minperiod for p in parents], default=1)
+        self._fills = []  # (i0, i1, val): ranges with val instead of nan
+
+    def _calc(self):
+        return _NAN
+
+    def _push(self, t):
+        v = self._calc()  # always, windows must see all values
+        if t < self._minperiod - 1:
+            v = _NAN
+
+        for i0, i1, val in self._fills:
+            if i0 <= t < i1:
+                v = val
+
+        self.value = v
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+
+        errors.StreamNotSupported(attr)  # raise error
+
+    # the operations of Line, for single values
+    for name in linesops._BINOPS:
+        locals()[name] = _binary_op(name)
+
+    def __neg__(self):
+        return _Op(operator.neg, self)
+
+    def abs(self):
+        return _Op(abs, self)
+
+    __abs__ = abs
+
+    def apply(self, func):
+        return _Op(lambda v: float(func(v)), self)
+
+    def clip(self, lower=None, upper=None):
+        bounds = (lower, upper)
+        if not any(b is None or _isline(b) for b in bounds):
+            # scalars, as pandas, swap them
+            lower, upper = map(float, (np.nanmin(bounds), np.nanmax(bounds)))
+
+        # bounds as parents (None: no bound), the lines are evaluated first
+        lower, upper = [_Const(b) if b is None else _tonode(b)
+                        for b in (lower, upper)]
+        return _Op(_clip, self, lower, upper)
+
+    def fillna(self, value):
+        return _Op(lambda v, f: f if v != v else v, self, _tonode(value))
+
+    def mask(self, cond, other=_NAN):
+        return _Op(lambda v, c, o: o if c else v,
+                   self, _tonode(cond), _tonode(other))
+
+    def where(self, cond, other=_NAN):
+        return _Op(lambda v, c, o: v if c else o,
+                   self, _tonode(cond), _tonode(other))
+
+    def shift(self, periods=1):
+        if periods < 0:  # values from the future
+            errors.StreamNotSupported('shift({})'.format(periods))
+
+        return _Shift(periods, self)
+
+    def diff(self, periods=1):
+        return self - self.shift(periods)
+
+    def pct_change(self, periods=1):
+        return self / self.shift(periods) - 1
+
+    def __call__(self, ago=0, val=_NAN):
+        if ago:
+            return self.shift(periods=-ago)
+
+        if ago is None:
+            val = None  # called as in (None, ...) ago wasn't meant
+
+        if val is None:
+            return _Op(float, self)  # a copy, its period can be changed
+
+        node = _Const(val)
+        node._minperiod = self._minperiod
+        return node
+
+    def rolling(self, window, **kwargs):
+        if kwargs:
+            errors.StreamNotSupported('rolling({})'.format(kwargs))
+
+        return _Rolling(self, window)
+
+    def _apply(self, func, *args, raw=False, **kwargs):
+        try:
+            window = _WINDOWED[func]
+        except KeyError:
+            errors.StreamNotSupported(getattr(func, '__name__', func))
+
+        return window(self, *args, **kwargs)
+
+    def _applymulti(self, func, *args, raw=False, **kwargs):
+        try:
+            windows = _WINDOWEDMULTI[func]
+        except KeyError:
+            errors.StreamNotSupported(getattr(func, '__name__', func))
+
+        return windows(self, *args, **kwargs)
+
+    def _period(self, period, rolling=False, val=None):
+        # in place, as in Line
+        inc = period - rolling
+        if not inc:
+            return self
+
+        if val is not None:  # set entire changed period to val
+            idx0 = self._minperiod - 1
+            idx1 = idx0 + (inc or 1)
+            if idx1 < idx0:  # inc is negative ...
+                idx0, idx1 = idx1, idx0
+            self._fills.append((idx0, idx1, val))
+
+        self._minperiod += inc
+        return self
+
+
+class _Input(_Node):
+    _input = _NAN  # the pushed value
+
+    def _calc(self):
+        return self._input
+
+
+class _Const(_Node):
+    def __init__(self, val):
+        super().__init__()
+        self._val = self.value = val
+
+    def _calc(self):
+        return self._val
+
+
+class _Op(_Node):
+    # element-wise operation on the values of the parents
+    def __init__(self, func, *parents):
+        super().__init__(*parents)
+        self._func = func
+
+    def _calc(self):
+        return self._func(*[p.value for p in self._parents])
+
+
+class _Shift(_Node):
+    def __init__(self, periods, parent):
+        super().__init__(parent)
+        self._minperiod += periods
+        self._buf = collections.deque([_NAN] * periods)
+
+    def _calc(self):
+        self._buf.append(self._parents[0].value)
+        return self._buf.popleft()
+
+
+class _Window(_Node):
+    # A window of the last "period" values of the parents, updated with the
+    # values entering the window and those leaving it. The buffers hold the
+    # values of each parent and the window is nan if it holds non-finite
+    # values (the empty positions of the start are nan)
+    def __init__(self, period, *parents):
+        super().__init__(*parents)
+        self._p = period = max(period, 0)
+        self._bufs = [[_NAN] * period for _ in parents]
+        self._pos = 0  # position of the oldest value, replaced by the new
+        self._nbad = period  # positions with non-finite values
+        self._tick = 0
+
+    def _calc(self):
+        if not self._p:
+            return _NAN
+
+        pos = self._pos
+        news = tuple(p.value for p in self._parents)
+        olds = tuple(buf[pos] for buf in self._bufs)
+        for buf, new in zip(self._bufs, news):
+            buf[pos] = new
+
+        self._pos = pos + 1 if pos + 1 < self._p else 0
+
+        newok = all(map(math.isfinite, news))
+        oldok = all(map(math.isfinite, olds))
+        self._nbad += oldok - newok
+        self._slide(news if newok else None, olds if oldok else None)
+
+        self._tick += 1
+        if not self._tick % self._p:  # once per period: no error build-up
+            self._refresh()
+
+        return _NAN if self._nbad else self._result()
+
+    def _window(self):
+        # the finite values of the window (tuples with the value of each
+        # parent) from the oldest to the newest and None for the others
+        pos = self._pos
+        for vals in zip(*[buf[pos:] + buf[:pos] for buf in self._bufs]):
+            yield vals if all(map(math.isfinite, vals)) else None
+
+    def _slide(self, new, old):
+        pass
+
+    def _refresh(self):
+        pass
+
+    def _result(self):
+        return _NAN
+
+
+class _Sum(_Window):
+    _s = 0.0
+
+    def _slide(self, new, old):
+        if old is not None:
+            self._s -= old[0]
+        if new is not None:
+            self._s += new[0]
+
+    def _refresh(self):
+        self._s = math.fsum(v[0] for v in self._window() if v is not None)
+
+    def _result(self):
+        return self._s
+
+
+class _Mean(_Sum):
+    def _result(self):
+        return self._s / self._p
+
+
+class _Moments(_Window):
+    # running means and co-moments (Welford) of the finite values of 1 or 2
+    # parents. The values of a single parent are used as x and y
+    _n, _mx, _my, _cxx, _cyy, _cxy = 0, 0.0, 0.0, 0.0, 0.0, 0.0
+    _same, _last = 0, _NAN  # run of equal values (exact 0.0 for the var)
+
+    def _slide(self, new, old):
+        if old is not None:
+            x, y = old[0], old[-1]
+            self._n = n = self._n - 1
+            if n:
+                dx, dy = x - self._mx, y - self._my
+                self._mx -= dx / n
+                self._my -= dy / n
+                self._cxx -= (x - self._mx) * dx
+                self._cyy -= (y - self._my) * dy
+                self._cxy -= (x - self._mx) * dy
+            else:
+                self._mx = self._my = 0.0
+                self._cxx = self._cyy = self._cxy = 0.0
+
+        if new is not None:
+            x, y = new[0], new[-1]
+            self._n = n = self._n + 1
+            dx, dy = x - self._mx, y - self._my
+            self._mx += dx / n
+            self._my += dy / n
+            self._cxx += (x - self._mx) * dx
+            self._cyy += (y - self._my) * dy
+            self._cxy += (x - self._mx) * dy
+
+            self._same = self._same + 1 if x == self._last else 1
+            self._last = x
+        else:
+            self._same, self._last = 0, _NAN
+
+    def _refresh(self):
+        vals = [v for v in self._window() if v is not None]
+        self._n = n = len(vals)
+        if not n:
+            return
+
+        xs, ys = [v[0] for v in vals], [v[-1] for v in vals]
+        self._mx, self._my = mx, my = math.fsum(xs) / n, math.fsum(ys) / n
+        self._cxx = math.fsum((x - mx) * (x - mx) for x in xs)
+        self._cyy = math.fsum((y - my) * (y - my) for y in ys)
+        self._cxy = math.fsum((x - mx) * (y - my) for x, y in zip(xs, ys))
+
+
+class _Var(_Moments):
+    def __init__(self, period, parent, ddof=1):
+        super().__init__(period, parent)
+        self._ddof = ddof
+
+    def _result(self):
+        if self._n <= self._ddof:
+            return _NAN
+
+        if self._n == 1 or self._same >= self._n:
+            return 0.0
+
+        return max(self._cxx, 0.0) / (self._n - self._ddof)
+
+
+class _Std(_Var):
+    def _result(self):
+        return math.sqrt(super()._result())
+
+
+class _Corr(_Moments):
+    def _result(self):
+        with np.errstate(all='ignore'):
+            return float(self._cxy / np.sqrt(self._cxx * self._cyy))
+
+
+class _Max(_Window):
+    # monotonic deque of (tick, value): the values which can still be the
+    # maximum of a window, decreasing from the oldest
+    _sign = 1.0
+
+    def __init__(self, period, parent):
+        super().__init__(period, parent)
+        self._deque = collections.deque()
+
+    def _slide(self, new, old):
+        dq, tick = self._deque, self._tick
+        if new is not None:
+            v = self._sign * new[0]
+            while dq and dq[-1][1] <= v:
+                dq.pop()
+            dq.append((tick, v))
+
+        while dq and dq[0][0] <= tick - self._p:
+            dq.popleft()
+
+    def _result(self):
+        return self._sign * self._deque[0][1]
+
+
+class _Min(_Max):
+    _sign = -1.0
+
+
+class _LinearSum(_Window):
+    # sum of the values weighted linearly along the window (w0 the oldest
+    # value, w0 + dw * (period - 1) the newest) and sum of the values,
+    # non-finite values taken as 0.0 (the window is then nan)
+    _s, _w = 0.0, 0.0
+
+    def __init__(self, period, parent, w0=1.0, dw=1.0):
+        super().__init__(period, parent)
+        self._w0, self._dw = w0, dw
+
+    def _slide(self, new, old):
+        old = 0.0 if old is None else old[0]
+        new = 0.0 if new is None else new[0]
+        wnew = self._w0 + self._dw * (self._p - 1)
+        self._w += wnew * new - self._w0 * old - self._dw * (self._s - old)
+        self._s += new - old
+
+    def _refresh(self):
+        w0, dw = self._w0, self._dw
+        vals = [0.0 if v is None else v[0] for v in self._window()]
+        self._s = math.fsum(vals)
+        self._w = math.fsum((w0 + k * dw) * v for k, v in enumerate(vals))
+
+    def _result(self):
+        return self._w
+
+
+def _rolled(window):
+    # the window with the period of a rolling operation, as in Line
+    def rolled(self, *args, **kwargs):
+        node = window(self._period, self._node, *args, **kwargs)
+        return node._period(self._period, rolling=True)
+
+    return rolled
+
+
+class _Rolling:
+    # rolling(window=period) of a node, with the supported operations
+    def __init__(self, node, period):
+        self._node, self._period = node, period
+
+    def __getattr__(self, attr):
+        errors.StreamNotSupported('rolling.' + attr)  # raise error
+
+    sum = _rolled(_Sum)
+    mean = _rolled(_Mean)
+    var = _rolled(_Var)
+    std = _rolled(_Std)
+    max = _rolled(_Max)
+    min = _rolled(_Min)
+
+    def corr(self, other):
+        node = _Corr(self._period, self._node, _tonode(other))
+        return node._period(self._period, rolling=True)
+
+
+def _minmax(node, period, other=None):
+    # both with the period of the inputs, as the lines of _applymulti
+    other = node if other is None else _tonode(other)
+    lo, hi = _Min(period, node), _Max(period, other)
+    lo._minperiod = hi._minperiod = max(node._minperiod, other._minperiod)
+    return lo, hi
+
+
+# window kernels (see kernels.WINDOWED) and the windows calculating them
+_WINDOWED = {
+    kernels.rolling_max: lambda node, period: _Max(period, node),
+    kernels.rolling_min: lambda node, period: _Min(period, node),
+    kernels.linear_window_sum: lambda node, period, *args: _LinearSum(
+        period, node, *args),
+}
+
+_WINDOWEDMULTI = {
+    kernels.rolling_minmax: _minmax,
+}
@@ -73,10 +73,10 @@ def _MPSERIES(x):
 def _SETVAL(x, idx, val):
     '''Macro like function which makes clear that one is setting a value in the
     underlying series'''
-    x._series[idx] = val
+    x._wseries[idx] = val
 
 
 def _MPSETVAL(x, idx, val):
     '''Macro like function which makes clear that one is setting a value in the
     underlying series'''
-    x._series[x._minperiod - 1 + idx] = val
+    x._wseries[x._minperiod - 1 + idx] = val
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+import numpy as np
+
+
+def run(main=False):
+    df = testcommon.df
+
+    for ind in [btalib.sma, btalib.ema, btalib.rsi, btalib.macd, btalib.adx]:
+        r64 = ind(df)
+        r32 = ind(df, _dtype='float32')
+
+        for o64, o32 in zip(r64.outputs, r32.outputs):
+            s64, s32 = o64.series, o32.series
+            assert s32.dtype == np.float32
+            assert s32.isna().equals(s64.isna())  # same minimum period
+            # differences (macd) lose relative precision close to 0
+            v32, v64 = s32.dropna(), s64.dropna()
+            atol = 1e-4 * v64.abs().max()
+            assert np.allclose(v32, v64, rtol=1e-4, atol=atol)
+
+    # global setting
+    btalib.config.set_dtype('float32')
+    try:
+        assert btalib.sma(df).outputs.sma.series.dtype == np.float32
+    finally:
+        btalib.config.set_dtype()
+
+    assert btalib.sma(df).outputs.sma.series.dtype == np.float64
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
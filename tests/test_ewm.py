@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+import numpy as np
+
+
+def run(main=False):
+    close = testcommon.df.close.to_numpy().copy()  # modified below
+    original = close.copy()
+
+    # the seed (average of the 1st period values) and the smoothing are
+    # calculated on a buffer and do not touch the input
+    for ind in (btalib.ema, btalib.smma, btalib.kama, btalib.mama):
+        ind(close)
+        assert np.array_equal(close, original)
+
+    period = 30
+    ema = btalib.ema(close, period=period).outputs.ema.series.to_numpy()
+    assert np.isnan(ema[:period - 1]).all()
+    assert np.isclose(ema[period - 1], close[:period].mean())
+
+    alpha = 2.0 / (period + 1)
+    expected = ema[period - 1] + alpha * (close[period] - ema[period - 1])
+    assert np.isclose(ema[period], expected)
+
+    # nan values are left out of the seed
+    close[1] = np.nan
+    ema = btalib.ema(close, period=period).outputs.ema.series.to_numpy()
+    assert np.isclose(ema[period - 1], np.nanmean(close[:period]))
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
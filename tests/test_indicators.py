@@ -6,9 +6,20 @@
 ###############################################################################
 import testcommon
 
+import test_dtype
+import test_ewm
+import test_ingest
+import test_kernels
+import test_lazy
 import test_linesholder
+import test_memoize
+import test_out
 import test_outputs
 import test_series_fetcher
+import test_state
+import test_stream
+import test_trimmed
+import test_update
 
 
 def test_run(main=False):
@@ -163,6 +174,17 @@ metatests = dict(
     series_fetcher=test_series_fetcher.run,
     linesholder=test_linesholder.run,
     outputs=test_outputs.run,
+    trimmed=test_trimmed.run,
+    lazy=test_lazy.run,
+    memoize=test_memoize.run,
+    dtype=test_dtype.run,
+    out=test_out.run,
+    ingest=test_ingest.run,
+    ewm=test_ewm.run,
+    kernels=test_kernels.run,
+    update=test_update.run,
+    state=test_state.run,
+    stream=test_stream.run,
 )
 
 
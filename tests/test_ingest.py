@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+import numpy as np
+
+
+def run(main=False):
+    df = testcommon.df
+
+    # DataFrame columns are taken without a copy, integers are float
+    stoch = btalib.stochastic(df)
+    assert np.shares_memory(stoch.inputs.close._series, df.close.to_numpy())
+
+    obv = btalib.obv(df)
+    assert obv.inputs.volume._series.dtype == np.float64
+
+    # dicts and structured arrays as multi-column inputs
+    dct = {name: df[name].to_numpy() for name in df.columns}
+    records = df.to_records(index=False)
+    for data in (dct, records):
+        for ind in (btalib.sma, btalib.stochastic, btalib.obv):
+            r = ind(data).df
+            assert np.allclose(r, ind(df).df, equal_nan=True)
+
+    # the fields of structured arrays are taken without a copy
+    sma = btalib.sma(records)
+    assert np.shares_memory(sma.inputs.close._series, records)
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
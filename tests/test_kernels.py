@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+import numpy as np
+import pandas as pd
+
+
+def _windows(a, period, func):
+    # brute force reference: func applied to each window
+    r = np.full(len(a), np.nan)
+    for i in range(period - 1, len(a)):
+        r[i] = func(a[i - period + 1:i + 1])
+
+    return r
+
+
+def _linear_window_sum(a):
+    for period, w0, dw in [(1, 1, 1), (14, 1, 1), (14, 0, 1), (30, 5, -0.5)]:
+        w = w0 + dw * np.arange(period)
+        r = btalib.kernels.linear_window_sum(a, period, w0, dw)
+        assert np.allclose(r, _windows(a, period, w.dot), equal_nan=True)
+
+    # windows with nan values are nan
+    b = a.copy()
+    b[50] = np.nan
+    r = btalib.kernels.linear_window_sum(b, 10)
+    assert np.isnan(r[50:60]).all()
+    assert not np.isnan(r[49]) and not np.isnan(r[60])
+
+
+def _fir(a):
+    # direct, linear, convolution and fft paths
+    a = np.tile(a, 4)  # room for the long windows
+    rng = np.random.default_rng(0)
+    for period in [1, 4, btalib.kernels.FIR_DIRECT + 1, 30, 300]:
+        for w in [np.arange(1.0, period + 1), rng.random(period)]:
+            r = btalib.kernels.fir(a, w)
+            assert np.allclose(r, _windows(a, period, w.dot), equal_nan=True)
+
+            i = len(a) // 2
+            b = a.copy()
+            b[i] = np.nan
+            r = btalib.kernels.fir(b, w)
+            assert np.isnan(r[i:i + period]).all()
+            assert not np.isnan(r[i + period]) and not np.isnan(r[i - 1])
+
+    # same values as the hand-written expression
+    p0 = btalib.meta.lines.Line(a)
+    x = (4.0*p0 + 3.0*p0(-1) + 2.0*p0(-2) + p0(-3)) / 10.0
+    y = p0._fir([1.0, 2.0, 3.0, 4.0]) / 10.0
+    assert x._minperiod == y._minperiod == 4
+    assert x.series.equals(y.series)
+
+
+def _rolling_argmax(a):
+    a = np.round(a)  # ties
+    a[100] = np.nan
+    n = len(a)
+
+    def check(r, period, func):
+        nanfunc = lambda x: np.nan if np.isnan(x).any() else func(x)  # noqa
+        assert np.array_equal(r, _windows(a, period, nanfunc), equal_nan=True)
+
+    for p in [1, 2, 14, 30]:
+        # ties to the oldest (np.argmax) or to the newest value
+        check(btalib.kernels.rolling_argmax(a, p), p, np.argmax)
+        check(btalib.kernels.rolling_argmin(a, p), p, np.argmin)
+
+        r = btalib.kernels.rolling_argmax(a, p, newest=True)
+        check(r, p, lambda x: p - 1 - np.argmax(x[::-1]))
+
+        r = btalib.kernels.rolling_argmin(a, p, newest=True, absolute=True)
+        r -= np.arange(n) - p + 1
+        check(r, p, lambda x: p - 1 - np.argmin(x[::-1]))
+
+
+def _rolling_minmax(a):
+    b = a + 1.0
+    a, b = a.copy(), b.copy()
+    a[100], b[150] = np.nan, np.inf  # windows not calculated
+    for p in [1, 2, 14, 30]:
+        ll, hh = btalib.kernels.rolling_minmax(a, p, b)
+        assert pd.Series(ll).equals(pd.Series(a).rolling(p).min())
+        assert pd.Series(hh).equals(pd.Series(b).rolling(p).max())
+
+        assert np.array_equal(btalib.kernels.rolling_min(a, p), ll,
+                              equal_nan=True)
+        assert np.array_equal(btalib.kernels.rolling_max(b, p), hh,
+                              equal_nan=True)
+
+
+def _rolling_mad(a):
+    a = np.tile(a, 8)
+    a[100] = np.nan
+    mad = lambda x: np.fabs(x - x.mean()).mean()  # noqa: E731
+    for p in [1, 20, btalib.kernels.CHUNKSIZE // 100]:  # several chunks
+        r = btalib.kernels.rolling_mad(a, p)
+        assert pd.Series(r).equals(pd.Series(a).rolling(p).apply(mad))
+
+
+def _variable_window_mean(a):
+    a = np.tile(a, 8)
+    a[len(a) // 2] = np.nan
+    periods = np.random.default_rng(0).integers(0, 40, len(a))
+    r = btalib.kernels.variable_window_mean(a, periods)
+
+    for p in np.unique(periods):
+        sel = periods == p
+        if p < 1:
+            assert np.isnan(r[sel]).all()
+            continue
+
+        ref = pd.Series(a).rolling(window=p).mean().to_numpy()
+        assert np.allclose(r[sel], ref[sel], rtol=0, atol=1e-9, equal_nan=True)
+
+
+def _recursive(a):
+    rng = np.random.default_rng(0)
+    alpha = rng.random(len(a) - 1)
+    a = a.copy()
+    a[100] = np.nan
+
+    # reference loops on numpy arrays and kernels (jit compiled or not)
+    ref = a.copy()
+    btalib.kernels._recursive_mean(ref, alpha)
+    assert np.isclose(ref[1], a[0] + alpha[0] * (a[1] - a[0]))
+    ref2 = a.copy()
+    btalib.kernels._exp_smoothing(ref2, 0.25, 0.75)
+
+    jit = btalib.config.get_jit()
+    try:
+        for onoff in [False, True]:
+            btalib.config.set_jit(onoff)
+            x = a.copy()
+            r = btalib.kernels.recursive_mean(x, alpha)
+            assert r is x  # in place
+            assert np.array_equal(r, ref, equal_nan=True)
+
+            r = btalib.kernels.exp_smoothing(a.copy(), 0.25)
+            assert np.array_equal(r, ref2, equal_nan=True)
+
+            # values without factor are left untouched
+            r = btalib.kernels.recursive_mean(a.copy(), alpha[:10])
+            assert np.array_equal(r[:11], ref[:11])
+            assert np.array_equal(r[11:], a[11:], equal_nan=True)
+    finally:
+        btalib.config.set_jit(jit)
+
+
+def _ema_cascade(a):
+    a = a.copy()
+    a[[3, 100, 101]] = np.nan
+    a[160:200] = np.nan
+
+    # chained emas (seeded with the mean of period values), calculated once
+    period, emas = 5, [a]
+    for i in range(6):
+        emas.append(btalib.ema(emas[-1], period=period))
+
+    emas[1:] = [x.outputs[0].series.to_numpy() for x in emas[1:]]
+
+    terms = [(6, -0.3), (5, 1.6), (4, -2.5), (3, 2.2)]
+    ref = sum(coef * emas[stage] for stage, coef in terms)
+
+    jit = btalib.config.get_jit()
+    try:
+        for onoff in [False, True]:
+            btalib.config.set_jit(onoff)
+            r = btalib.kernels.ema_cascade(a, period, terms)
+            assert np.array_equal(r, ref, equal_nan=True)
+            assert np.isnan(r[:6 * (period - 1)]).all()
+
+            r = btalib.kernels.ema_cascade(a, period, [(1, 2.0), (2, -1.0)])
+            assert np.array_equal(r, 2.0 * emas[1] - emas[2], equal_nan=True)
+    finally:
+        btalib.config.set_jit(jit)
+
+    assert np.isnan(btalib.kernels.ema_cascade(a[:24], period, terms)).all()
+
+
+def _exp_smoothing_scan(a):
+    a = a.copy()
+    for alpha, beta in [(1.0, 13 / 14), (2 / 31, None), (1.0, 0.0)]:
+        r = btalib.kernels.exp_smoothing_scan(a, alpha, beta)
+        ref = btalib.kernels.exp_smoothing(a.copy(), alpha, beta)
+        assert np.allclose(r, ref, rtol=1e-12)
+
+    a[200] = np.nan  # poisons the rest, as lfilter does
+    r = btalib.kernels.exp_smoothing_scan(a, 1.0, 13 / 14)
+    assert np.isfinite(r[:200]).all() and np.isnan(r[200:]).all()
+
+
+def _hilbert_transform(a):
+    jit = btalib.config.get_jit()
+    try:
+        rs = []
+        for onoff in [False, True]:
+            btalib.config.set_jit(onoff)
+            rs.append(btalib.kernels.hilbert_transform(a, a, skip=25))
+    finally:
+        btalib.config.set_jit(jit)
+
+    for name in btalib.kernels.HTOUTPUTS:
+        assert np.array_equal(rs[0][name], rs[1][name], equal_nan=True)
+
+    # nan values render the rest nan, but the dft tables are not overrun
+    b = a.copy()
+    b[100] = np.nan
+    r = btalib.kernels.hilbert_transform(b, b, skip=25)
+    assert np.isnan(r['dcphase'][101:]).all() and not np.isnan(r['dcphase'][:100]).any()
+
+    r = btalib.kernels.hilbert_transform(a, skip=25, phase=False)
+    for name in btalib.kernels.HTOUTPUTS[:3]:  # no phase, same values
+        assert np.array_equal(r[name], rs[0][name])
+    assert all(np.isnan(r[name]).all() for name in btalib.kernels.HTOUTPUTS[3:])
+
+    # the engine runs once for the indicators sharing skip and phase
+    df = testcommon.df
+    calls = []
+    hilbert_transform = btalib.kernels.hilbert_transform
+
+    def counter(*args, **kwargs):
+        calls.append(kwargs)
+        return hilbert_transform(*args, **kwargs)
+
+    btalib.kernels.hilbert_transform = counter
+    try:
+        with btalib.memoize():
+            ht_sine, ht_trendmode = btalib.ht_sine(df), btalib.ht_trendmode(df)
+            btalib.ht_dcperiod(df), btalib.mama(df)
+    finally:
+        btalib.kernels.hilbert_transform = hilbert_transform
+
+    assert len(calls) == 2
+    assert ht_sine.df.equals(btalib.ht_sine(df).df)
+    assert ht_trendmode.df.equals(btalib.ht_trendmode(df).df)
+
+    # a single input call must not cap the inputs of the next calls
+    ht_dcperiod = btalib.ht_dcperiod(df).df
+    btalib.ht_dcperiod(a)
+    assert ht_dcperiod.equals(btalib.ht_dcperiod(df).df)
+
+
+def _parabolic_sar(a):
+    df = testcommon.df
+    high, low = df.high.to_numpy(), df.low.to_numpy()
+    highs = np.stack([high, high[::-1], 2.0 * high], axis=1)
+    lows = np.stack([low, low[::-1], 2.0 * low], axis=1)
+    aflong, startval = [0.02, 0.03, 0.02], [0.0, 0.0, -2.0 * high[1]]
+
+    jit = btalib.config.get_jit()
+    try:
+        rs = []
+        for onoff in [False, True]:
+            btalib.config.set_jit(onoff)
+            rs.append(btalib.kernels.parabolic_sar(
+                highs, lows, aflong, 0.2, 0.03, 0.3, 0.01, startval, signed=True))
+    finally:
+        btalib.config.set_jit(jit)
+
+    assert np.array_equal(rs[0], rs[1], equal_nan=True)
+
+    # all assets at once or one by one: same results
+    for i in range(highs.shape[1]):
+        r = btalib.kernels.parabolic_sar(
+            highs[:, i], lows[:, i], aflong[i], 0.2, 0.03, 0.3, 0.01, startval[i],
+            signed=True)
+        assert np.array_equal(rs[0][:, i], r, equal_nan=True)
+
+    r = btalib.kernels.parabolic_sar(high, low)
+    assert np.isnan(r[0]) and not np.isnan(r[1:]).any()
+    assert (r[1:] > 0).all() and (rs[0][:, 0] < 0).any()  # signed if asked
+    assert np.isnan(btalib.kernels.parabolic_sar(high[:1], low[:1])).all()
+
+
+def run(main=False):
+    a = testcommon.df.close.to_numpy()
+    _linear_window_sum(a)
+    _fir(a)
+    _rolling_argmax(a)
+    _rolling_minmax(a)
+    _rolling_mad(a)
+    _variable_window_mean(a)
+    _recursive(a)
+    _ema_cascade(a)
+    _exp_smoothing_scan(a)
+    _hilbert_transform(a)
+    _parabolic_sar(a)
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
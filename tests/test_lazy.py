@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+import numpy as np
+import pandas as pd
+
+
+def run(main=False):
+    # long enough to be evaluated in several chunks
+    close = pd.concat([testcommon.df.close] * 200, ignore_index=True)
+    assert len(close) > 3 * btalib.meta.lazy.CHUNKSIZE
+
+    p0 = btalib.meta.lines.Line(close)
+    ht = (4 * p0 + 3 * p0(-1) + 2 * p0(-2) + p0(-3)) / 10.0
+    assert ht._lazy is not None  # not yet evaluated
+    assert ht._minperiod == 4
+
+    c = close.to_numpy()
+    expected = (4 * c[3:] + 3 * c[2:-1] + 2 * c[1:-2] + c[:-3]) / 10.0
+
+    s = ht.series
+    assert ht._lazy is None  # evaluated
+    assert s[:3].isna().all()
+    assert np.array_equal(s[3:].to_numpy(), expected)
+
+    # modifying an operand must not modify a pending operation
+    x = p0 * 2.0
+    p0[0] = 0.0
+    assert x.series[0] == c[0] * 2.0
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
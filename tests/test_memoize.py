@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+
+
+def run(main=False):
+    df = testcommon.df
+
+    with btalib.memoize():
+        sma1 = btalib.sma(df, period=10)
+        sma2 = btalib.sma(df, period=10)
+        sma3 = btalib.sma(df, period=11)
+        adx = btalib.adx(df)
+
+    # identical indicators share the values, but not the objects
+    assert sma1 is not sma2
+    assert sma1.outputs.sma is not sma2.outputs.sma
+    assert sma1.outputs.sma._ident() == sma2.outputs.sma._ident()
+    assert sma1.outputs.sma._ident() != sma3.outputs.sma._ident()
+
+    # results are the same as without a memo
+    assert sma1.df.equals(btalib.sma(df, period=10).df)
+    assert adx.df.equals(btalib.adx(df).df)
+
+    # modifying the values of one does not modify the other
+    sma2.outputs.sma[20] = 0.0
+    assert sma1.outputs.sma[20] != 0.0
+
+    # the memo is released at the end of the block
+    assert btalib.meta.metadata.memo is None
+
+    # a failed calculation releases the memo: later results are not stale
+    close = df.close.to_numpy().copy()
+    try:
+        btalib.macd(close, pfast='x')
+    except TypeError:
+        pass
+    else:
+        assert False
+
+    assert not btalib.meta.metadata.callstack
+    assert btalib.meta.metadata.memo is None
+
+    sma = btalib.sma(close, period=3).outputs.sma[-1]
+    close[:] = 0.0
+    assert sma != 0.0
+    assert btalib.sma(close, period=3).outputs.sma[-1] == 0.0
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import os
+import tempfile
+
+import testcommon
+
+import btalib
+import numpy as np
+
+
+def run(main=False):
+    df = testcommon.df
+    size = len(df)
+
+    # columns of a feature matrix
+    features = np.empty((size, 4))
+    out = {'macd': features[:, 0], 'signal': features[:, 1],
+           'histogram': features[:, 2]}
+
+    macd = btalib.macd(df, out=out)
+    expected = btalib.macd(df)
+    for i, name in enumerate(out):
+        assert np.array_equal(features[:, i], expected.outputs[name].series,
+                              equal_nan=True)
+
+        # the outputs hold the values in the buffers
+        assert np.shares_memory(macd.outputs[name]._series, features[:, i])
+
+    # sequence in output order, alias name and memmap
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fname = os.path.join(tmpdir, 'features.dat')
+        mm = np.memmap(fname, dtype=np.float64, mode='w+', shape=(size, 2))
+
+        btalib.stochastic(df, out=[mm[:, 0], None])
+        btalib.sma(df, out={'sma': mm[:, 1]})  # and lazy ops via sma
+        mm.flush()
+        del mm
+
+        mm = np.memmap(fname, dtype=np.float64, mode='r', shape=(size, 2))
+        stoch = btalib.stochastic(df).outputs.k.series
+        assert np.array_equal(mm[:, 0], stoch, equal_nan=True)
+        sma = btalib.sma(df).outputs.sma.series
+        assert np.array_equal(mm[:, 1], sma, equal_nan=True)
+        del mm
+
+    # memoized results are not altered by the buffers
+    with btalib.memoize():
+        buf = np.empty(size)
+        sma1 = btalib.sma(df, out={'sma': buf})
+        buf[:] = 0.0
+        sma2 = btalib.sma(df)
+        assert np.shares_memory(sma1.outputs.sma._series, buf)
+        assert np.array_equal(sma2.outputs.sma.series, sma, equal_nan=True)
+
+    # wrong names/sizes
+    for badout in [{'nosuchoutput': np.empty(size)}, {'sma': np.empty(5)}]:
+        try:
+            btalib.sma(df, out=badout)
+        except btalib.errors.OutputsError:
+            pass
+        else:
+            assert False
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+import numpy as np
+
+
+def _continued(ind, df, split, **kwargs):
+    # indicator calculated on df[:split] and continued on df[split:] from the
+    # state, which goes through the binary format
+    state = ind(df.iloc[:split], **kwargs).getstate()
+    state = btalib.State.frombytes(state.tobytes())
+    return ind(df.iloc[split:], state=state, **kwargs)
+
+
+def _raises(func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except btalib.errors.StateError:
+        pass
+    else:
+        assert False
+
+
+def run(main=False):
+    df = testcommon.df
+
+    # continued from the state: the values of a single calculation
+    inds = [btalib.ema, btalib.smma, btalib.kama, btalib.mama, btalib.obv,
+            btalib.ad, btalib.sar, btalib.sarext]
+    for ind in inds:
+        expected = ind(df).df.iloc[100:]
+        continued = _continued(ind, df, 100)
+        assert continued.df.index.equals(expected.index)
+        assert continued.df.equals(expected)
+
+    # chained continuations shorter than the values kept in the state
+    for ind, kwargs in [(btalib.kama, {}), (btalib.obv, dict(_period=3))]:
+        expected = ind(df, **kwargs).df.iloc[100:110]
+        state = ind(df.iloc[:100], **kwargs).getstate()
+        for i in range(100, 110):
+            continued = ind(df.iloc[i:i + 1], state=state, **kwargs)
+            assert continued.df.equals(expected.iloc[i - 100:i - 99])
+            state = continued.getstate()
+
+    # lfilter: same values but rounding
+    expected = btalib.smacc(df).df.iloc[100:]
+    continued = _continued(btalib.smacc, df, 100)
+    assert np.allclose(continued.df, expected, rtol=1e-12)
+
+    # the params are part of the state, a continued one can be updated
+    expected = btalib.ema(df, period=10).df.iloc[100:]
+    continued = _continued(btalib.ema, df.iloc[:200], 100, period=10)
+    continued.update(df.iloc[200:])
+    assert continued.df.equals(expected)
+
+    # a state only seeds the same indicator with the same params
+    state = btalib.ema(df).getstate()
+    _raises(btalib.smma, df, state=state)
+    _raises(btalib.ema, df, period=10, state=state)
+
+    # no state before the warm-up is done
+    _raises(btalib.sar(df.iloc[:1]).getstate)
+    _raises(btalib.mama(df.iloc[:20]).getstate)
+
+    # window based indicators have no state
+    _raises(btalib.sma(df).getstate)
+    _raises(btalib.adosc(df).getstate)
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
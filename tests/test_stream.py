@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+import numpy as np
+
+
+# indicator, input columns, exact (else the same values but rounding)
+INDICATORS = [
+    (btalib.sma, ['close'], False),
+    (btalib.sumn, ['close'], False),
+    (btalib.stddev, ['close'], False),
+    (btalib.stddev_s, ['close'], False),
+    (btalib.var, ['close'], False),
+    (btalib.max, ['close'], True),
+    (btalib.min, ['close'], True),
+    (btalib.midprice, ['high', 'low'], True),
+    (btalib.williamsr, ['high', 'low', 'close'], True),
+    (btalib.beta, ['high', 'low'], False),
+    (btalib.correl, ['high', 'low'], False),
+    (btalib.linearreg, ['close'], False),
+    (btalib.linearreg_slope, ['close'], False),
+    (btalib.linearreg_angle, ['close'], False),
+    (btalib.linearreg_intercept, ['close'], False),
+    (btalib.mfi, ['high', 'low', 'close', 'volume'], False),
+    (btalib.truerange, ['high', 'low', 'close'], True),
+    (btalib.ultimateoscillator, ['high', 'low', 'close'], False),
+]
+
+
+def _raises(exc, func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except exc:
+        pass
+    else:
+        assert False
+
+
+def run(main=False):
+    df = testcommon.df
+
+    # the values pushed one at a time: those of the batch calculation
+    for ind, cols, exact in INDICATORS:
+        expected = ind(*[df[col] for col in cols]).df.to_numpy()
+
+        stream = ind.stream()
+        rows = df[cols].itertuples(index=False)
+        streamed = np.array([stream.push(*row) for row in rows])
+        streamed = streamed.reshape(expected.shape)
+
+        if exact:
+            assert np.array_equal(streamed, expected, equal_nan=True)
+        else:
+            assert np.allclose(streamed, expected, rtol=1e-9, equal_nan=True)
+
+    # params given to the stream
+    stream = btalib.sma.stream(period=5)
+    streamed = [stream.push(x) for x in df.close]
+    expected = btalib.sma(df.close, period=5).df.sma
+    assert np.allclose(streamed, expected, rtol=1e-9, equal_nan=True)
+
+    # values depending on all previous values cannot be streamed
+    _raises(btalib.errors.StreamError, btalib.ema.stream)
+    _raises(btalib.errors.StreamError, btalib.obv.stream)
+
+    # a value for each input
+    _raises(btalib.errors.InputsError, btalib.sma.stream().push, 1.0, 2.0)
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+
+
+def run(main=False):
+    IND = btalib.stochastic
+    INDOUTS = IND.outputs
+
+    df = testcommon.df
+    indicator = IND(df)
+
+    begidx = indicator.begidx
+    assert begidx == indicator._minperiod - 1
+
+    trimmed = indicator.trimmed
+    assert list(trimmed.columns) == list(INDOUTS)
+    assert len(trimmed) == len(df) - begidx
+    assert trimmed.index[0] == df.index[begidx]
+    assert not trimmed.isna().any().any()
+
+    # the trimmed values are the valid values of the full output
+    assert trimmed.equals(indicator.df[begidx:])
+
+    for name in INDOUTS:
+        line = getattr(indicator.outputs, name)
+        assert line.mpseries.equals(indicator.df[name][line.begidx:])
+
+    btalib.config.set_return_trimmed()
+    try:
+        assert IND(df).equals(trimmed)
+    finally:
+        btalib.config.set_return('')
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+# Copyright 2020 Daniel Rodriguez
+# Use of this source code is governed by the MIT License
+###############################################################################
+import testcommon
+
+import btalib
+import numpy as np
+
+
+def _updated(ind, df, start, step):
+    # indicator calculated on df[:start] and updated with step rows at a time
+    ind = ind(df.iloc[:start])
+    for i in range(start, len(df), step):
+        ind.update(df.iloc[i:i + step])
+
+    return ind
+
+
+def run(main=False):
+    df = testcommon.df
+
+    # window based: only the new values calculated, same values but rounding
+    for ind in [btalib.sma, btalib.stochastic, btalib.bbands, btalib.cci]:
+        updated, expected = _updated(ind, df, 100, 7), ind(df)
+        assert not updated._unbounded_
+        assert updated.df.index.equals(expected.df.index)
+        assert np.allclose(updated.df, expected.df, rtol=1e-10,
+                           equal_nan=True)
+
+    # recursive/accumulated: calculated again, the same values
+    for ind in [btalib.ema, btalib.macd, btalib.obv, btalib.sar]:
+        updated, expected = _updated(ind, df, 100, 1), ind(df)
+        assert updated._unbounded_
+        assert updated.df.equals(expected.df)
+
+    # absolute indices (ta-lib compatibility) depend on the start
+    maxindex = btalib.maxindex(df.iloc[:100], _talib=True)
+    maxindex.update(df.iloc[100:])
+    assert maxindex.df.equals(btalib.maxindex(df, _talib=True).df)
+
+    # arrays, several inputs and the cached DataFrame is discarded
+    high, low = df.high.to_numpy(), df.low.to_numpy()
+    midprice = btalib.midprice(high[:100], low[:100])
+    midprice.df
+    midprice.update(high[100:], low[100:])
+    assert np.allclose(midprice.df, btalib.midprice(high, low).df,
+                       equal_nan=True)
+
+    # the number of inputs must match
+    try:
+        midprice.update(high[:1])
+    except btalib.errors.InputsError:
+        pass
+    else:
+        assert False
+
+    return True
+
+
+if __name__ == '__main__':
+    run(main=True)